@@ -0,0 +1,155 @@
+"""
+Logging for the tray app.
+
+Call sites use the ``whispertype`` logger with %-style arguments, so a message
+is only formatted if a sink keeps it. Records go through a ``SimpleQueue`` to a
+``QueueListener`` thread that formats them and feeds the sinks:
+
+* the console (``[Defaults] verbose`` shows debug messages, otherwise info and up)
+* an optional rotating file (``[Logging] file``)
+* a ring buffer of the most recent records at the console's level, which the
+  tray's "Save diagnostics log" item writes out
+
+The logger's level is the lowest level a sink keeps, so without ``verbose`` or a
+log file a debug call is one level check. Otherwise the audio callback, keyboard
+hook and server threads only build a LogRecord and enqueue it; they never wait
+on console or file I/O.
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+from collections import deque
+from typing import Optional
+
+LOGGER_NAME = "whispertype"
+CONSOLE_FORMAT = "%(message)s"
+FILE_FORMAT = "%(asctime)s %(levelname)-7s %(threadName)s %(message)s"
+DEFAULT_RING_SIZE = 2000
+
+logger = logging.getLogger(LOGGER_NAME)
+
+
+class _LazyQueueHandler(logging.handlers.QueueHandler):
+    """Enqueues records unformatted; the listener thread formats them.
+
+    The stock ``prepare`` formats in the calling thread. Log arguments must
+    therefore not be mutated after the call (ours are strings and numbers).
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class RingBufferHandler(logging.Handler):
+    """Keeps the last ``capacity`` formatted records in memory."""
+
+    def __init__(self, capacity: int = DEFAULT_RING_SIZE, level: int = logging.DEBUG) -> None:
+        super().__init__(level)
+        self.records: deque[str] = deque(maxlen=capacity)
+        self.setFormatter(logging.Formatter(FILE_FORMAT))
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self.records.append(self.format(record))
+        except Exception:
+            self.handleError(record)
+
+    def dump(self, path: str) -> int:
+        """Write the buffered records to ``path``; returns how many."""
+        lines = list(self.records)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            for line in lines:
+                f.write(line + "\n")
+        os.replace(tmp, path)
+        return len(lines)
+
+
+class LogService:
+    """The queue, listener thread and sinks behind the ``whispertype`` logger."""
+
+    def __init__(self, verbose: bool = False, log_file: str = "", max_bytes: int = 1_000_000,
+                 backup_count: int = 3, ring_size: int = DEFAULT_RING_SIZE, stream=None) -> None:
+        level = logging.DEBUG if verbose else logging.INFO
+        self.ring = RingBufferHandler(ring_size, level)
+        console = logging.StreamHandler(stream or sys.stdout)
+        console.setLevel(level)
+        console.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+        sinks: list[logging.Handler] = [console, self.ring]
+        self.file_handler: Optional[logging.Handler] = None
+        if log_file:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(log_file)), exist_ok=True)
+                self.file_handler = logging.handlers.RotatingFileHandler(
+                    log_file, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True,
+                )
+                self.file_handler.setFormatter(logging.Formatter(FILE_FORMAT))
+                sinks.append(self.file_handler)
+            except OSError as e:
+                print(f"[LOG] Cannot log to {log_file}: {e}", file=sys.stderr)
+        self.queue: queue.SimpleQueue = queue.SimpleQueue()
+        self.handler = _LazyQueueHandler(self.queue)
+        self.listener = logging.handlers.QueueListener(self.queue, *sinks, respect_handler_level=True)
+
+    def start(self) -> None:
+        logger.addHandler(self.handler)
+        # Records no sink keeps are dropped at the call site (the file keeps all).
+        logger.setLevel(min(h.level or logging.DEBUG for h in self.listener.handlers))
+        logger.propagate = False
+        self.listener.start()
+
+    def stop(self) -> None:
+        """Flush queued records and detach from the logger."""
+        logger.removeHandler(self.handler)
+        self.listener.stop()
+        if self.file_handler is not None:
+            self.file_handler.close()
+
+
+_service: Optional[LogService] = None
+_service_lock = threading.Lock()
+
+
+def setup_logging(**kwargs) -> LogService:
+    """Start (or restart with new settings) the logging service; see ``LogService``."""
+    global _service
+    with _service_lock:
+        if _service is not None:
+            _service.stop()
+        else:
+            atexit.register(shutdown_logging)  # flush what is still queued
+        _service = LogService(**kwargs)
+        _service.start()
+        return _service
+
+
+def logging_service() -> Optional[LogService]:
+    return _service
+
+
+def setup_logging_from_config(config, stream=None) -> LogService:
+    """``setup_logging`` with ``[Defaults] verbose`` and the ``[Logging]`` section."""
+    log_file = config.get("Logging", "file", fallback="", raw=True).strip()
+    return setup_logging(
+        verbose=config.getboolean("Defaults", "verbose", fallback=False),
+        log_file=os.path.expanduser(os.path.expandvars(log_file)) if log_file else "",
+        max_bytes=config.getint("Logging", "max_kb", fallback=1024) * 1024,
+        backup_count=config.getint("Logging", "backups", fallback=3),
+        ring_size=config.getint("Logging", "ring_size", fallback=DEFAULT_RING_SIZE),
+        stream=stream,
+    )
+
+
+def shutdown_logging() -> None:
+    global _service
+    with _service_lock:
+        if _service is not None:
+            _service.stop()
+            _service = None
@@ -0,0 +1,183 @@
+"""
+Disk spill for long recordings.
+
+Once a recording passes ``[Recording] spill_after`` seconds, the recording
+thread moves it into a ``SpillFile``. That is 16-bit PCM in a memory-mapped
+temp file, preallocated for ``max_duration`` when created, so a full disk shows
+up then rather than as SIGBUS in the audio callback. The recording thread calls
+``release()`` to write finished pages back and drop them from the resident
+set, so RSS stays flat however long the key is held.
+
+``MultipartUpload`` sends the recording to whisper-server as a streamed
+multipart body, read straight from the mapping. The file is removed when the
+spill is closed. On POSIX it is unlinked right away, so the kernel frees it
+even if the app crashes.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+import tempfile
+import uuid
+
+# Written pages are flushed and dropped from RSS in steps of this many bytes
+RELEASE_BYTES = 4 * 1024 * 1024
+UPLOAD_CHUNK = 256 * 1024
+_WAV_HEADER = struct.Struct("<4sI4s4sIHHIIHH4sI")
+
+
+def wav_header(n_samples: int, sample_rate: int) -> bytes:
+    """44-byte header of a 16-bit mono PCM WAV holding ``n_samples``."""
+    data = n_samples * 2
+    return _WAV_HEADER.pack(
+        b"RIFF", 36 + data, b"WAVE", b"fmt ", 16, 1, 1, sample_rate, sample_rate * 2, 2, 16, b"data", data
+    )
+
+
+class SpillFile:
+    """Up to ``capacity`` mono samples stored as 16-bit PCM in a mapped temp file."""
+
+    def __init__(self, sample_rate: int, capacity: int, folder: str = "") -> None:
+        import numpy as np
+
+        self.sample_rate = sample_rate
+        self.capacity = capacity
+        self.n = 0
+        fd, self.path = tempfile.mkstemp(prefix="whispertype-rec-", suffix=".pcm", dir=folder or None)
+        self._file = os.fdopen(fd, "r+b")
+        if os.name != "nt":
+            os.unlink(self.path)
+            self.path = ""
+        if hasattr(os, "posix_fallocate"):
+            os.posix_fallocate(self._file.fileno(), 0, capacity * 2)
+        else:
+            self._file.truncate(capacity * 2)
+        self._mm = mmap.mmap(self._file.fileno(), capacity * 2)
+        self._np = np  # imported on first spill, not at app startup
+        self._pcm = np.frombuffer(self._mm, dtype="<i2")
+        self._scratch = np.empty(0, dtype=np.float32)
+        self._last = 0
+        self._released = 0
+        self._read_released = 0
+
+    def append(self, block) -> None:
+        """Store a 1-D float block (-1..1); samples beyond ``capacity`` are dropped."""
+        n = min(len(block), self.capacity - self.n)
+        if n <= 0:
+            return
+        if len(self._scratch) < n:
+            self._scratch = self._np.empty(n, dtype=self._np.float32)  # once per block size
+        scaled = self._scratch[:n]
+        self._np.multiply(block[:n], 32767.0, out=scaled)
+        self._pcm[self.n:self.n + n] = scaled  # same truncation as encode_wav
+        self._last = n
+        self.n += n
+
+    def tail_rms(self) -> float:
+        """RMS (0..1) of the last appended block."""
+        if not self._last:
+            return 0.0
+        tail = self._scratch[:self._last]
+        return (float(tail.dot(tail)) / self._last) ** 0.5 / 32767.0
+
+    def samples(self):
+        """The stored samples as float32 (a copy; for callers that need them in RAM)."""
+        return self._pcm[:self.n].astype("float32") / 32767.0
+
+    def release(self) -> int:
+        """Write back full pages and drop them from RSS; returns bytes released.
+
+        Call from the recording thread, not the audio callback (it waits on disk)."""
+        end = self.n * 2 // RELEASE_BYTES * RELEASE_BYTES
+        if end <= self._released:
+            return 0
+        start, self._released = self._released, end
+        self._mm.flush(start, end - start)
+        self._drop(start, end)
+        return end - start
+
+    def _drop(self, start: int, end: int) -> None:
+        if hasattr(self._mm, "madvise") and hasattr(mmap, "MADV_DONTNEED"):
+            # MAP_SHARED: the data stays in the file, only our mapping drops the pages.
+            self._mm.madvise(mmap.MADV_DONTNEED, start, end - start)
+
+    def pcm_bytes(self, offset: int, size: int) -> bytes:
+        """``size`` bytes of PCM at ``offset``; whole RELEASE_BYTES steps already
+        read are dropped from RSS again, so a sequential reader stays flat."""
+        data = self._mm[offset:offset + size]
+        done = (offset + len(data)) // RELEASE_BYTES * RELEASE_BYTES
+        if done > self._read_released:
+            self._drop(self._read_released, done)
+            self._read_released = done
+        return data
+
+    def close(self) -> None:
+        if self._mm is None:
+            return
+        self._pcm = None
+        self._mm.close()
+        self._mm = None
+        self._file.close()
+        if self.path:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+
+class MultipartUpload:
+    """A ``multipart/form-data`` body with form ``fields`` and the spilled audio
+    as a WAV ``file``, read from the mapping in chunks as it is sent.
+
+    Pass it as ``data=`` with ``headers={"Content-Type": upload.content_type}``;
+    ``requests`` sees ``__len__`` and sends a Content-Length instead of chunks."""
+
+    def __init__(self, spill: SpillFile, fields: dict, filename: str = "audio.wav") -> None:
+        boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={boundary}"
+        head = "".join(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'
+            for name, value in fields.items()
+        )
+        head += (
+            f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+            "Content-Type: audio/wav\r\n\r\n"
+        )
+        self._head = head.encode() + wav_header(spill.n, spill.sample_rate)
+        self._tail = f"\r\n--{boundary}--\r\n".encode()
+        self._spill = spill
+        self._data = spill.n * 2
+        self._length = len(self._head) + self._data + len(self._tail)
+        self._pos = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self):
+        while True:
+            chunk = self.read(UPLOAD_CHUNK)
+            if not chunk:
+                return
+            yield chunk
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            size = self._length - self._pos
+        parts = []
+        while size > 0 and self._pos < self._length:
+            chunk = self._chunk(self._pos, size)
+            parts.append(chunk)
+            self._pos += len(chunk)
+            size -= len(chunk)
+        return b"".join(parts)
+
+    def _chunk(self, pos: int, size: int) -> bytes:
+        if pos < len(self._head):
+            return self._head[pos:pos + size]
+        pos -= len(self._head)
+        if pos < self._data:
+            return self._spill.pcm_bytes(pos, min(size, self._data - pos))
+        pos -= self._data
+        return self._tail[pos:pos + size]
@@ -0,0 +1,309 @@
+"""
+Batch transcription of existing recordings (voice memos, meeting snippets)
+through the configured whisper-server, without the tray or keyboard hooks.
+
+    python whispertype.py transcribe [options] FILE_OR_DIR...
+
+Files are streamed through a bounded worker pool; each worker owns a headless
+``WhisperType`` bound to one server port, so ``--ports``/``--servers`` spread
+the work over several whisper-server processes (each loads its own copy of the
+model). Servers already answering on a port are reused; the ones started here
+are stopped at the end. A JSONL manifest records finished files (by size and
+mtime), so re-running skips them unless ``--force`` is given.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import itertools
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator
+
+AUDIO_EXTENSIONS = (".wav", ".mp3", ".m4a", ".ogg", ".oga", ".opus", ".flac", ".webm", ".aac", ".mp4")
+MANIFEST_NAME = ".whispertype-transcripts.jsonl"
+DEFAULT_TIMEOUT = 600
+
+
+def iter_inputs(paths: list[str], recursive: bool = True) -> Iterator[tuple[str, str]]:
+    """``(file, top)`` for audio files named on the command line or found under the
+    given directories; ``top`` is the directory argument, or the file's own folder."""
+    for p in paths:
+        p = os.path.abspath(os.path.expanduser(p))
+        if os.path.isdir(p):
+            for root, dirs, files in os.walk(p):
+                dirs.sort()
+                for name in sorted(files):
+                    if name.lower().endswith(AUDIO_EXTENSIONS):
+                        yield os.path.join(root, name), p
+                if not recursive:
+                    break
+        elif os.path.isfile(p):
+            yield p, os.path.dirname(p)
+        else:
+            print(f"[BATCH] Not found: {p}", file=sys.stderr)
+
+
+class Manifest:
+    """Append-only JSONL of finished files; the last entry per path wins."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.entries: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line after a crash
+                    if isinstance(entry, dict) and "path" in entry:
+                        self.entries[entry["path"]] = entry
+        except OSError:
+            pass
+
+    def is_done(self, path: str, st: os.stat_result, outputs: dict[str, str]) -> bool:
+        entry = self.entries.get(path)
+        return bool(
+            entry
+            and entry.get("size") == st.st_size
+            and entry.get("mtime_ns") == st.st_mtime_ns
+            and all(os.path.exists(o) for o in outputs.values())
+        )
+
+    def record(self, entry: dict) -> None:
+        with self._lock:
+            self.entries[entry["path"]] = entry
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+
+
+def output_paths(path: str, out_dir: str, formats: list[str], top: str = "") -> dict[str, str]:
+    """``memo.wav`` -> ``memo.wav.txt`` next to it, or under ``out_dir`` at the same
+    place relative to ``top`` (the folder given on the command line)."""
+    if out_dir:
+        rel = os.path.relpath(path, top or os.path.dirname(path))
+        path = os.path.join(out_dir, rel)
+    return {fmt: f"{path}.{fmt}" for fmt in formats}
+
+
+def _write_atomic(path: str, data: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)  # mirrored subfolders under --out
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def start_servers(config, ports: list[int], model_path: str, language: str, translate: bool):
+    """Make sure a whisper-server answers on every port; returns the processes started here."""
+    from model_bench import probe_server, stop_process, wait_until_ready
+    from keep_warm import prefetch_file
+    from whispertype import SERVER_LOAD_TIMEOUT, server_command_args
+
+    started: list[tuple[subprocess.Popen, int]] = []
+    cmd = config.get("Server", "command", raw=True)
+    for port in ports:
+        if probe_server(port):
+            print(f"[BATCH] Using the whisper-server already running on port {port}", file=sys.stderr)
+            continue
+        if not started:
+            prefetch_file(model_path)
+        args = server_command_args(cmd, model_path, language, port, translate)
+        proc = subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        started.append((proc, port))
+        print(f"[BATCH] Starting whisper-server on port {port}...", file=sys.stderr)
+    for proc, port in started:
+        if not wait_until_ready(port, proc, timeout=SERVER_LOAD_TIMEOUT):
+            for p, _ in started:
+                stop_process(p)
+            raise RuntimeError(f"whisper-server on port {port} did not become ready")
+    return [proc for proc, _ in started]
+
+
+def transcribe_main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="whispertype.py transcribe",
+        description="Transcribe audio files through the configured whisper-server.",
+    )
+    parser.add_argument("paths", nargs="+", help="audio files or directories")
+    parser.add_argument("-o", "--out", default="", help="output folder (default: next to each input)")
+    parser.add_argument("-f", "--format", default="txt", help="comma-separated: txt, json (default: txt)")
+    parser.add_argument("--ports", default="", help="comma-separated server ports (default: [Server] port)")
+    parser.add_argument("--servers", type=int, default=0, help="use N servers on consecutive ports from [Server] port")
+    parser.add_argument("-j", "--jobs", type=int, default=0, help="concurrent requests (default: one per server)")
+    parser.add_argument("--model", default="", help="model file in models_dir (default: [Models] default_model)")
+    parser.add_argument("--language", default="", help="default: [Defaults] language")
+    parser.add_argument("--manifest", default="", help=f"default: <out or cwd>/{MANIFEST_NAME}")
+    parser.add_argument("--force", action="store_true", help="transcribe files the manifest lists as done")
+    parser.add_argument("--no-recursive", action="store_true", help="do not descend into subdirectories")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="seconds per request")
+    args = parser.parse_args(argv)
+
+    import whispertype
+    from model_bench import stop_process
+
+    formats = [f.strip() for f in args.format.split(",") if f.strip()]
+    if not formats or set(formats) - {"txt", "json"}:
+        parser.error("--format takes txt, json or txt,json")
+    cfg = whispertype.ensure_config_file()
+    if cfg is None:
+        return 1
+    cfg.set("Server", "request_timeout", str(int(args.timeout)))
+    if args.model:
+        cfg.set("Models", "default_model", args.model)
+    if args.language:
+        cfg.set("Defaults", "language", args.language)
+    base_port = cfg.getint("Server", "port", fallback=7777)
+    if args.ports:
+        ports = [int(p) for p in args.ports.split(",") if p.strip()]
+    else:
+        ports = [base_port + i for i in range(max(1, args.servers))]
+    jobs = args.jobs or len(ports)
+
+    out_dir = os.path.abspath(os.path.expanduser(args.out)) if args.out else ""
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    manifest = Manifest(args.manifest or os.path.join(out_dir or os.getcwd(), MANIFEST_NAME))
+
+    clients: queue.Queue = queue.Queue()
+    # stdout carries the per-file results; keep the client's start-up chatter off it.
+    with contextlib.redirect_stdout(sys.stderr):
+        for i in range(jobs):
+            client = whispertype.WhisperType(headless=True)
+            client.port = str(ports[i % len(ports)])
+            client.server_url = f"http://localhost:{client.port}/inference"
+            clients.put(client)
+    first = clients.queue[0]
+    model_name = os.path.basename(first.model_path)
+    if not os.path.exists(first.model_path):
+        print(f"[BATCH] Model not found: {first.model_path}", file=sys.stderr)
+        return 1
+
+    totals = {"done": 0, "failed": 0, "skipped": 0, "audio_s": 0.0}
+    lock = threading.Lock()
+
+    claimed: dict[str, str] = {}  # output file -> input that writes it
+
+    def pending() -> Iterator[tuple[str, dict[str, str], os.stat_result]]:
+        for path, top in iter_inputs(args.paths, recursive=not args.no_recursive):
+            outputs = output_paths(path, out_dir, formats, top)
+            clash = next((claimed[o] for o in outputs.values() if claimed.get(o, path) != path), None)
+            if clash is not None:
+                # Same relative path under two input folders, or the same name given twice.
+                print(f"[BATCH] {path}: output would overwrite the one for {clash}; skipped", file=sys.stderr)
+                totals["failed"] += 1
+                continue
+            for o in outputs.values():
+                claimed[o] = path
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if not args.force and manifest.is_done(path, st, outputs):
+                totals["skipped"] += 1
+                continue
+            yield path, outputs, st
+
+    todo = pending()
+    first_item = next(todo, None)
+    started = []
+    if first_item is not None:
+        try:
+            started = start_servers(cfg, ports, first.model_path, first.language, first.translate)
+        except (OSError, RuntimeError) as e:
+            print(f"[BATCH] {e}", file=sys.stderr)
+            return 1
+
+    def work(path: str, outputs: dict[str, str], st: os.stat_result) -> None:
+        try:
+            transcribe_one(path, outputs, st)
+        except Exception as e:
+            print(f"[BATCH] {path}: {e}", file=sys.stderr)
+            with lock:
+                totals["failed"] += 1
+
+    def transcribe_one(path: str, outputs: dict[str, str], st: os.stat_result) -> None:
+        client = clients.get()
+        try:
+            t0 = time.perf_counter()
+            try:
+                samples = whispertype.load_audio_file(path, client.sample_rate)
+            except (OSError, ValueError, EOFError, wave.Error) as e:
+                print(f"[BATCH] {path}: cannot read audio: {str(e) or 'truncated or empty file'}", file=sys.stderr)
+                with lock:
+                    totals["failed"] += 1
+                return
+            audio_s = len(samples) / client.sample_rate
+            text = client.transcribe_audio(whispertype.encode_wav(samples, client.sample_rate))
+            del samples
+            elapsed = time.perf_counter() - t0
+        finally:
+            clients.put(client)
+        if text is None:
+            print(f"[BATCH] {path}: transcription failed", file=sys.stderr)
+            with lock:
+                totals["failed"] += 1
+            return
+        if "txt" in outputs:
+            _write_atomic(outputs["txt"], text + "\n")
+        if "json" in outputs:
+            _write_atomic(outputs["json"], json.dumps({
+                "file": path,
+                "text": text,
+                "audio_seconds": round(audio_s, 3),
+                "processing_seconds": round(elapsed, 3),
+                "model": model_name,
+                "language": client.language,
+            }, ensure_ascii=False, indent=1) + "\n")
+        manifest.record({
+            "path": path,
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "outputs": outputs,
+            "audio_seconds": round(audio_s, 3),
+            "processing_seconds": round(elapsed, 3),
+            "model": model_name,
+        })
+        with lock:
+            totals["done"] += 1
+            totals["audio_s"] += audio_s
+        rtf = elapsed / audio_s if audio_s else 0.0
+        print(f"{path}: {audio_s:.1f}s audio in {elapsed:.2f}s (RTF {rtf:.3f})")
+
+    # At most two files per worker are queued, so memory stays flat for any input size.
+    window = threading.BoundedSemaphore(jobs * 2)
+    t_start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            for path, outputs, st in itertools.chain([first_item] if first_item else [], todo):
+                window.acquire()
+                pool.submit(work, path, outputs, st).add_done_callback(lambda _f: window.release())
+    except KeyboardInterrupt:
+        print("[BATCH] Interrupted; finished files are in the manifest.", file=sys.stderr)
+    finally:
+        wall = time.perf_counter() - t_start
+        for proc in started:
+            stop_process(proc)
+        with contextlib.redirect_stdout(sys.stderr):
+            while not clients.empty():
+                clients.get().quit()
+
+    files_per_s = totals["done"] / wall if wall > 0 else 0.0
+    rtf = wall / totals["audio_s"] if totals["audio_s"] else 0.0
+    print(
+        f"[BATCH] {totals['done']} transcribed, {totals['skipped']} skipped, {totals['failed']} failed "
+        f"in {wall:.1f}s: {files_per_s:.2f} files/s, {totals['audio_s']:.0f}s audio, "
+        f"aggregate RTF {rtf:.3f} (wall / audio) over {len(ports)} server(s), {jobs} job(s)",
+        file=sys.stderr,
+    )
+    return 1 if totals["failed"] else 0
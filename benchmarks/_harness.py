@@ -0,0 +1,103 @@
+"""
+Setup shared by the headless check-and-benchmark scripts (control_latency.py,
+history_store.py, shared_server.py, long_recording.py): pass/fail checks, a
+scratch folder, placeholder model files, a stand-in whisper-server executable,
+and a headless ``WhisperType`` talking to an in-process fake ``/inference``
+(see e2e_pipeline.py).
+"""
+
+from __future__ import annotations
+
+import contextlib
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Iterator
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from e2e_pipeline import CorpusInput, FakeServer, make_client  # noqa: E402
+
+# whisper-server stand-in for code that launches one (answers GET with 200)
+FAKE_SERVER_SCRIPT = """\
+import http.server, sys
+port = int(sys.argv[sys.argv.index("--port") + 1])
+class Handler(http.server.BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+    def do_GET(self):
+        self.send_response(200)
+        self.end_headers()
+http.server.HTTPServer(("127.0.0.1", port), Handler).serve_forever()
+"""
+
+
+def expect(cond: bool, what: str) -> None:
+    if not cond:
+        raise AssertionError(what)
+
+
+def wait_for(cond: Callable[[], bool], timeout: float) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if cond():
+            return True
+        time.sleep(0.05)
+    return cond()
+
+
+def alive(pid: int) -> bool:
+    if os.name == "nt":
+        out = subprocess.run(["tasklist", "/FI", f"PID eq {pid}"], capture_output=True, text=True).stdout
+        return str(pid) in out
+    try:
+        os.kill(pid, 0)
+    except OSError:
+        return False
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().split()[2] != "Z"
+    except OSError:
+        return True
+
+
+@contextlib.contextmanager
+def scratch_folder(prefix: str) -> Iterator[str]:
+    """Temp folder, removed with everything in it on exit."""
+    folder = tempfile.mkdtemp(prefix=prefix)
+    try:
+        yield folder
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+def placeholder_models(folder: str, names: tuple[str, ...] = ("ggml-a.bin", "ggml-b.bin")) -> list[str]:
+    """Empty model files, enough for code that only checks that the model exists."""
+    paths = []
+    for name in names:
+        paths.append(os.path.join(folder, name))
+        open(paths[-1], "wb").close()
+    return paths
+
+
+def fake_server_command(folder: str) -> str:
+    """``[Server] command`` template that runs ``FAKE_SERVER_SCRIPT`` from ``folder``."""
+    script = os.path.join(folder, "fake_server.py")
+    with open(script, "w") as f:
+        f.write(FAKE_SERVER_SCRIPT)
+    return f'"{sys.executable}" "{script}" -m {{model_path}} --port {{port}}'
+
+
+@contextlib.contextmanager
+def headless_app(source=None, latency_s: float = 0.0, model_path: str = "") -> Iterator[tuple]:
+    """``(client, server)``: a headless ``WhisperType`` recording from ``source``
+    (default: a ``CorpusInput``) against a ``FakeServer``; both closed on exit."""
+    server = FakeServer(latency_s, 0.0)
+    client = make_client(server.port, source if source is not None else CorpusInput(), model_path)
+    try:
+        yield client, server
+    finally:
+        client.quit()
+        server.close()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Control-socket benchmark and smoke check, headless (no tray, audio device or model).
+
+Runs a headless ``WhisperType`` with its ``ControlServer`` on a private socket,
+a fake ``/inference`` server and synthetic audio (see e2e_pipeline.py), then
+drives it through ``ControlClient`` like an external script would:
+
+* every command (status, start, stop, cancel, switch_model, unknown) is checked
+  for the expected reply and events; a mismatch exits 1
+* ``round_trip``: request -> reply for ``status``
+* ``start_to_capture``: ``start`` sent -> first audio block in the capture buffer
+* ``stop_to_text``: ``stop`` sent -> ``transcription`` event received
+
+    python benchmarks/control_latency.py --iterations 200
+    python benchmarks/control_latency.py --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import secrets
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from _harness import expect, headless_app, placeholder_models, scratch_folder  # noqa: E402
+from e2e_pipeline import SAMPLE_RATE, CorpusInput, pct  # noqa: E402
+
+
+class _TimedInput(CorpusInput):
+    """CorpusInput that notes when the first block reaches the app's callback."""
+
+    first_block = 0.0
+
+    def __call__(self, samplerate, channels, callback, **kwargs):
+        def timed(indata, frames, time_info, status):
+            if not self.first_block:
+                self.first_block = time.perf_counter()
+            callback(indata, frames, time_info, status)
+
+        self.first_block = 0.0
+        return super().__call__(samplerate, channels, timed, **kwargs)
+
+
+def wait_event(events, name: str, timeout: float = 5.0) -> dict:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        event = events.next_event(timeout=deadline - time.monotonic())
+        if event and event.get("event") == name:
+            return event
+    raise AssertionError(f"no {name!r} event within {timeout}s")
+
+
+def check_commands(ctl, events, client, source, samples, models: list[str]) -> None:
+    """One pass over every command; raises AssertionError on unexpected behaviour."""
+    status = ctl.request("status")
+    expect(status["ok"] and not status["recording"], f"status: {status}")
+    expect(ctl.request("stop").get("already"), "stop while idle should be a no-op")
+    expect(not ctl.request("bogus")["ok"], "unknown command should fail")
+
+    source.load(samples)
+    expect(ctl.request("start")["recording"], "start")
+    wait_event(events, "recording_started")
+    expect(ctl.request("status")["recording"], "status while recording")
+    source.done.wait(5)
+    expect(ctl.request("cancel")["cancelled"], "cancel")
+    wait_event(events, "recording_cancelled")
+    expect(len(client.capture) == 0, "cancel should discard the audio")
+    expect(not ctl.request("cancel")["cancelled"], "cancel while idle")
+
+    source.load(samples)
+    ctl.request("start")
+    source.done.wait(5)
+    ctl.request("stop")
+    wait_event(events, "recording_stopped")
+    text = wait_event(events, "transcription")
+    expect(text.get("text") == "benchmark transcript", f"transcription event: {text}")
+
+    expect(not ctl.request("switch_model", model="missing.bin")["ok"], "switch to a missing model")
+    reply = ctl.request("switch_model", model=models[1])
+    expect(reply["ok"], f"switch_model: {reply}")
+    wait_event(events, "model_changed")
+    expect(ctl.request("status")["model"] == models[1], "status after switch_model")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--clip-seconds", type=float, default=1.0)
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="fake server time per request")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    import numpy as np
+    from control import ControlClient, ControlServer
+
+    key = secrets.token_hex(16).encode()
+    samples = (np.random.default_rng(0).standard_normal(int(SAMPLE_RATE * args.clip_seconds)) * 0.1).astype(np.float32)
+    source = _TimedInput()
+    round_trip, start_to_capture, stop_to_text = [], [], []
+    with scratch_folder("whispertype-ctl-") as tmp:
+        paths = placeholder_models(tmp)
+        models = [os.path.basename(p) for p in paths]
+        address = os.path.join(tmp, "control.sock")
+        with headless_app(source, args.latency_ms / 1000.0, model_path=paths[0]) as (client, _server):
+            # change_model() saves config.ini next to the app; keep the benchmark off the user's file.
+            client.change_model = lambda name: setattr(client, "model_path", os.path.join(tmp, name))
+            client.control = ControlServer(client, address, key)
+            client.control.start()
+            ctl = ControlClient(address, key)
+            events = ControlClient(address, key)
+            events.subscribe()
+            try:
+                check_commands(ctl, events, client, source, samples, models)
+                for _ in range(args.iterations):
+                    t0 = time.perf_counter()
+                    ctl.request("status")
+                    round_trip.append(time.perf_counter() - t0)
+
+                    source.load(samples)
+                    t0 = time.perf_counter()
+                    ctl.request("start")
+                    source.done.wait(5)
+                    start_to_capture.append(source.first_block - t0)
+                    wait_event(events, "recording_started")
+
+                    t0 = time.perf_counter()
+                    ctl.request("stop")
+                    wait_event(events, "transcription")
+                    stop_to_text.append(time.perf_counter() - t0)
+            except AssertionError as e:
+                print(f"FAIL: {e}", file=sys.stderr)
+                return 1
+            finally:
+                ctl.close()
+                events.close()
+
+    result = {
+        "iterations": args.iterations,
+        "server_latency_ms": args.latency_ms,
+        "round_trip_ms": pct(round_trip),
+        "start_to_capture_ms": pct(start_to_capture),
+        "stop_to_text_ms": pct(stop_to_text),
+    }
+    if args.json:
+        print(json.dumps(result))
+    else:
+        print(f"All commands OK; {args.iterations} iterations, fake server {args.latency_ms:g} ms")
+        for name in ("round_trip_ms", "start_to_capture_ms", "stop_to_text_ms"):
+            p = result[name]
+            print(f"  {name[:-3]:<18} p50 {p['p50']:8.3f} ms  p95 {p['p95']:8.3f} ms  p99 {p['p99']:8.3f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
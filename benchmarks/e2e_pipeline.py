@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+End-to-end dictation benchmark without audio hardware, a display or a model.
+
+Drives a headless ``WhisperType`` through start_recording()/stop_recording():
+audio comes from a WAV corpus through an injected stand-in for
+``sounddevice.InputStream``, and requests go to a local whisper-server.
+
+Modes:
+
+* ``fake`` (default): an in-process HTTP stand-in for ``/inference`` that
+  sleeps ``--latency-ms`` (+/- ``--jitter-ms``) per request. Reports client-side
+  overhead (end-to-end time minus the server's own handling time) per stage,
+  throughput of back-to-back dictations, and memory growth across iterations.
+* ``real``: the same corpus against a locally built whisper-server, once per
+  ``--model``; reports the real-time factor (decode time / audio time).
+
+Without ``--corpus`` a few synthetic clips (1-10 s) are used.
+
+    python benchmarks/e2e_pipeline.py --iterations 2000 --latency-ms 5 --json
+    python benchmarks/e2e_pipeline.py real --server-exe ~/whisper.cpp/build/bin/whisper-server \\
+        --model ~/whisper.cpp/models/ggml-base.en.bin --corpus ~/clips
+"""
+
+from __future__ import annotations
+
+import argparse
+import configparser
+import gc
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SAMPLE_RATE = 16000
+BLOCK_FRAMES = 1024  # ~64 ms; what PortAudio typically delivers at 16 kHz
+SYNTHETIC_SECONDS = (1.0, 3.0, 5.0, 10.0)
+
+
+# --- audio input ---------------------------------------------------------------------
+
+
+def load_corpus(corpus_dir: str) -> list[tuple[str, object]]:
+    if corpus_dir:
+        names = sorted(n for n in os.listdir(corpus_dir) if n.lower().endswith(".wav"))
+        if not names:
+            raise SystemExit(f"No .wav files in {corpus_dir}")
+        from whispertype import load_audio_file
+
+        return [(n, load_audio_file(os.path.join(corpus_dir, n), SAMPLE_RATE)) for n in names]
+    import numpy as np
+
+    clips = []
+    for seconds in SYNTHETIC_SECONDS:
+        t = np.arange(int(seconds * SAMPLE_RATE), dtype=np.float32) / SAMPLE_RATE
+        gate = np.maximum(0.0, np.sin(2 * np.pi * 3.3 * t)) ** 2
+        voice = sum(np.sin(2 * np.pi * 120.0 * k * t) / k for k in (1, 2, 3, 5, 8))
+        clips.append((f"synthetic-{seconds:g}s", (0.25 * gate * voice).astype(np.float32)))
+    return clips
+
+
+class CorpusInput:
+    """Factory with ``sounddevice.InputStream``'s signature that plays one clip.
+
+    The stream calls back from its own thread in ``BLOCK_FRAMES`` blocks of shape
+    (frames, 1), like PortAudio; ``realtime`` paces blocks at the sample rate.
+    ``done`` is set once the whole clip has been delivered.
+    """
+
+    def __init__(self, realtime: bool = False) -> None:
+        self.realtime = realtime
+        self.samples = None
+        self.done = threading.Event()
+
+    def load(self, samples) -> None:
+        self.samples = samples
+        self.done.clear()
+
+    def __call__(self, samplerate, channels, callback, **kwargs):
+        return _CorpusStream(self, samplerate, callback)
+
+
+class _CorpusStream:
+    def __init__(self, source: CorpusInput, samplerate: int, callback) -> None:
+        self.source = source
+        self.samplerate = samplerate
+        self.callback = callback
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        return False
+
+    def _run(self) -> None:
+        data = self.source.samples.reshape(-1, 1)
+        t0 = time.perf_counter()
+        for start in range(0, len(data), BLOCK_FRAMES):
+            if self._stop.is_set():
+                return
+            block = data[start:start + BLOCK_FRAMES]
+            self.callback(block, len(block), None, None)
+            if self.source.realtime:
+                delay = t0 + (start + len(block)) / self.samplerate - time.perf_counter()
+                if delay > 0:
+                    self._stop.wait(delay)
+        self.source.done.set()
+
+
+# --- fake whisper-server -------------------------------------------------------------
+
+
+class FakeServer:
+    """``/inference`` + ``/health`` on 127.0.0.1 with a configurable decode delay."""
+
+    def __init__(self, latency_s: float, jitter_s: float, text: str = "benchmark transcript") -> None:
+        self.latency_s = latency_s
+        self.jitter_s = jitter_s
+        self.body = json.dumps({"text": text}).encode()
+        self.handled: list[float] = []
+        self.received: list[int] = []  # request body bytes, per request
+        self.rng = random.Random(1234)
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out as separate writes; without this, Nagle plus
+            # delayed ACK adds ~40 ms that a real whisper-server does not have.
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                self._reply(200, b'{"status":"ok"}')
+
+            def do_POST(self):
+                t0 = time.perf_counter()
+                left = int(self.headers.get("Content-Length", 0))
+                fake.received.append(left)
+                while left > 0:  # in chunks: hour-long uploads must not land in RAM
+                    chunk = self.rfile.read(min(left, 1 << 20))
+                    if not chunk:
+                        break
+                    left -= len(chunk)
+                delay = max(0.0, fake.latency_s + fake.rng.uniform(-fake.jitter_s, fake.jitter_s))
+                if delay:
+                    time.sleep(delay)
+                self._reply(200, fake.body)
+                fake.handled.append(time.perf_counter() - t0)
+
+            def _reply(self, code, body):
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+# --- client --------------------------------------------------------------------------
+
+
+def make_client(port, source: CorpusInput, model_path: str = ""):
+    """Headless WhisperType talking to ``port``; clipboard and typing are off."""
+    import whispertype
+
+    cfg = configparser.ConfigParser(interpolation=configparser.ExtendedInterpolation())
+    cfg.read(os.path.join(ROOT, "config.ini.example"))
+    models_dir = os.path.dirname(model_path) if model_path else tempfile.gettempdir()
+    cfg.set("Server", "port", str(port))
+    cfg.set("Server", "request_timeout", "600")
+    cfg.set("Models", "models_dir", models_dir)
+    cfg.set("Models", "default_model", os.path.basename(model_path) or "fake-model.bin")
+    cfg.set("Recording", "min_duration", "0")
+    for key in ("auto_copy", "auto_type", "verbose", "show_audio_meter"):
+        cfg.set("Defaults", key, "false")
+    whispertype.CONFIG = cfg
+    return whispertype.WhisperType(headless=True, input_stream_factory=source)
+
+
+def dictate(client, source: CorpusInput, samples) -> float:
+    """One push-to-talk cycle; returns seconds from key release to text handled."""
+    source.load(samples)
+    client.start_recording()
+    source.done.wait()
+    t0 = time.perf_counter()
+    client.stop_recording()
+    return time.perf_counter() - t0
+
+
+def own_rss() -> int:
+    from model_bench import process_rss_bytes
+
+    return process_rss_bytes(SimpleNamespace(pid=os.getpid()))
+
+
+def ms(seconds: float) -> float:
+    return round(seconds * 1000.0, 3)
+
+
+def pct(values: list[float]) -> dict:
+    from latency_stats import percentile
+
+    v = sorted(values)
+    return {"p50": ms(percentile(v, 50)), "p95": ms(percentile(v, 95)), "p99": ms(percentile(v, 99))}
+
+
+def run_fake(args, corpus) -> dict:
+    server = FakeServer(args.latency_ms / 1000.0, args.jitter_ms / 1000.0)
+    source = CorpusInput(realtime=args.realtime)
+    client = make_client(server.port, source)
+    try:
+        for i in range(args.warmup):
+            dictate(client, source, corpus[i % len(corpus)][1])
+        client.latency.reset()
+        server.handled.clear()
+        gc.collect()
+        rss_start = own_rss()
+        rss_samples = []
+        e2e = []
+        t_start = time.perf_counter()
+        for i in range(args.iterations):
+            e2e.append(dictate(client, source, corpus[i % len(corpus)][1]))
+            if (i + 1) % max(1, args.iterations // 10) == 0:
+                rss_samples.append(own_rss())
+        wall = time.perf_counter() - t_start
+        gc.collect()
+        rss_end = own_rss()
+    finally:
+        client.quit()
+        server.close()
+    overhead = [t - s for t, s in zip(e2e, server.handled)]
+    audio_s = sum(len(corpus[i % len(corpus)][1]) for i in range(args.iterations)) / SAMPLE_RATE
+    return {
+        "mode": "fake",
+        "iterations": args.iterations,
+        "clips": [name for name, _ in corpus],
+        "server_latency_ms": args.latency_ms,
+        "server_jitter_ms": args.jitter_ms,
+        "realtime_input": args.realtime,
+        "end_to_end_ms": pct(e2e),
+        "client_overhead_ms": pct(overhead),
+        "stages_ms": {
+            stage: {k: ms(p[k]) for k in ("p50", "p95", "p99")}
+            for stage, p in client.latency.summary().items()
+        },
+        "dictations_per_s": round(args.iterations / wall, 2),
+        "audio_s_per_wall_s": round(audio_s / wall, 2),
+        "rss_start_mb": round(rss_start / 1024**2, 2),
+        "rss_end_mb": round(rss_end / 1024**2, 2),
+        "rss_growth_kb_per_1k": round((rss_end - rss_start) / 1024 / args.iterations * 1000, 1),
+        "rss_samples_mb": [round(r / 1024**2, 2) for r in rss_samples],
+    }
+
+
+def run_real(args, corpus) -> dict:
+    from model_bench import find_free_port, launch_server, stop_process, wait_until_ready
+
+    cmd = f"{args.server_exe} -m {{model_path}} -l {{language}} --port {{port}}"
+    models = []
+    for model_path in args.model:
+        port = find_free_port()
+        t0 = time.perf_counter()
+        proc = launch_server(cmd, model_path, port, args.language)
+        try:
+            if not wait_until_ready(port, proc):
+                models.append({"model": os.path.basename(model_path), "error": "server did not become ready"})
+                continue
+            load_s = time.perf_counter() - t0
+            source = CorpusInput(realtime=args.realtime)
+            client = make_client(port, source, model_path)
+            try:
+                dictate(client, source, corpus[0][1])  # warm-up
+                client.latency.reset()
+                rtfs, e2e = [], []
+                for _ in range(max(1, args.iterations // len(corpus))):
+                    for name, samples in corpus:
+                        n = len(client.latency.traces)
+                        e2e.append(dictate(client, source, samples))
+                        if len(client.latency.traces) > n:
+                            decode = {s: end - begin for s, begin, end in client.latency.traces[-1].spans}
+                            rtfs.append(decode.get("server_decode", 0.0) / (len(samples) / SAMPLE_RATE))
+            finally:
+                client.quit()
+            models.append({
+                "model": os.path.basename(model_path),
+                "load_s": round(load_s, 3),
+                "dictations": len(e2e),
+                "rtf_mean": round(statistics.mean(rtfs), 4) if rtfs else None,
+                "rtf_p95": round(sorted(rtfs)[int(0.95 * (len(rtfs) - 1))], 4) if rtfs else None,
+                "end_to_end_ms": pct(e2e),
+            })
+        finally:
+            stop_process(proc)
+    return {"mode": "real", "clips": [name for name, _ in corpus], "models": models}
+
+
+def print_report(result: dict) -> None:
+    if result["mode"] == "fake":
+        print(f"{result['iterations']} dictations over {len(result['clips'])} clips, "
+              f"server {result['server_latency_ms']} ± {result['server_jitter_ms']} ms")
+        for label in ("end_to_end_ms", "client_overhead_ms"):
+            p = result[label]
+            print(f"  {label:<20} p50 {p['p50']:8.2f}  p95 {p['p95']:8.2f}  p99 {p['p99']:8.2f}")
+        for stage, p in result["stages_ms"].items():
+            print(f"    {stage:<18} p50 {p['p50']:8.2f}  p95 {p['p95']:8.2f}  p99 {p['p99']:8.2f}")
+        print(f"  throughput           {result['dictations_per_s']} dictations/s "
+              f"({result['audio_s_per_wall_s']}x real time)")
+        print(f"  RSS                  {result['rss_start_mb']} -> {result['rss_end_mb']} MB "
+              f"({result['rss_growth_kb_per_1k']} KB per 1000 dictations)")
+    else:
+        for m in result["models"]:
+            if "error" in m:
+                print(f"{m['model']:<34} {m['error']}")
+                continue
+            p = m["end_to_end_ms"]
+            print(f"{m['model']:<34} load {m['load_s']:6.2f}s  RTF {m['rtf_mean']:.3f} "
+                  f"(p95 {m['rtf_p95']:.3f})  e2e p50 {p['p50']:.0f} ms  p95 {p['p95']:.0f} ms")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("mode", nargs="?", choices=("fake", "real"), default="fake")
+    parser.add_argument("--corpus", default="", help="directory of .wav files (default: synthetic clips)")
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="fake server decode delay")
+    parser.add_argument("--jitter-ms", type=float, default=2.0, help="fake server delay jitter (uniform +/-)")
+    parser.add_argument("--realtime", action="store_true", help="deliver audio at the real sample rate")
+    parser.add_argument("--server-exe", default="", help="whisper-server binary (real mode)")
+    parser.add_argument("--model", action="append", default=[], help="model .bin (real mode, repeatable)")
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--json", action="store_true", help="print the result as JSON")
+    args = parser.parse_args()
+
+    if args.mode == "real" and not (args.server_exe and args.model):
+        parser.error("real mode needs --server-exe and at least one --model")
+    corpus = load_corpus(args.corpus)
+    result = run_fake(args, corpus) if args.mode == "fake" else run_real(args, corpus)
+    if args.json:
+        print(json.dumps(result, indent=1))
+    else:
+        print_report(result)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Transcription history benchmark and smoke check (history.py), headless.
+
+* ``dictations``: a headless ``WhisperType`` (see e2e_pipeline.py) with a
+  ``HistoryStore`` in a temp folder dictates a few synthetic clips. Each
+  must come back with its text, model, audio length, stages and trimmed audio.
+* ``add``: time spent in ``HistoryStore.add`` (what a dictation pays) while
+  ``--rows`` synthetic entries are queued in bursts, plus the writer's commits
+  and the time to drain the queue
+* ``search``: full-text queries of common words over those rows through
+  ``history.search``, against the same query as a plain ``LIKE`` scan; then
+  ``rare_search`` for a word that occurs in a single row
+* the ``history`` CLI must find a known entry (``--json``)
+
+Exits 1 on a failed check or if the search p99 exceeds ``--budget-ms``.
+
+    python benchmarks/history_store.py --rows 100000
+    python benchmarks/history_store.py --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import sqlite3
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from _harness import expect, headless_app, scratch_folder  # noqa: E402
+from e2e_pipeline import SAMPLE_RATE, CorpusInput, dictate, pct  # noqa: E402
+
+WORDS = (
+    "meeting budget invoice follow up tomorrow please send the report draft review customer "
+    "schedule call agenda notes project deadline update team release bug fix design summary "
+    "quarter numbers forecast travel expense approve contract lunch friday monday remind"
+).split()
+
+
+def check_dictations(folder: str) -> None:
+    import numpy as np
+    from history import HistoryStore, search
+
+    path = os.path.join(folder, "app.db")
+    rng = np.random.default_rng(0)
+    # 0.5 s silence, 1 s noise, 0.5 s silence: trimming keeps about 1.4 s
+    clip = np.zeros(SAMPLE_RATE * 2, dtype=np.float32)
+    clip[SAMPLE_RATE // 2:SAMPLE_RATE * 3 // 2] = rng.standard_normal(SAMPLE_RATE) * 0.1
+    source = CorpusInput()
+    # Leaving the block quits the client, which closes the store and commits what is queued.
+    with headless_app(source) as (client, _server):
+        client.history = HistoryStore(path, keep_audio=True, batch_delay=0.05)
+        for _ in range(3):
+            dictate(client, source, clip)
+        expect(len(client.history.recent) == 3, f"recent: {len(client.history.recent)} entries")
+    entries = search(path)
+    expect(len(entries) == 3, f"{len(entries)} entries saved, expected 3")
+    entry = entries[0]
+    expect(entry.text == "benchmark transcript", f"text: {entry.text!r}")
+    expect(entry.model == "fake-model.bin", f"model: {entry.model!r}")
+    expect(abs(entry.audio_seconds - 2.0) < 0.05, f"audio_seconds: {entry.audio_seconds}")
+    expect("total" in entry.stages and "encode" in entry.stages, f"stages: {entry.stages}")
+    with sqlite3.connect(path) as conn:
+        sizes = [n for (n,) in conn.execute("SELECT length(wav) FROM audio")]
+    expect(len(sizes) == 3, f"{len(sizes)} audio rows")
+    trimmed = (sizes[0] - 44) / 2 / SAMPLE_RATE
+    expect(1.0 <= trimmed <= 1.5, f"trimmed audio is {trimmed:.2f}s, expected 1.0-1.5s")
+
+
+def sentence(rng: random.Random) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 30)))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--burst", type=int, default=500, help="entries queued back to back")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--budget-ms", type=float, default=50.0, help="max search p99")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    from history import HistoryStore, fts_query, history_main, search
+
+    with scratch_folder("whispertype-history-") as folder:
+        rng = random.Random(0)
+        try:
+            check_dictations(folder)
+
+            path = os.path.join(folder, "bulk.db")
+            store = HistoryStore(path, batch_delay=0.05)
+            adds = []
+            t_start = time.perf_counter()
+            for i in range(args.rows):
+                text = "needle haystack marker" if i == args.rows // 2 else sentence(rng)
+                t0 = time.perf_counter()
+                store.add(text, model="ggml-base.en.bin", language="en", audio_seconds=3.0,
+                          stages={"encode": 0.001, "server_decode": 0.3, "total": 0.35})
+                adds.append(time.perf_counter() - t0)
+                if i % args.burst == args.burst - 1:
+                    time.sleep(0.001)
+            queued = time.perf_counter()
+            store.close()
+            drained = time.perf_counter()
+            expect(store.written == args.rows, f"{store.written} of {args.rows} rows written")
+
+            queries = [" ".join(rng.sample(WORDS, rng.randint(1, 3))) for _ in range(args.queries)]
+            conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+            fts, scan = [], []
+            for query in queries:
+                t0 = time.perf_counter()
+                search(path, query, limit=20, conn=conn)
+                fts.append(time.perf_counter() - t0)
+                like = " AND ".join("text LIKE ?" for _ in query.split())
+                t0 = time.perf_counter()
+                conn.execute(
+                    f"SELECT id, text FROM transcriptions WHERE {like} ORDER BY created DESC LIMIT 20",
+                    [f"%{w}%" for w in query.split()],
+                ).fetchall()
+                scan.append(time.perf_counter() - t0)
+            # A word in one row of many: the case the full-text index is for
+            rare_fts, rare_scan = [], []
+            for _ in range(20):
+                t0 = time.perf_counter()
+                search(path, "needle", conn=conn)
+                rare_fts.append(time.perf_counter() - t0)
+                t0 = time.perf_counter()
+                conn.execute("SELECT id, text FROM transcriptions WHERE text LIKE '%needle%' "
+                             "ORDER BY created DESC LIMIT 20").fetchall()
+                rare_scan.append(time.perf_counter() - t0)
+            hit = search(path, "needle hay", conn=conn)
+            expect([e.text for e in hit] == ["needle haystack marker"], f"prefix search: {hit}")
+            expect(fts_query('say "hi" -x') == '"say" """hi""" "-x"*', "query quoting")
+            conn.close()
+
+            out = io.StringIO()
+            with contextlib.redirect_stdout(out):
+                status = history_main(["--db", path, "--json", "needle"])
+            lines = out.getvalue().splitlines()
+            expect(status == 0 and len(lines) == 1 and json.loads(lines[0])["text"] == "needle haystack marker",
+                   f"CLI: status {status}, output {out.getvalue()[:200]!r}")
+        except AssertionError as e:
+            print(f"FAIL: {e}", file=sys.stderr)
+            return 1
+
+    result = {
+        "rows": args.rows,
+        "add_us": {k: round(v * 1000.0, 2) for k, v in pct(adds).items()},
+        "commits": store.commits,
+        "queue_s": round(queued - t_start, 3),
+        "drain_s": round(drained - queued, 3),
+        "search_ms": pct(fts),
+        "like_scan_ms": pct(scan),
+        "rare_search_ms": pct(rare_fts),
+        "rare_like_scan_ms": pct(rare_scan),
+    }
+    over = result["search_ms"]["p99"] > args.budget_ms
+    if args.json:
+        print(json.dumps(result))
+    else:
+        print(f"Dictations, search and CLI OK; {args.rows} rows in {store.commits} commits "
+              f"(queued in {result['queue_s']:.2f}s, drained {result['drain_s']:.2f}s after)")
+        a = result["add_us"]
+        print(f"  {'add':<14} p50 {a['p50']:8.2f} us  p95 {a['p95']:8.2f} us  p99 {a['p99']:8.2f} us")
+        for name in ("search_ms", "like_scan_ms", "rare_search_ms", "rare_like_scan_ms"):
+            p = result[name]
+            print(f"  {name[:-3]:<14} p50 {p['p50']:8.3f} ms  p95 {p['p95']:8.3f} ms  p99 {p['p99']:8.3f} ms")
+    if over:
+        print(f"FAIL: search p99 {result['search_ms']['p99']} ms over {args.budget_ms:g} ms", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
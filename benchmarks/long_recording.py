@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Memory use of a very long recording (a stuck hotkey), headless.
+
+Plays ``--minutes`` of synthetic audio (a 10 s clip, looped) as fast as the
+app takes it through a headless ``WhisperType`` (see e2e_pipeline.py), then
+stops and uploads it to a fake ``/inference`` server. The process RSS is
+sampled throughout.
+
+* ``spill``: the default ``[Recording]`` settings, so past ``spill_after`` the
+  audio goes to a memory-mapped temp file and the upload is streamed from it
+* ``ram`` (with ``--compare``): spilling off, everything in RAM as before
+
+Exits 1 if the spill run's peak RSS growth exceeds ``--budget-mb``, if the
+upload size does not match the recording, or if no text comes back.
+
+    python benchmarks/long_recording.py --minutes 60
+    python benchmarks/long_recording.py --minutes 20 --compare --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from _harness import headless_app  # noqa: E402
+from e2e_pipeline import BLOCK_FRAMES, SAMPLE_RATE, load_corpus, own_rss  # noqa: E402
+
+MB = 1024 * 1024
+
+
+class _LoopInput:
+    """``sounddevice.InputStream`` stand-in that loops ``clip`` for ``seconds``."""
+
+    def __init__(self, clip, seconds: float) -> None:
+        self.clip = clip.reshape(-1, 1)
+        self.total = int(seconds * SAMPLE_RATE)
+        self.done = threading.Event()
+
+    def __call__(self, samplerate, channels, callback, **kwargs):
+        return _LoopStream(self, callback)
+
+
+class _LoopStream:
+    def __init__(self, source: _LoopInput, callback) -> None:
+        self.source = source
+        self.callback = callback
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        return False
+
+    def _run(self) -> None:
+        clip, sent = self.source.clip, 0
+        while sent < self.source.total and not self._stop.is_set():
+            start = sent % (len(clip) - BLOCK_FRAMES)
+            self.callback(clip[start:start + BLOCK_FRAMES], BLOCK_FRAMES, None, None)
+            sent += BLOCK_FRAMES
+            if sent % (BLOCK_FRAMES * 64) == 0:
+                time.sleep(0.001)  # let the recording thread run, as real-time capture would
+        self.source.done.set()
+
+
+class _RssMonitor:
+    def __init__(self, interval: float = 0.05) -> None:
+        self.peak = own_rss()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(interval,), daemon=True)
+        self._thread.start()
+
+    def _run(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            self.peak = max(self.peak, own_rss())
+
+    def stop(self) -> int:
+        self._stop.set()
+        self._thread.join()
+        return max(self.peak, own_rss())
+
+
+def run(mode: str, minutes: float, clip) -> dict:
+    import whispertype
+
+    source = _LoopInput(clip, minutes * 60)
+    texts = []
+    with headless_app(source) as (client, server):
+        client.handle_transcribed_text = lambda text, trace=None: texts.append(text)
+        settings = client.settings
+        client.capture = whispertype.CaptureBuffer(
+            SAMPLE_RATE,
+            max_seconds=max(settings.max_duration, minutes * 60 + 1),
+            spill_seconds=settings.spill_after if mode == "spill" else 0.0,
+        )
+        base = own_rss()
+        monitor = _RssMonitor()
+        t0 = time.perf_counter()
+        client.start_recording()
+        source.done.wait()
+        captured = time.perf_counter()
+        spilled = client.capture.spill is not None
+        samples = len(client.capture)
+        client.stop_recording()
+        uploaded = time.perf_counter()
+        peak = monitor.stop()
+    return {
+        "mode": mode,
+        "minutes": minutes,
+        "spilled": spilled,
+        "samples": samples,
+        "capture_s": round(captured - t0, 2),
+        "upload_s": round(uploaded - captured, 2),
+        "rss_base_mb": round(base / MB, 1),
+        "rss_peak_growth_mb": round((peak - base) / MB, 1),
+        "uploaded_bytes": server.received[-1] if server.received else 0,
+        "text": texts[-1] if texts else "",
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--minutes", type=float, default=60.0)
+    parser.add_argument("--compare", action="store_true", help="also run with spilling off")
+    parser.add_argument("--budget-mb", type=float, default=64.0, help="max RSS growth with spilling")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    clip = load_corpus("")[-1][1]
+    modes = ["spill", "ram"] if args.compare else ["spill"]
+    failed = 0
+    for mode in modes:
+        result = run(mode, args.minutes, clip)
+        audio_bytes = result["samples"] * 2 + 44
+        problems = []
+        if result["uploaded_bytes"] < audio_bytes:
+            problems.append(f"uploaded {result['uploaded_bytes']} bytes for {audio_bytes} bytes of WAV")
+        if not result["text"]:
+            problems.append("no transcription")
+        if mode == "spill" and result["rss_peak_growth_mb"] > args.budget_mb:
+            problems.append(f"RSS grew {result['rss_peak_growth_mb']} MB (budget {args.budget_mb:g} MB)")
+        result["status"] = "FAIL" if problems else "ok"
+        failed += bool(problems)
+        if args.json:
+            print(json.dumps(result))
+        else:
+            print(
+                f"{mode:<6} {result['minutes']:g} min  spilled={result['spilled']!s:<5} "
+                f"capture {result['capture_s']:.1f}s  upload {result['upload_s']:.1f}s  "
+                f"RSS +{result['rss_peak_growth_mb']:.1f} MB  {result['status']}"
+            )
+        for problem in problems:
+            print(f"  {problem}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
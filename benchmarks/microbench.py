@@ -0,0 +1,477 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks for the client code that runs per audio block or per keystroke.
+
+Runs headless on synthetic data (no audio device, display or server):
+
+* ``callback/<frames>``       the input-stream callback at realistic block sizes
+* ``callback/meter``          the same at 1024 frames with the tray level meter on (RMS per block)
+* ``callback/spill``          the same once a long recording has spilled to its memory-mapped file
+* ``wav_encode/<seconds>s``   _audio_to_wav_bytes for recordings of several lengths
+* ``key/char``                on_press + on_release of an ordinary key
+* ``key/chord_miss``          Ctrl+Shift+<unbound key>, press and release
+* ``key/fkey_miss``           an unbound function key, press and release
+* ``key/alloc``               allocations per non-matching keystroke (tracemalloc; must be 0)
+* ``response/<words>w``       transcribe_audio's handling of a 200 response
+* ``log/debug``               a debug call from a hot thread with the default sinks (dropped at the call)
+* ``log/debug_verbose``       the same with ``verbose`` on (enqueued, formatted by the writer)
+* ``models/poll``             the tray's model-folder poll when nothing changed (one stat)
+* ``models/rescan``           relisting a folder of ``MODEL_FILES`` models after a change
+
+Each result is the best time per call over runs spread across ``--span``
+seconds (at least ``--repeat`` runs). A fixed pure-Python reference loop is
+timed between the runs, and results are compared against
+``microbench_baseline.json`` next to this script relative to it, so a machine
+that is slower as a whole does not read as a regression. A benchmark fails
+when it is slower than ``baseline * tolerance`` (per-entry tolerance, or
+``--tolerance``) twice in a row. Baselines are machine-specific: refresh them
+with ``--update-baseline`` on the machine that tracks the numbers.
+
+    python benchmarks/microbench.py                 # table, exit 1 on regression
+    python benchmarks/microbench.py --json          # one JSON object per benchmark
+    python benchmarks/microbench.py --only wav_encode --update-baseline
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import timedelta
+from types import SimpleNamespace
+from typing import Optional
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from e2e_pipeline import SAMPLE_RATE, CorpusInput, make_client  # noqa: E402
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "microbench_baseline.json")
+DEFAULT_TOLERANCE = 1.5
+BLOCK_SIZES = (160, 512, 1024, 4096)
+RECORDING_SECONDS = (1, 10, 60)
+RESPONSE_WORDS = (10, 200)
+MODEL_FILES = 40
+# Slow phases of a shared machine (frequency scaling, busy neighbours) last
+# seconds, so each benchmark samples for at least this long.
+MIN_SPAN = 2.0
+
+
+def reference_loop(n):
+    """Fixed pure-Python work timed next to each benchmark (see ``measure``)."""
+    d = {}
+    for i in range(n):
+        d[i & 63] = i
+
+
+def _calls_for(fn, min_time: float) -> int:
+    n = 1
+    while True:
+        t0 = time.perf_counter()
+        fn(n)
+        if time.perf_counter() - t0 >= min_time or n >= 1 << 20:
+            return n
+        n *= 4
+
+
+def measure(fn, repeat: int, span: float = MIN_SPAN, min_time: float = 0.05) -> tuple[float, float]:
+    """Best seconds per call of ``fn(n)``, which must perform n calls, and of
+    ``reference_loop`` timed in between.
+
+    Runs of at least ``min_time`` are repeated until there are ``repeat`` of
+    them and ``span`` seconds have passed. The minimum is the least noisy
+    estimate on a busy machine; spreading the runs over seconds lets it skip a
+    slow phase instead of landing entirely inside one. When the whole span is
+    slow, the reference is slow too, and main() compares relative to it.
+    """
+    n = _calls_for(fn, min_time)
+    m = _calls_for(reference_loop, min_time)
+    best = best_ref = float("inf")
+    runs = 0
+    end = time.perf_counter() + span
+    while runs < repeat or time.perf_counter() < end:
+        t0 = time.perf_counter()
+        fn(n)
+        t1 = time.perf_counter()
+        reference_loop(m)
+        t2 = time.perf_counter()
+        best = min(best, (t1 - t0) / n)
+        best_ref = min(best_ref, (t2 - t1) / m)
+        runs += 1
+    return best, best_ref
+
+
+# --- benchmarks: each returns {name: fn(n)} ------------------------------------------
+
+
+def bench_callback(client, np):
+    out = {}
+    for frames in BLOCK_SIZES:
+        block = (np.random.default_rng(frames).standard_normal((frames, 1)) * 0.1).astype(np.float32)
+
+        def run(n, block=block, frames=frames):
+            client.recording = True
+            cb = client._audio_callback
+            per_minute = 60 * SAMPLE_RATE // frames
+            for i in range(n):
+                if i % per_minute == 0:
+                    client.capture.clear()  # a recording never grows without bound
+                cb(block, frames, None, None)
+            client.recording = False
+
+        out[f"callback/{frames}"] = run
+
+    def run_meter(n, run=out["callback/1024"]):
+        client._meter_on = True
+        try:
+            run(n)
+        finally:
+            client._meter_on = False
+
+    out["callback/meter"] = run_meter
+
+    def run_spill(n, frames=1024):
+        import whispertype
+
+        block = (np.random.default_rng(frames).standard_normal((frames, 1)) * 0.1).astype(np.float32)
+        ram = client.capture
+        client.capture = capture = whispertype.CaptureBuffer(SAMPLE_RATE, max_seconds=61.0, spill_seconds=0.001)
+        client.recording = True
+        cb = client._audio_callback
+        per_minute = 60 * SAMPLE_RATE // frames
+        try:
+            for i in range(n):
+                if i % per_minute == 0:
+                    capture.clear()
+                    cb(block, frames, None, None)
+                    capture.spill_if_due()  # as the recording thread would
+                cb(block, frames, None, None)
+        finally:
+            client.recording = False
+            capture.clear()
+            client.capture = ram
+
+    out["callback/spill"] = run_spill
+    return out
+
+
+def bench_wav_encode(client, np):
+    out = {}
+    blocks_per_s = SAMPLE_RATE // 1024 + 1
+    for seconds in RECORDING_SECONDS:
+        rng = np.random.default_rng(seconds)
+        blocks = [(rng.standard_normal((1024, 1)) * 0.1).astype(np.float32) for _ in range(seconds * blocks_per_s)]
+
+        def run(n, blocks=blocks):
+            # Fill the capture buffer through the callback so its layout matches a real recording.
+            client.recording = True
+            client.capture.clear()
+            for b in blocks:
+                client._audio_callback(b, len(b), None, None)
+            client.recording = False
+            for _ in range(n):
+                client._audio_to_wav_bytes()
+
+        out[f"wav_encode/{seconds}s"] = run
+    return out
+
+
+class _Key:
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return f"Key.{self.name}"
+
+
+class _KeyCode:
+    def __init__(self, char):
+        self.char = char
+        self.vk = ord(char.upper())
+
+    def __repr__(self):
+        return repr(self.char)
+
+
+def fake_keyboard():
+    """Just enough of ``pynput.keyboard`` for setup_keyboard_listener()."""
+    Key = SimpleNamespace(**{n: _Key(n) for n in (
+        "ctrl", "ctrl_l", "ctrl_r", "shift", "shift_l", "shift_r", "alt", "alt_l", "alt_r", "alt_gr",
+        "cmd", "cmd_l", "cmd_r", "space", "enter", "esc", *(f"f{i}" for i in range(1, 21)),
+    )})
+
+    class Listener:
+        def __init__(self, on_press, on_release):
+            self.on_press = on_press
+            self.on_release = on_release
+
+        def start(self):
+            pass
+
+    return SimpleNamespace(Key=Key, KeyCode=_KeyCode, Listener=Listener)
+
+
+def bench_keys(client, np):
+    kb = fake_keyboard()
+    client.setup_keyboard_listener(keyboard=kb)
+    press, release = client.listener.on_press, client.listener.on_release
+    char = _KeyCode("a")
+    unbound = _KeyCode("q")
+
+    def run_char(n):
+        for _ in range(n):
+            press(char)
+            release(char)
+
+    def run_chord(n):
+        for _ in range(n):
+            press(kb.Key.ctrl_l)
+            press(kb.Key.shift_l)
+            press(unbound)
+            release(unbound)
+            release(kb.Key.shift_l)
+            release(kb.Key.ctrl_l)
+
+    def run_fkey(n):
+        for _ in range(n):
+            press(kb.Key.f7)
+            release(kb.Key.f7)
+
+    def run_alloc(n):
+        # Not timed: main() only checks that these keystrokes allocate nothing.
+        run_char(n)
+        run_chord(n)
+        run_fkey(n)
+
+    return {"key/char": run_char, "key/chord_miss": run_chord, "key/fkey_miss": run_fkey, "key/alloc": run_alloc}
+
+
+def _peak_bytes(fn, n: int) -> int:
+    import tracemalloc
+
+    fn(10)  # warm caches (method lookups, first-use dict resizes)
+    tracemalloc.start()
+    try:
+        base = tracemalloc.get_traced_memory()[0]
+        fn(n)
+        return tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+
+
+def key_allocations(fn, n: int = 1000) -> int:
+    """Peak bytes allocated by ``n`` non-matching keystrokes beyond the bare loop's own."""
+    def empty(n):
+        for _ in range(n):
+            pass
+
+    return max(0, _peak_bytes(fn, n) - _peak_bytes(empty, n))
+
+
+class _Response:
+    status_code = 200
+    elapsed = timedelta(milliseconds=5)
+
+    def __init__(self, body: bytes):
+        self.content = body
+        self.text = body.decode()
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class _Session:
+    def __init__(self, body: bytes):
+        self.body = body
+
+    def post(self, url, files=None, data=None, timeout=None):
+        return _Response(self.body)
+
+    def close(self):
+        pass
+
+
+def bench_response(client, np):
+    out = {}
+    for words in RESPONSE_WORDS:
+        text = " ".join(["  dictated"] * words) + "\n"
+        body = json.dumps({"text": text}).encode()
+
+        def run(n, body=body):
+            client._session = _Session(body)
+            for _ in range(n):
+                client.transcribe_audio(b"")
+            client._session = None
+
+        out[f"response/{words}w"] = run
+    return out
+
+
+def bench_log(client, np):
+    import logging
+
+    import applog
+    import whispertype
+
+    log = whispertype.log
+
+    def run(n, verbose=False):
+        # Console sink to /dev/null. With verbose every record is formatted and
+        # written, but on the writer thread (stopped at exit by applog's atexit hook).
+        service = applog.logging_service()
+        if service is None or (service.ring.level == logging.DEBUG) != verbose:
+            applog.setup_logging(verbose=verbose, stream=open(os.devnull, "w"))
+        for i in range(n):
+            log.debug("[BENCH] block %d of %s", i, "capture")
+
+    return {"log/debug": run, "log/debug_verbose": lambda n: run(n, verbose=True)}
+
+
+def bench_models(client, np):
+    import atexit
+    import shutil
+    import struct
+    import tempfile
+
+    from model_catalog import GGML_MAGIC, ModelInventory, load_catalog
+
+    folder = tempfile.mkdtemp(prefix="whispertype-models-")
+    atexit.register(shutil.rmtree, folder, True)
+    # base.en f16 header followed by padding; only the header is ever read
+    header = struct.pack("<I11i", GGML_MAGIC, 51864, 1500, 512, 8, 6, 448, 512, 8, 6, 80, 1)
+    for i in range(MODEL_FILES):
+        with open(os.path.join(folder, f"ggml-model-{i:02d}.bin"), "wb") as f:
+            f.write(header + bytes(4096))
+    inventory = ModelInventory(folder)
+    inventory.refresh()
+
+    def poll(n):
+        for _ in range(n):
+            inventory.refresh()
+
+    def rescan(n):
+        for _ in range(n):
+            load_catalog(folder, inventory.catalog)
+
+    return {"models/poll": poll, "models/rescan": rescan}
+
+
+GROUPS = {
+    "callback": bench_callback,
+    "wav_encode": bench_wav_encode,
+    "key": bench_keys,
+    "response": bench_response,
+    "log": bench_log,
+    "models": bench_models,
+}
+
+
+def load_baseline() -> dict:
+    try:
+        with open(BASELINE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_baseline(baseline: dict) -> None:
+    tmp = BASELINE_FILE + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, indent=1, sort_keys=True)
+        f.write("\n")
+    os.replace(tmp, BASELINE_FILE)
+
+
+def compare(seconds: float, reference: float, entry: dict) -> Optional[float]:
+    """``seconds`` over the baseline entry's, scaled by how much slower the
+    reference loop ran; ``None`` without a baseline."""
+    base = entry.get("seconds")
+    if not base:
+        return None
+    ratio = seconds / base
+    if entry.get("reference"):
+        ratio /= reference / entry["reference"]
+    return ratio
+
+
+def format_time(seconds: float) -> str:
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:8.2f} ms"
+    if seconds >= 1e-6:
+        return f"{seconds * 1e6:8.2f} us"
+    return f"{seconds * 1e9:8.1f} ns"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--only", action="append", default=[], help="benchmark name prefix (repeatable)")
+    parser.add_argument("--repeat", type=int, default=7, help="minimum runs per benchmark")
+    parser.add_argument("--span", type=float, default=MIN_SPAN, help="minimum seconds per benchmark")
+    parser.add_argument("--tolerance", type=float, default=None, help=f"default {DEFAULT_TOLERANCE}")
+    parser.add_argument("--update-baseline", action="store_true", help="store these results as the baseline")
+    parser.add_argument("--json", action="store_true", help="one JSON object per line")
+    args = parser.parse_args()
+
+    import numpy as np
+
+    client = make_client(0, CorpusInput())
+    benches = {}
+    for build in GROUPS.values():
+        for name, fn in build(client, np).items():
+            if not args.only or any(name.startswith(o) for o in args.only):
+                benches[name] = fn
+
+    baseline = load_baseline()
+    failed = 0
+    for name, fn in benches.items():
+        if name == "key/alloc":
+            allocated = key_allocations(fn)
+            status = "FAIL" if allocated else "ok"
+            failed += status == "FAIL"
+            if args.json:
+                print(json.dumps({"name": name, "bytes": allocated, "status": status}))
+            else:
+                print(f"{name:<20} {allocated:8d} B   {'must be 0':<32} {status}")
+            continue
+        entry = baseline.get(name, {})
+        tolerance = args.tolerance or entry.get("tolerance", DEFAULT_TOLERANCE)
+        base = entry.get("seconds")
+        seconds, reference = measure(fn, args.repeat, args.span)
+        ratio = compare(seconds, reference, entry)
+        if ratio is not None and ratio > tolerance:
+            # A regression has to show twice; a slow phase rarely covers both spans.
+            again = measure(fn, args.repeat, args.span)
+            if compare(*again, entry) < ratio:
+                seconds, reference = again
+                ratio = compare(seconds, reference, entry)
+        status = "new" if ratio is None else ("FAIL" if ratio > tolerance else "ok")
+        failed += status == "FAIL"
+        if args.update_baseline:
+            baseline[name] = {
+                "seconds": seconds,
+                "reference": reference,
+                "tolerance": entry.get("tolerance", DEFAULT_TOLERANCE),
+            }
+        if args.json:
+            print(json.dumps({
+                "name": name,
+                "seconds": seconds,
+                "reference": reference,
+                "baseline": base,
+                "ratio": round(ratio, 3) if ratio else None,
+                "tolerance": tolerance,
+                "status": status,
+            }))
+        else:
+            vs = f"{ratio:5.2f}x baseline (max {tolerance:g}x)" if ratio else "no baseline"
+            print(f"{name:<20} {format_time(seconds)}  {vs:<32} {status}")
+    client.quit()
+    if args.update_baseline:
+        save_baseline(baseline)
+        print(f"Baseline written to {BASELINE_FILE}", file=sys.stderr)
+        return 0
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Shared whisper-server daemon check and benchmark (server_share.py), headless.
+
+Uses a private daemon socket in a temp folder and a stand-in whisper-server
+(a small Python HTTP server written to the temp folder), so no model or real
+server is needed:
+
+* ``--clients`` processes acquire the same model at once: exactly one daemon and
+  one server must start, and every client must get the same port
+* a client for another model on the same port must get its own server on
+  another port
+* the clients are killed with SIGKILL (Windows: terminated) one by one: the
+  server must keep running until the last one is gone, then be stopped, and
+  the daemon must exit after its idle timeout
+* ``cold``: acquire with no daemon running (daemon start + server launch)
+* ``join``: acquire of the already running server (what a second instance pays)
+
+    python benchmarks/shared_server.py --clients 8
+    python benchmarks/shared_server.py --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from _harness import alive, expect, fake_server_command, placeholder_models, scratch_folder, wait_for  # noqa: E402
+from e2e_pipeline import pct  # noqa: E402
+
+CLIENT = """\
+import sys, time
+sys.path.insert(0, {root!r})
+import server_share
+lease = server_share.acquire({command!r}, {model!r}, {port}, address={address!r})
+print(lease.port, lease.pid, flush=True)
+time.sleep(600)
+"""
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, default=6)
+    parser.add_argument("--joins", type=int, default=50, help="timed acquire/release of a running server")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    import server_share
+    from model_bench import find_free_port, probe_server
+
+    with scratch_folder("whispertype-serverd-") as folder:
+        address = os.path.join(folder, "serverd.sock") if os.name != "nt" else rf"\\.\pipe\whispertype-serverd-bench-{os.getpid()}"
+        command = fake_server_command(folder)
+        models = placeholder_models(folder)
+        port = find_free_port()
+        clients: list[subprocess.Popen] = []
+        leases = []
+        result = {"clients": args.clients}
+        try:
+            t0 = time.perf_counter()
+            lease = server_share.acquire(command, models[0], port, address=address)
+            result["cold_ms"] = round((time.perf_counter() - t0) * 1000.0, 1)
+            leases.append(lease)
+            expect(lease.launched and lease.port == port, f"first acquire: port {lease.port}, launched {lease.launched}")
+            expect(wait_for(lambda: probe_server(port), 10), "server did not come up")
+
+            joins = []
+            for _ in range(args.joins):
+                t0 = time.perf_counter()
+                extra = server_share.acquire(command, models[0], port, address=address)
+                joins.append(time.perf_counter() - t0)
+                expect(not extra.launched and extra.pid == lease.pid, "join started a second server")
+                extra.terminate()
+            result["join_ms"] = pct(joins)
+
+            code = CLIENT.format(root=ROOT, command=command, model=models[0], port=port, address=address)
+            clients = [subprocess.Popen([sys.executable, "-c", code], stdout=subprocess.PIPE, text=True)
+                       for _ in range(args.clients)]
+            answers = {clients[i].stdout.readline().strip() for i in range(args.clients)}
+            expect(answers == {f"{port} {lease.pid}"}, f"clients got {answers}, expected '{port} {lease.pid}'")
+            other = server_share.acquire(command, models[1], port, address=address)
+            leases.append(other)
+            expect(other.launched and other.port != port, f"second model: port {other.port}")
+            status = server_share.daemon_status(address)
+            result["launches"] = status["launches"]
+            expect(status["launches"] == 2, f"{status['launches']} launches for 2 models")
+            expect(sorted(s["clients"] for s in status["servers"]) == [1, args.clients + 1], f"status: {status}")
+
+            lease.terminate()
+            for client in clients[:-1]:
+                client.kill()
+                client.wait()
+            time.sleep(0.3)
+            expect(alive(lease.pid), "server stopped while a client still holds it")
+            clients[-1].kill()
+            clients[-1].wait()
+            expect(wait_for(lambda: not alive(lease.pid), 5), "server still running after its last client died")
+            other.terminate()
+            expect(wait_for(lambda: not alive(other.pid), 5), "second server still running after release")
+            daemon_pid = status["pid"]
+            t0 = time.perf_counter()
+            expect(wait_for(lambda: not alive(daemon_pid), server_share.IDLE_EXIT + 5), "daemon did not exit when idle")
+            result["idle_exit_s"] = round(time.perf_counter() - t0, 2)
+        except AssertionError as e:
+            print(f"FAIL: {e}", file=sys.stderr)
+            return 1
+        finally:
+            for client in clients:
+                if client.poll() is None:
+                    client.kill()
+            for lease in leases:
+                lease.terminate()
+
+    if args.json:
+        print(json.dumps(result))
+    else:
+        print(f"Sharing, refcounts and crash release OK; {args.clients} clients, {result['launches']} launches")
+        print(f"  cold acquire (daemon + server start) {result['cold_ms']:8.1f} ms")
+        j = result["join_ms"]
+        print(f"  join running server  p50 {j['p50']:8.3f} ms  p95 {j['p95']:8.3f} ms  p99 {j['p99']:8.3f} ms")
+        print(f"  daemon exit after last release {result['idle_exit_s']:.1f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
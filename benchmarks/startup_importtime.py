@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Startup import-time budget for WhisperType.
+
+Runs ``python -X importtime`` on the modules ``main()`` imports before the tray
+icon appears (whispertype + installer for environment_ok) and fails if
+
+* the cumulative import time exceeds the budget, or
+* a heavy module that must load lazily (numpy, sounddevice, requests, PIL,
+  pystray, pynput, pyautogui, pyperclip, tkinter) is imported eagerly.
+
+Works without audio hardware or a display. Exit status 0 = within budget.
+
+    python benchmarks/startup_importtime.py [--budget-ms 150] [--runs 5] [--json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STARTUP_MODULES = ("whispertype", "installer")
+LAZY_MODULES = (
+    "numpy",
+    "sounddevice",
+    "requests",
+    "PIL",
+    "pystray",
+    "pynput",
+    "pyautogui",
+    "pyperclip",
+    "tkinter",
+)
+
+
+def measure_once(
+    code: str = "import " + ", ".join(STARTUP_MODULES),
+) -> tuple[float, set[str], list[tuple[int, str]]]:
+    """Returns (total ms, top-level packages imported, [(cumulative us, module)])."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=REPO,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr else "import failed")
+    total_us = 0
+    imported: set[str] = set()
+    rows: list[tuple[int, str]] = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        module = name.strip()
+        imported.add(module.split(".")[0])
+        rows.append((int(cumulative), module))
+        if module in STARTUP_MODULES:
+            total_us += int(cumulative)
+    return total_us / 1000.0, imported, rows
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--budget-ms", type=float, default=150.0)
+    ap.add_argument("--runs", type=int, default=5, help="median of N fresh interpreters")
+    ap.add_argument("--json", action="store_true", help="machine-readable output")
+    args = ap.parse_args()
+
+    measure_once()  # warm the bytecode cache so compile time is not counted
+    _, _, interpreter_rows = measure_once("pass")
+    interpreter = {name for _, name in interpreter_rows}
+    totals = []
+    eager: set[str] = set()
+    rows: list[tuple[int, str]] = []
+    for _ in range(args.runs):
+        total, imported, rows = measure_once()
+        totals.append(total)
+        eager |= imported & set(LAZY_MODULES)
+    median = statistics.median(totals)
+    ok = median <= args.budget_ms and not eager
+    if args.json:
+        print(json.dumps({
+            "benchmark": "startup_importtime",
+            "median_ms": round(median, 2),
+            "runs_ms": [round(t, 2) for t in totals],
+            "budget_ms": args.budget_ms,
+            "eager_heavy_modules": sorted(eager),
+            "ok": ok,
+        }))
+    else:
+        print(f"startup imports: median {median:.1f} ms over {args.runs} runs (budget {args.budget_ms:.0f} ms)")
+        print("slowest modules (cumulative):")
+        ours = [(us, name) for us, name in rows if name not in interpreter]
+        for us, name in sorted(ours, reverse=True)[:10]:
+            print(f"  {us / 1000:8.1f} ms  {name}")
+        if eager:
+            print("FAIL: imported eagerly, must load on first use: " + ", ".join(sorted(eager)))
+        elif median > args.budget_ms:
+            print("FAIL: over budget")
+        else:
+            print("OK")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+Persisting config.ini without losing comments or crashing mid-write.
+
+Changes are applied to the file's text line by line: only the affected
+``key = value`` lines are rewritten (or added), so comments, blank lines,
+ordering and keys this version does not know about survive. Files are
+replaced atomically (temp file in the same folder, fsync, ``os.replace``),
+so a crash leaves either the old or the new config, never a truncated one.
+
+``ConfigWriter`` coalesces a burst of tray changes into one background write.
+"""
+
+from __future__ import annotations
+
+import configparser
+import logging
+import os
+import re
+import threading
+from typing import Optional
+
+log = logging.getLogger("whispertype.config")
+
+DEFAULT_DELAY = 0.5
+_SECTION_RE = re.compile(r"\s*\[([^\]]+)\]")
+_KEY_RE = re.compile(r"([^#;\s\[][^=:]*?)\s*[=:]\s*")
+
+
+def _format_value(value: str) -> str:
+    # configparser's multi-line form: continuation lines are indented.
+    return "\n\t".join(str(value).splitlines()) if value else ""
+
+
+def apply_changes(text: str, changes: dict[tuple[str, str], str]) -> str:
+    """``text`` with each ``(section, key) -> value`` set, everything else kept."""
+    lines = text.splitlines(keepends=True)
+    if lines and not lines[-1].endswith("\n"):
+        lines[-1] += "\n"
+    for (section, key), value in changes.items():
+        _set(lines, section, key, _format_value(value))
+    return "".join(lines)
+
+
+def _set(lines: list[str], section: str, key: str, value: str) -> None:
+    start = end = None
+    for i, line in enumerate(lines):
+        m = _SECTION_RE.match(line)
+        if not m:
+            continue
+        if start is not None:
+            end = i
+            break
+        if m.group(1).strip() == section:
+            start = i + 1
+    if start is None:
+        if lines and lines[-1].strip():
+            lines.append("\n")
+        lines.extend([f"[{section}]\n", f"{key} = {value}\n"])
+        return
+    if end is None:
+        end = len(lines)
+    wanted = key.lower()
+    for i in range(start, end):
+        m = _KEY_RE.match(lines[i])
+        if m and m.group(1).strip().lower() == wanted:
+            j = i + 1
+            while j < end and lines[j].strip() and lines[j][:1] in " \t":
+                j += 1  # continuation lines of the old value
+            lines[i:j] = [f"{lines[i][:m.end()]}{value}\n"]
+            return
+    last = max((i for i in range(start, end) if lines[i].strip()), default=start - 1)
+    lines.insert(last + 1, f"{key} = {value}\n")
+
+
+def write_atomic(path: str, text: str) -> None:
+    """Replace ``path`` with ``text`` so readers see the old or the new file, never a mix."""
+    folder = os.path.dirname(os.path.abspath(path))
+    tmp = os.path.join(folder, f".{os.path.basename(path)}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        mode = os.stat(path).st_mode & 0o777
+    except OSError:
+        mode = None
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        if mode is not None:
+            os.chmod(tmp, mode)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    if os.name != "nt":
+        try:
+            fd = os.open(folder, os.O_RDONLY)
+            try:
+                os.fsync(fd)  # make the rename itself durable
+            finally:
+                os.close(fd)
+        except OSError:
+            pass
+
+
+def _read_text(path: str) -> str:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+    except OSError:
+        return ""
+
+
+def save_config(path: str, cfg: configparser.ConfigParser, template: str = "") -> None:
+    """Write every value of ``cfg`` into ``path`` (or, if that is missing or empty, a
+    copy of ``template``), keeping the file's comments and keys ``cfg`` lacks."""
+    text = _read_text(path) or (_read_text(template) if template else "")
+    on_disk = configparser.RawConfigParser(strict=False)
+    on_disk.optionxform = cfg.optionxform
+    try:
+        on_disk.read_string(text)
+    except configparser.Error:
+        on_disk = configparser.RawConfigParser()
+    changes = {}
+    for section in cfg.sections():
+        for key in cfg.options(section):
+            if key in cfg.defaults():
+                continue
+            value = cfg.get(section, key, raw=True)
+            if on_disk.get(section, key, fallback=None) != value:
+                changes[(section, key)] = value
+    write_atomic(path, apply_changes(text, changes))
+
+
+class ConfigWriter:
+    """Coalesces ``set`` calls made within ``delay`` seconds into one background write."""
+
+    def __init__(self, path: str, template: str = "", delay: float = DEFAULT_DELAY) -> None:
+        self.path = path
+        self.template = template
+        self.delay = delay
+        self.writes = 0
+        self._pending: dict[tuple[str, str], str] = {}
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+    def set(self, section: str, key: str, value: str) -> None:
+        with self._lock:
+            self._pending[(section, key)] = value
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self) -> bool:
+        """Write pending changes now (also called on quit); False if the write failed."""
+        with self._lock:
+            changes, self._pending = self._pending, {}
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not changes:
+            return True
+        with self._write_lock:
+            text = _read_text(self.path) or (_read_text(self.template) if self.template else "")
+            try:
+                write_atomic(self.path, apply_changes(text, changes))
+            except OSError as e:
+                log.error("[CONFIG] Could not save %s: %s", self.path, e)
+                with self._lock:
+                    for k, v in changes.items():
+                        self._pending.setdefault(k, v)  # retried with the next change or flush
+                return False
+            self.writes += 1
+        log.debug("[CONFIG] Saved %d change(s) to %s", len(changes), self.path)
+        return True
@@ -0,0 +1,132 @@
+"""
+Watch config.ini and call back when its contents may have changed.
+
+On Linux the folder is watched with inotify (through ctypes, no extra
+dependency), which also catches editors and ``ConfigWriter`` that replace the
+file by renaming a temp file over it. Elsewhere, or if inotify is unavailable,
+the file's stat signature is polled. Bursts of events are debounced, and the
+callback only runs when (mtime, size, inode) actually changed.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+import threading
+from typing import Callable, Optional
+
+log = logging.getLogger("whispertype.config")
+
+POLL_INTERVAL = 1.0
+SETTLE_DELAY = 0.2
+
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_CLOEXEC = 0o2000000
+_EVENT = struct.Struct("iIII")
+
+
+def file_signature(path: str) -> Optional[tuple[int, int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+class _Inotify:
+    def __init__(self, folder: str) -> None:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        self.fd = libc.inotify_init1(IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_MODIFY
+        if libc.inotify_add_watch(self.fd, os.fsencode(folder), mask) < 0:
+            err = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(err, f"inotify_add_watch failed for {folder}")
+
+    def wait(self, name: bytes, timeout: float) -> bool:
+        """True if an event for ``name`` arrived within ``timeout`` seconds."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return False
+        data = os.read(self.fd, 64 * 1024)
+        offset = 0
+        hit = False
+        while offset + _EVENT.size <= len(data):
+            _wd, _mask, _cookie, length = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            if data[offset:offset + length].rstrip(b"\0") == name:
+                hit = True
+            offset += length
+        return hit
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class ConfigWatcher:
+    """Calls ``on_change()`` (from the watcher thread) after ``path`` changes."""
+
+    def __init__(self, path: str, on_change: Callable[[], None], interval: float = POLL_INTERVAL) -> None:
+        self.path = os.path.abspath(path)
+        self.on_change = on_change
+        self.interval = interval
+        self.method = ""
+        self._signature = file_signature(self.path)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="config-watch", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        inotify = None
+        if sys.platform.startswith("linux"):
+            try:
+                inotify = _Inotify(os.path.dirname(self.path))
+            except (OSError, AttributeError) as e:
+                log.debug("[CONFIG] inotify unavailable (%s), polling instead", e)
+        self.method = "inotify" if inotify else "polling"
+        log.debug("[CONFIG] Watching %s (%s)", self.path, self.method)
+        name = os.fsencode(os.path.basename(self.path))
+        try:
+            while not self._stop.is_set():
+                if inotify is not None:
+                    if not inotify.wait(name, self.interval):
+                        continue
+                    # Let the writer finish (truncate + write, or several renames).
+                    while inotify.wait(name, SETTLE_DELAY):
+                        pass
+                elif self._stop.wait(self.interval):
+                    break
+                self.check()
+        finally:
+            if inotify is not None:
+                inotify.close()
+
+    def check(self) -> bool:
+        """Run the callback if the file's signature changed since the last check."""
+        signature = file_signature(self.path)
+        if signature is None or signature == self._signature:
+            return False
+        self._signature = signature
+        try:
+            self.on_change()
+        except Exception as e:
+            log.error("[CONFIG] Reloading %s failed: %s", self.path, e)
+        return True
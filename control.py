@@ -0,0 +1,389 @@
+"""
+Local control API: drive WhisperType from scripts, foot pedals or Wayland
+sessions where global keyboard hooks do not work.
+
+Transport is ``multiprocessing.connection`` over a Unix domain socket (a named
+pipe on Windows), authenticated with a per-user key file. Messages are JSON
+objects sent with ``send_bytes``; nothing is unpickled. Requests::
+
+    {"cmd": "start"}                 begin recording (like the tray's Record item)
+    {"cmd": "stop"}                  stop and transcribe; the text arrives as an event
+    {"cmd": "cancel"}                stop and discard the audio
+    {"cmd": "status"}
+    {"cmd": "switch_model", "model": "ggml-base.en.bin"}
+    {"cmd": "subscribe"}             keep the connection open for events
+
+Each request gets one reply (``{"ok": true, ...}`` or ``{"ok": false, "error": ...}``).
+Subscribers then receive events such as ``{"event": "transcription", "text": ...}``.
+
+CLI::
+
+    python whispertype.py ctl start|stop|cancel|status|listen
+    python whispertype.py ctl stop --wait        # print the transcription
+    python whispertype.py ctl model ggml-base.en.bin
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import queue
+import secrets
+import socket
+import sys
+import tempfile
+import threading
+import time
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Callable, Optional
+
+KEY_FILE = "control.key"
+# Events a subscriber may fall behind by before it is dropped
+SUBSCRIBER_BACKLOG = 256
+
+
+def _runtime_dir() -> str:
+    if os.name == "nt":
+        return os.path.join(os.environ.get("LOCALAPPDATA") or os.path.expanduser("~"), "whispertype")
+    base = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return os.path.join(base, f"whispertype-{os.getuid()}")
+
+
+def default_address() -> str:
+    if os.name == "nt":
+        user = os.environ.get("USERNAME", "user")
+        return rf"\\.\pipe\whispertype-{user}"
+    return os.path.join(_runtime_dir(), "control.sock")
+
+
+def _family(address: str) -> str:
+    return "AF_PIPE" if address.startswith("\\\\") else "AF_UNIX"
+
+
+def load_authkey(create: bool = False) -> bytes:
+    """Per-user secret shared by the app and its clients (created 0600 by the app)."""
+    folder = _runtime_dir()
+    path = os.path.join(folder, KEY_FILE)
+    try:
+        with open(path, "rb") as f:
+            key = f.read().strip()
+        if key or not create:
+            return key
+    except OSError:
+        if not create:
+            raise
+    os.makedirs(folder, mode=0o700, exist_ok=True)
+    key = secrets.token_hex(32).encode()
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(key)
+    return key
+
+
+def _send(conn: Connection, obj: dict) -> None:
+    conn.send_bytes(json.dumps(obj).encode())
+
+
+def _recv(conn: Connection) -> dict:
+    msg = json.loads(conn.recv_bytes(64 * 1024))
+    if not isinstance(msg, dict):
+        raise ValueError("message is not a JSON object")
+    return msg
+
+
+class _Subscriber:
+    """An event connection with its own queue and writer thread, so a slow or
+    stuck reader never blocks ``publish()``."""
+
+    def __init__(self, conn: Connection, on_close: Callable[["_Subscriber"], None]) -> None:
+        self.conn = conn
+        self._on_close = on_close
+        self._queue: queue.Queue[Optional[bytes]] = queue.Queue(SUBSCRIBER_BACKLOG)
+        threading.Thread(target=self._write_loop, daemon=True).start()
+
+    def offer(self, data: bytes) -> bool:
+        """Queue ``data``; False if the subscriber is too far behind."""
+        try:
+            self._queue.put_nowait(data)
+            return True
+        except queue.Full:
+            return False
+
+    def close(self) -> None:
+        """Stop the writer; it closes the connection."""
+        try:
+            self._queue.put_nowait(None)
+        except queue.Full:
+            pass
+        if os.name == "nt":
+            self.conn.close()
+            return
+        try:
+            # Wakes a writer stuck in send_bytes to a reader that stopped reading.
+            with socket.socket(fileno=os.dup(self.conn.fileno())) as sock:
+                sock.shutdown(socket.SHUT_RDWR)
+        except (OSError, ValueError):
+            pass
+
+    def _write_loop(self) -> None:
+        while True:
+            data = self._queue.get()
+            if data is None:
+                break
+            try:
+                self.conn.send_bytes(data)
+            except OSError:
+                break
+        self.conn.close()
+        self._on_close(self)
+
+
+class ControlServer:
+    """Accepts control connections for one ``WhisperType`` and fans out its events."""
+
+    def __init__(self, app, address: str = "", authkey: Optional[bytes] = None) -> None:
+        self.app = app
+        self.address = address or default_address()
+        self.authkey = authkey if authkey is not None else load_authkey(create=True)
+        self.listener: Optional[Listener] = None
+        self._subscribers: list[_Subscriber] = []
+        self._lock = threading.Lock()
+        self._running = False
+        self.commands: dict[str, Callable[[dict], dict]] = {
+            "start": self._start,
+            "stop": self._stop,
+            "cancel": self._cancel,
+            "status": self._status,
+            "switch_model": self._switch_model,
+            "ping": lambda msg: {},
+        }
+
+    def start(self) -> None:
+        if _family(self.address) == "AF_UNIX":
+            os.makedirs(os.path.dirname(self.address), mode=0o700, exist_ok=True)
+            if os.path.exists(self.address):
+                if self._address_in_use():
+                    raise OSError(f"another WhisperType is listening on {self.address}")
+                os.remove(self.address)  # stale socket from a crash
+        self.listener = Listener(self.address, family=_family(self.address), authkey=self.authkey)
+        self._running = True
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+
+    def _address_in_use(self) -> bool:
+        try:
+            Client(self.address, family=_family(self.address), authkey=self.authkey).close()
+            return True
+        except (OSError, EOFError):
+            return False
+        except Exception:
+            return True  # something answered, just not with our key
+
+    def close(self) -> None:
+        self._running = False
+        with self._lock:
+            subscribers, self._subscribers = self._subscribers, []
+        for sub in subscribers:
+            sub.close()
+        if self.listener is not None:
+            self.listener.close()
+            self.listener = None
+
+    def publish(self, event: dict) -> None:
+        """Queue ``event`` for every subscriber; never waits on a socket. Subscribers
+        more than ``SUBSCRIBER_BACKLOG`` events behind are dropped."""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        if not subscribers:
+            return
+        data = json.dumps(event).encode()
+        for sub in subscribers:
+            if not sub.offer(data):
+                sub.close()
+                self._drop(sub)
+
+    def _drop(self, sub: _Subscriber) -> None:
+        with self._lock:
+            if sub in self._subscribers:
+                self._subscribers.remove(sub)
+
+    def _accept_loop(self) -> None:
+        while self._running:
+            try:
+                conn = self.listener.accept()
+            except Exception:
+                # Failed handshake (wrong key) or listener closed.
+                if not self._running:
+                    return
+                continue
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn: Connection) -> None:
+        try:
+            while True:
+                try:
+                    msg = _recv(conn)
+                except (EOFError, OSError):
+                    break
+                except ValueError as e:
+                    _send(conn, {"ok": False, "error": f"bad request: {e}"})
+                    continue
+                cmd = msg.get("cmd")
+                if cmd == "subscribe":
+                    _send(conn, {"ok": True})
+                    with self._lock:
+                        if self._running:
+                            self._subscribers.append(_Subscriber(conn, self._drop))
+                            return  # the connection now belongs to its writer thread
+                    break
+                handler = self.commands.get(cmd)
+                if handler is None:
+                    reply = {"ok": False, "error": f"unknown command: {cmd!r}"}
+                else:
+                    try:
+                        reply = {"ok": True, **handler(msg)}
+                    except Exception as e:
+                        reply = {"ok": False, "error": str(e)}
+                _send(conn, reply)
+        except OSError:
+            pass
+        conn.close()
+
+    # --- commands ----------------------------------------------------------------
+
+    def _start(self, msg: dict) -> dict:
+        app = self.app
+        if app.recording:
+            return {"recording": True, "already": True}
+        # Like the tray's Record item: releasing the hotkey modifiers does not stop it.
+        app.menu_recording = True
+        app.start_recording()
+        return {"recording": app.recording}
+
+    def _stop(self, msg: dict) -> dict:
+        app = self.app
+        if not app.recording:
+            return {"recording": False, "already": True}
+        app.menu_recording = False
+        # Transcription can take seconds; the result is published as an event.
+        threading.Thread(target=app.stop_recording, daemon=True).start()
+        return {"recording": False}
+
+    def _cancel(self, msg: dict) -> dict:
+        return {"cancelled": self.app.cancel_recording()}
+
+    def _status(self, msg: dict) -> dict:
+        app = self.app
+        return {
+            "recording": app.recording,
+            "server_running": app.server_running,
+            "server_ready": app.server_ready,
+            "idle_unloaded": app.idle_unloaded,
+            "model": os.path.basename(app.model_path),
+            "language": app.language,
+        }
+
+    def _switch_model(self, msg: dict) -> dict:
+        model = os.path.basename(str(msg.get("model") or ""))
+        if not model or not os.path.isfile(os.path.join(self.app.models_dir, model)):
+            raise ValueError(f"model not found in {self.app.models_dir}: {model!r}")
+        app = self.app
+
+        def switch():
+            # Restarting the server takes a while; subscribers hear when it is done.
+            app.change_model(model)
+            if app.tray_icon is not None:
+                app.tray_icon.update_menu()
+            self.publish({"event": "model_changed", "model": model})
+
+        threading.Thread(target=switch, daemon=True).start()
+        return {"model": model}
+
+
+class ControlClient:
+    """Blocking client; one request/reply at a time, or a stream of events."""
+
+    def __init__(self, address: str = "", authkey: Optional[bytes] = None) -> None:
+        self.address = address or default_address()
+        key = authkey if authkey is not None else load_authkey()
+        self.conn = Client(self.address, family=_family(self.address), authkey=key)
+
+    def request(self, cmd: str, **fields) -> dict:
+        _send(self.conn, {"cmd": cmd, **fields})
+        return _recv(self.conn)
+
+    def subscribe(self) -> None:
+        reply = self.request("subscribe")
+        if not reply.get("ok"):
+            raise RuntimeError(reply.get("error", "subscribe failed"))
+
+    def next_event(self, timeout: Optional[float] = None) -> Optional[dict]:
+        if timeout is not None and not self.conn.poll(timeout):
+            return None
+        return _recv(self.conn)
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+def ctl_main(argv: list[str]) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="whispertype.py ctl", description="Control a running WhisperType.")
+    parser.add_argument("command", choices=("start", "stop", "cancel", "status", "model", "listen", "toggle"))
+    parser.add_argument("model", nargs="?", help="model file name (for 'model')")
+    parser.add_argument("--wait", action="store_true", help="stop: wait for and print the transcription")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--address", default="", help=f"default: {default_address()}")
+    parser.add_argument("--json", action="store_true", help="print replies/events as JSON")
+    args = parser.parse_args(argv)
+
+    try:
+        client = ControlClient(args.address)
+    except (OSError, EOFError) as e:
+        print(f"WhisperType is not running (or its control socket is unavailable): {e}", file=sys.stderr)
+        return 2
+
+    try:
+        if args.command == "listen":
+            client.subscribe()
+            while True:
+                print(json.dumps(client.next_event()), flush=True)
+        if args.command == "toggle":
+            args.command = "stop" if client.request("status").get("recording") else "start"
+        events = None
+        if args.command == "stop" and args.wait:
+            events = ControlClient(args.address)
+            events.subscribe()
+        if args.command == "model":
+            if not args.model:
+                parser.error("model needs a model file name")
+            reply = client.request("switch_model", model=args.model)
+        else:
+            reply = client.request(args.command)
+        if not reply.get("ok"):
+            print(reply.get("error", "failed"), file=sys.stderr)
+            return 1
+        if events is not None:
+            deadline = time.monotonic() + args.timeout
+            while time.monotonic() < deadline:
+                event = events.next_event(timeout=deadline - time.monotonic())
+                if event and event.get("event") in ("transcription", "transcription_failed"):
+                    if args.json:
+                        print(json.dumps(event))
+                    elif event.get("text"):
+                        print(event["text"])
+                    return 0 if event.get("text") else 1
+            print("Timed out waiting for the transcription", file=sys.stderr)
+            return 1
+        if args.json or args.command == "status":
+            reply.pop("ok", None)
+            print(json.dumps(reply, indent=None if args.json else 1))
+        return 0
+    except KeyboardInterrupt:
+        return 130
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    sys.exit(ctl_main(sys.argv[1:]))
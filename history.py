@@ -0,0 +1,327 @@
+"""
+Local history of transcriptions (SQLite, full-text indexed with FTS5).
+
+Every dictation is appended with its model, language, audio length and
+per-stage latency. If ``[History] keep_audio`` is set, the audio is stored too,
+with leading and trailing silence trimmed. Nothing is ever updated in place.
+The app never waits on the database: ``add`` queues the entry, and a writer
+thread commits queued entries in batches. The tray keeps the most recent
+entries in memory for its "Recent transcriptions" menu.
+
+CLI::
+
+    python whispertype.py history                  # latest entries
+    python whispertype.py history meeting budget   # full-text search, newest first
+    python whispertype.py history --since 30 --json "follow up"
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import platform
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Optional
+
+log = logging.getLogger("whispertype.history")
+
+DB_NAME = "history.db"
+SCHEMA_VERSION = 1
+BATCH_DELAY = 1.0
+RECENT_SIZE = 10
+# Audio kept around speech when trimming silence
+_TRIM_FRAME_S = 0.02
+_TRIM_PAD_S = 0.2
+_TRIM_FLOOR_DB = -45.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS transcriptions (
+    id INTEGER PRIMARY KEY,
+    created REAL NOT NULL,
+    text TEXT NOT NULL,
+    model TEXT NOT NULL DEFAULT '',
+    language TEXT NOT NULL DEFAULT '',
+    audio_seconds REAL,
+    stages TEXT NOT NULL DEFAULT '{}'
+);
+CREATE INDEX IF NOT EXISTS transcriptions_created ON transcriptions(created);
+CREATE TABLE IF NOT EXISTS audio (
+    id INTEGER PRIMARY KEY REFERENCES transcriptions(id),
+    wav BLOB NOT NULL
+);
+"""
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS transcriptions_fts
+    USING fts5(text, content='transcriptions', content_rowid='id');
+CREATE TRIGGER IF NOT EXISTS transcriptions_fts_insert AFTER INSERT ON transcriptions BEGIN
+    INSERT INTO transcriptions_fts(rowid, text) VALUES (new.id, new.text);
+END;
+"""
+
+
+def default_history_path() -> str:
+    sysname = platform.system().lower()
+    if sysname == "windows":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+        return os.path.join(base, "whispertype", DB_NAME)
+    if sysname == "darwin":
+        return os.path.expanduser(f"~/Library/Application Support/whispertype/{DB_NAME}")
+    return os.path.expanduser(f"~/.local/share/whispertype/{DB_NAME}")
+
+
+@dataclass(frozen=True)
+class Entry:
+    id: int
+    created: float
+    text: str
+    model: str = ""
+    language: str = ""
+    audio_seconds: Optional[float] = None
+    stages: dict = field(default_factory=dict)
+
+    def label(self, width: int = 60) -> str:
+        """One line for menus: ``14:03  text...``."""
+        text = " ".join(self.text.split())
+        if len(text) > width:
+            text = text[:width - 1] + "…"
+        return f"{time.strftime('%H:%M', time.localtime(self.created))}  {text}"
+
+
+def _entry(row) -> Entry:
+    id_, created, text, model, language, seconds, stages = row
+    try:
+        stages = json.loads(stages) if stages else {}
+    except ValueError:
+        stages = {}
+    return Entry(id_, created, text, model, language, seconds, stages)
+
+
+def _connect(path: str, readonly: bool = False) -> sqlite3.Connection:
+    if readonly:
+        return sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), mode=0o700, exist_ok=True)
+    if os.name != "nt":
+        # Private like the control key: SQLite gives -wal/-shm the db file's mode.
+        os.close(os.open(path, os.O_WRONLY | os.O_CREAT, 0o600))
+        for name in (path, f"{path}-wal", f"{path}-shm"):
+            try:
+                os.chmod(name, 0o600)
+            except FileNotFoundError:
+                pass
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")  # the CLI can read while the app writes
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def _has_fts(conn: sqlite3.Connection) -> bool:
+    row = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'transcriptions_fts'").fetchone()
+    return row is not None
+
+
+def open_db(path: str) -> tuple[sqlite3.Connection, bool]:
+    """Writable connection with the schema in place; the flag says whether FTS5 is on."""
+    conn = _connect(path)
+    conn.executescript(_SCHEMA)
+    try:
+        conn.executescript(_FTS_SCHEMA)
+    except sqlite3.OperationalError as e:
+        # SQLite built without FTS5: history still works, search falls back to LIKE.
+        log.debug("[HISTORY] Full-text index unavailable (%s)", e)
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    conn.commit()
+    return conn, _has_fts(conn)
+
+
+def fts_query(text: str) -> str:
+    """Plain words -> an FTS5 query matching all of them (the last one as a prefix)."""
+    words = ['"%s"' % w.replace('"', '""') for w in text.split()]
+    if words:
+        words[-1] += "*"
+    return " ".join(words)
+
+
+def trim_silence(wav: bytes) -> bytes:
+    """16-bit mono WAV with leading and trailing silence cut (a little padding kept)."""
+    import numpy as np
+    from audio_spill import wav_header
+
+    if len(wav) <= 44 or wav[:4] != b"RIFF":
+        return wav
+    rate = int.from_bytes(wav[24:28], "little")
+    pcm = np.frombuffer(wav, dtype="<i2", offset=44, count=(len(wav) - 44) // 2)
+    frame = max(1, int(rate * _TRIM_FRAME_S))
+    n = len(pcm) // frame
+    if not n:
+        return wav
+    frames = pcm[:n * frame].reshape(n, frame).astype(np.float32) / 32768.0
+    rms = np.sqrt((frames * frames).mean(axis=1))
+    loud = np.nonzero(rms > 10 ** (_TRIM_FLOOR_DB / 20.0))[0]
+    if not len(loud):
+        return wav[:44]  # silence only: keep the header, drop the samples
+    pad = int(_TRIM_PAD_S / _TRIM_FRAME_S)
+    start = max(0, loud[0] - pad) * frame
+    end = min(len(pcm), (loud[-1] + 1 + pad) * frame)
+    return wav_header(end - start, rate) + pcm[start:end].tobytes()
+
+
+class HistoryStore:
+    """Append-only history; ``add`` is non-blocking, a writer thread batches commits."""
+
+    def __init__(self, path: str = "", keep_audio: bool = False, batch_delay: float = BATCH_DELAY) -> None:
+        self.path = path or default_history_path()
+        self.keep_audio = keep_audio
+        self.batch_delay = batch_delay
+        self.written = 0
+        self.commits = 0
+        self.recent: deque[Entry] = deque(maxlen=RECENT_SIZE)
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._conn, self.fts = open_db(self.path)
+        rows = self._conn.execute(
+            "SELECT id, created, text, model, language, audio_seconds, stages "
+            "FROM transcriptions ORDER BY id DESC LIMIT ?", (RECENT_SIZE,)
+        ).fetchall()
+        self.recent.extend(_entry(row) for row in reversed(rows))
+        self._thread = threading.Thread(target=self._run, name="history-writer", daemon=True)
+        self._thread.start()
+
+    def add(self, text: str, model: str = "", language: str = "", audio_seconds: Optional[float] = None,
+            stages: Optional[dict] = None, wav: Optional[bytes] = None) -> None:
+        """Queue one transcription (``wav`` only kept with ``keep_audio``)."""
+        created = time.time()
+        stages = stages or {}
+        # id is assigned on commit; the menu only needs text and time
+        self.recent.append(Entry(0, created, text, model, language, audio_seconds, stages))
+        self._queue.put((created, text, model, language, audio_seconds, json.dumps(stages),
+                         wav if self.keep_audio else None))
+
+    def close(self) -> None:
+        """Commit what is queued and stop the writer."""
+        self._queue.put(None)
+        self._thread.join(timeout=10)
+
+    def _run(self) -> None:
+        conn = self._conn
+        while True:
+            item = self._queue.get()
+            batch = []
+            deadline = time.monotonic() + self.batch_delay
+            while item is not None:
+                batch.append(item)
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+            if batch:
+                self._write(conn, batch)
+            if item is None:
+                conn.close()
+                return
+
+    def _write(self, conn: sqlite3.Connection, batch: list) -> None:
+        try:
+            with conn:  # one transaction per batch
+                for created, text, model, language, seconds, stages, wav in batch:
+                    cur = conn.execute(
+                        "INSERT INTO transcriptions (created, text, model, language, audio_seconds, stages) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (created, text, model, language, seconds, stages),
+                    )
+                    if wav:
+                        conn.execute("INSERT INTO audio (id, wav) VALUES (?, ?)", (cur.lastrowid, trim_silence(wav)))
+        except sqlite3.Error as e:
+            log.error("[HISTORY] Could not save %d transcription(s): %s", len(batch), e)
+            return
+        self.written += len(batch)
+        self.commits += 1
+
+
+def search(path: str, query: str = "", limit: int = 20, since: Optional[float] = None,
+           conn: Optional[sqlite3.Connection] = None) -> list[Entry]:
+    """Newest entries first; ``query`` matches all its words (full-text when available)."""
+    own = conn is None
+    if own:
+        conn = _connect(path, readonly=True)
+    try:
+        sql = "SELECT t.id, t.created, t.text, t.model, t.language, t.audio_seconds, t.stages FROM transcriptions t"
+        where, args = [], []
+        words = query.split()
+        if words and _has_fts(conn):
+            # Walk the index newest first (ids only grow), so common words stop after `limit` hits.
+            sql += " JOIN transcriptions_fts f ON f.rowid = t.id"
+            where.append("transcriptions_fts MATCH ?")
+            args.append(fts_query(query))
+            order = "f.rowid"
+        else:
+            for word in words:
+                where.append("t.text LIKE ? ESCAPE '\\'")
+                args.append("%" + word.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%")
+            order = "t.id"
+        if since is not None:
+            where.append("t.created >= ?")
+            args.append(since)
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY {order} DESC LIMIT ?"
+        return [_entry(row) for row in conn.execute(sql, (*args, limit))]
+    finally:
+        if own:
+            conn.close()
+
+
+def history_main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="whispertype.py history",
+        description="List or full-text search past transcriptions, newest first.",
+    )
+    parser.add_argument("query", nargs="*", help="words that must all appear (last one may be a prefix)")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--since", type=float, default=None, metavar="DAYS", help="only the last DAYS days")
+    parser.add_argument("--db", default="", help=f"history database (default: [History] path or {default_history_path()})")
+    parser.add_argument("--json", action="store_true", help="one JSON object per entry")
+    args = parser.parse_args(argv)
+
+    path = args.db
+    if not path:
+        from whispertype import ensure_config_file
+
+        config = ensure_config_file()
+        configured = config.get("History", "path", fallback="", raw=True).strip() if config is not None else ""
+        path = os.path.expanduser(os.path.expandvars(configured)) if configured else default_history_path()
+    if not os.path.exists(path):
+        print(f"No history yet ({path})", file=sys.stderr)
+        return 1
+    since = time.time() - args.since * 86400 if args.since is not None else None
+    try:
+        entries = search(path, " ".join(args.query), args.limit, since)
+    except sqlite3.Error as e:
+        print(f"history: {e}", file=sys.stderr)
+        return 1
+    for entry in entries:
+        if args.json:
+            print(json.dumps({
+                "id": entry.id,
+                "time": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(entry.created)),
+                "text": entry.text,
+                "model": entry.model,
+                "language": entry.language,
+                "audio_seconds": entry.audio_seconds,
+                "stages": entry.stages,
+            }, ensure_ascii=False))
+        else:
+            when = time.strftime("%Y-%m-%d %H:%M", time.localtime(entry.created))
+            seconds = f"{entry.audio_seconds:5.1f}s" if entry.audio_seconds is not None else "     -"
+            print(f"{when}  {seconds}  {entry.model:<24}  {entry.text}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(history_main(sys.argv[1:]))
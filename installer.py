@@ -11,20 +11,30 @@ Releases API: https://github.com/ggml-org/whisper.cpp/releases
 from __future__ import annotations
 
 import configparser
+import hashlib
+import io
 import os
+import re
 import platform
 import shutil
+import subprocess
 import sys
 import tempfile
 import threading
+import time
 import zipfile
+from collections import deque
 from typing import Callable, Optional
 
 # Ensure $HOME is defined on Windows so os.path.expandvars("${HOME}/...")
 # works identically on all platforms.
 os.environ.setdefault("HOME", os.path.expanduser("~"))
 
-import requests
+# requests is imported inside the download helpers: whispertype imports this
+# module at startup only for environment_ok(), which needs none of it.
+from config_store import save_config
+from model_catalog import format_size, load_catalog, suggest_default
+from model_store import find_in_stores, link_file, stores_from_config, writable_store
 
 # GGML model IDs (same set as upstream download-ggml-model.sh)
 GGML_MODELS = """
@@ -52,7 +62,9 @@ INTRO_TEXT = (
     "(2) at least one GGML model file (.bin) on disk.\n\n"
     "Step 1: choose how to get the binary (Windows can download a release zip). "
     "Step 2: set the models folder; download models here if needed, or skip if you already have .bin files. "
-    "Step 3: pick the default model WhisperType starts with. "
+    "Step 3 (optional): quantize a full-precision model locally. "
+    "Step 4 (optional): benchmark the installed models on this machine. "
+    "Step 5: pick the default model WhisperType starts with. "
     "Nothing is written to config.ini until you click Save on the last step — when every requirement is met."
 )
 
@@ -105,9 +117,20 @@ def list_bin_models(models_dir: str) -> list[str]:
         return []
 
 
-def pick_suggested_default(bins: list[str], previous: str) -> str:
+def pick_suggested_default(
+    bins: list[str], previous: str, models_dir: str = "", language: str = "en"
+) -> str:
+    """Keep ``previous`` if present, else pick from header metadata (see model_catalog).
+
+    Falls back to a fixed preference list by filename when no header is readable.
+    """
     if previous in bins:
         return previous
+    if models_dir:
+        catalog = {k: v for k, v in load_catalog(models_dir).items() if k in bins}
+        pick = suggest_default(catalog, language)
+        if pick:
+            return pick
     for candidate in (
         "ggml-base.en.bin",
         "ggml-small.en.bin",
@@ -212,6 +235,8 @@ def hf_ggml_url(model: str) -> str:
 
 
 def fetch_latest_releases(max_releases: int = 8) -> list[dict]:
+    import requests
+
     r = requests.get(
         GITHUB_RELEASES_API,
         params={"per_page": max_releases},
@@ -242,13 +267,188 @@ def pick_windows_asset(assets: list[dict], prefer_blas: bool) -> Optional[dict]:
     return None
 
 
-def find_whisper_server_under(root: str) -> Optional[str]:
-    """Locate whisper-server / whisper-server.exe under extracted tree."""
-    exe = "whisper-server.exe" if platform.system().lower() == "windows" else "whisper-server"
-    for dirpath, _dirnames, filenames in os.walk(root):
-        if exe in filenames:
-            return os.path.join(dirpath, exe)
-    return None
+def server_exe_name() -> str:
+    return "whisper-server.exe" if platform.system().lower() == "windows" else "whisper-server"
+
+
+# whisper.cpp's quantize tool, under its current and older name (without .exe)
+QUANTIZE_TOOL_NAMES = ("whisper-quantize", "quantize")
+
+
+def select_server_members(names: list[str]) -> tuple[Optional[str], list[str]]:
+    """Pick whisper-server, the quantize tool and the shared libraries next to
+    them from a zip listing.
+
+    Returns ``(server_member, members_to_extract)``; the server member is ``None``
+    when the archive does not contain one.
+    """
+    exe = server_exe_name()
+    server = next((n for n in names if n.rsplit("/", 1)[-1] == exe), None)
+    if server is None:
+        return None, []
+    folder = server.rsplit("/", 1)[0] if "/" in server else ""
+    suffix = exe[len("whisper-server"):]
+    tools = {name + suffix for name in QUANTIZE_TOOL_NAMES}
+    extra = []
+    for n in names:
+        parent, _, base = n.rpartition("/")
+        low = base.lower()
+        if parent == folder and (
+            base in tools or low.endswith((".dll", ".so", ".dylib")) or ".so." in low
+        ):
+            extra.append(n)
+    return server, [server] + extra
+
+
+# Block size for HTTP range reads; large enough that zipfile's small header
+# reads are served from the buffer instead of one request each.
+ZIP_RANGE_BLOCK = 1024 * 1024
+# Release zips below this size are kept in RAM when the host ignores Range.
+ZIP_SPOOL_MAX = 64 * 1024 * 1024
+
+
+class HttpRangeReader(io.RawIOBase):
+    """Seekable read-only view of a remote file backed by HTTP Range requests."""
+
+    def __init__(
+        self,
+        session,
+        url: str,
+        size: int,
+        progress: Optional[Callable[[int, int], None]] = None,
+        cancel: Optional[threading.Event] = None,
+    ) -> None:
+        super().__init__()
+        self._session = session
+        self._url = url
+        self._size = size
+        self._pos = 0
+        self._progress = progress
+        self._cancel = cancel
+        self.fetched = 0
+        # Bytes we expect to fetch in total; refined once the zip index is known.
+        self.expected = size
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            self._pos = offset
+        elif whence == io.SEEK_CUR:
+            self._pos += offset
+        elif whence == io.SEEK_END:
+            self._pos = self._size + offset
+        else:
+            raise ValueError(f"invalid whence ({whence})")
+        return self._pos
+
+    def readinto(self, b) -> int:
+        if self._cancel is not None and self._cancel.is_set():
+            raise InterruptedError("Download cancelled.")
+        if self._pos >= self._size or not len(b):
+            return 0
+        end = min(self._pos + len(b), self._size) - 1
+        r = self._session.get(
+            self._url,
+            headers={"Range": f"bytes={self._pos}-{end}"},
+            timeout=120,
+        )
+        r.raise_for_status()
+        if r.status_code != 206:
+            raise OSError("Server ignored the Range header")
+        data = r.content
+        n = len(data)
+        b[:n] = data
+        self._pos += n
+        self.fetched += n
+        if self._progress is not None:
+            self._progress(min(self.fetched, self.expected), self.expected)
+        return n
+
+
+def _spool_download(
+    session,
+    url: str,
+    progress: Optional[Callable[[int, int], None]] = None,
+    cancel: Optional[threading.Event] = None,
+):
+    """Fallback when Range is unsupported: stream into a spooled temp file."""
+    spool = tempfile.SpooledTemporaryFile(max_size=ZIP_SPOOL_MAX)
+    try:
+        with session.get(url, stream=True, timeout=120) as r:
+            r.raise_for_status()
+            total = int(r.headers.get("content-length", 0) or 0)
+            done = 0
+            for chunk in r.iter_content(chunk_size=256 * 1024):
+                if cancel is not None and cancel.is_set():
+                    raise InterruptedError("Download cancelled.")
+                if chunk:
+                    spool.write(chunk)
+                    done += len(chunk)
+                    if progress is not None:
+                        progress(done, total)
+        spool.seek(0)
+        return spool
+    except BaseException:
+        spool.close()
+        raise
+
+
+def extract_server_from_zip_url(
+    url: str,
+    dest_dir: str,
+    progress: Optional[Callable[[int, int], None]] = None,
+    cancel: Optional[threading.Event] = None,
+) -> Optional[str]:
+    """Extract only whisper-server, the quantize tool and their DLLs from a
+    remote release zip.
+
+    The zip's central directory is read with HTTP Range requests, so only the
+    index and the selected members are transferred; hosts without Range support
+    fall back to a spooled in-memory/temp stream. Nothing is written to disk
+    except the extracted members. Returns the path of the extracted server
+    (known from the archive index), or ``None`` if the zip does not contain one.
+    Raises InterruptedError if cancelled.
+    """
+    import requests
+
+    with requests.Session() as session:
+        head = session.head(url, allow_redirects=True, timeout=30)
+        head.raise_for_status()
+        size = int(head.headers.get("content-length", 0) or 0)
+        ranged = size > 0 and head.headers.get("accept-ranges", "").lower() == "bytes"
+        raw: Optional[HttpRangeReader] = None
+        if ranged:
+            raw = HttpRangeReader(session, head.url, size, progress=progress, cancel=cancel)
+            src = io.BufferedReader(raw, buffer_size=ZIP_RANGE_BLOCK)
+        else:
+            src = _spool_download(session, url, progress=progress, cancel=cancel)
+        with src, zipfile.ZipFile(src) as z:
+            server, members = select_server_members(z.namelist())
+            if server is None:
+                return None
+            if raw is not None:
+                raw.expected = min(
+                    size,
+                    raw.fetched + sum(z.getinfo(m).compress_size for m in members) + ZIP_RANGE_BLOCK,
+                )
+            server_path = None
+            for m in members:
+                if cancel is not None and cancel.is_set():
+                    raise InterruptedError("Extract cancelled.")
+                out = z.extract(m, dest_dir)
+                if m == server:
+                    server_path = out
+            if raw is not None and progress is not None:
+                progress(raw.expected, raw.expected)
+            return server_path
 
 
 def download_file_cancellable(
@@ -256,8 +456,14 @@ def download_file_cancellable(
     dest: str,
     progress: Optional[Callable[[int, int], None]] = None,
     cancel: Optional[threading.Event] = None,
+    hasher=None,
 ) -> None:
-    """Stream download; set cancel to abort. Raises InterruptedError if cancelled."""
+    """Stream download; set cancel to abort. Raises InterruptedError if cancelled.
+
+    If ``hasher`` (a hashlib object) is given it is fed every chunk as it arrives.
+    """
+    import requests
+
     tmp = dest + ".part"
     try:
         with requests.get(url, stream=True, timeout=120) as r:
@@ -270,6 +476,8 @@ def download_file_cancellable(
                         raise InterruptedError("Download cancelled.")
                     if chunk:
                         f.write(chunk)
+                        if hasher is not None:
+                            hasher.update(chunk)
                         done += len(chunk)
                         if progress is not None:
                             progress(done, total)
@@ -291,19 +499,189 @@ def download_file_cancellable(
                 pass
 
 
-def extract_zip(zip_path: str, dest_dir: str, cancel: Optional[threading.Event] = None) -> None:
-    if cancel is not None and cancel.is_set():
-        raise InterruptedError("Cancelled before extract.")
-    with zipfile.ZipFile(zip_path, "r") as z:
-        for info in z.infolist():
+def remote_sha256(url: str) -> Optional[str]:
+    """SHA-256 Hugging Face advertises for an LFS file (``X-Linked-Etag``), if any."""
+    import requests
+
+    try:
+        r = requests.head(url, allow_redirects=False, timeout=30)
+    except requests.RequestException:
+        return None
+    for header in ("x-linked-etag", "etag"):
+        tag = r.headers.get(header, "").strip().strip('"').lower()
+        if re.fullmatch(r"[0-9a-f]{64}", tag):
+            return tag
+    return None
+
+
+def fetch_model_via_store(
+    url: str,
+    filename: str,
+    models_dir: str,
+    stores: list,
+    progress: Optional[Callable[[int, int], None]] = None,
+    cancel: Optional[threading.Event] = None,
+) -> str:
+    """Place ``filename`` in models_dir, downloading into the model store only if needed.
+
+    The stores are checked first by the content hash the server reports, then by
+    filename. Returns ``"store"`` when an existing object was linked, ``"download"``
+    otherwise. Raises InterruptedError if cancelled.
+    """
+    dest = os.path.join(models_dir, filename)
+    digest = remote_sha256(url)
+    hit = find_in_stores(stores, digest=digest, filename=None if digest else filename)
+    if hit:
+        link_file(hit, dest)
+        return "store"
+    store = writable_store(stores)
+    if store is None:
+        download_file_cancellable(url, dest, progress=progress, cancel=cancel)
+        return "download"
+    incoming = store.incoming_path(filename)
+    hasher = hashlib.sha256()
+    download_file_cancellable(url, incoming, progress=progress, cancel=cancel, hasher=hasher)
+    got = hasher.hexdigest()
+    if digest and got != digest:
+        os.remove(incoming)
+        raise OSError(f"Checksum mismatch for {filename}")
+    link_file(store.add(incoming, filename, got), dest)
+    return "download"
+
+
+QUANT_TYPES = ("q5_0", "q5_1", "q8_0", "q4_0", "q4_1")
+# Approximate bits per weight after quantization (for progress estimates)
+_QUANT_BITS = {"q4_0": 4.5, "q4_1": 5.0, "q5_0": 5.5, "q5_1": 6.0, "q8_0": 8.5}
+
+
+def find_quantize_tool(server_exe: str) -> Optional[str]:
+    """whisper.cpp's quantize tool next to whisper-server (``whisper-quantize`` or older ``quantize``)."""
+    resolved = shutil.which(server_exe) or server_exe
+    if not resolved:
+        return None
+    folder = os.path.dirname(os.path.abspath(resolved))
+    suffix = ".exe" if platform.system().lower() == "windows" else ""
+    for name in QUANTIZE_TOOL_NAMES:
+        cand = os.path.join(folder, name + suffix)
+        if os.path.isfile(cand):
+            return cand
+    return None
+
+
+def quantizable_models(models_dir: str) -> list[str]:
+    """Models quantize accepts as input: full-precision (f16/f32) GGML whisper files."""
+    catalog = load_catalog(models_dir)
+    return sorted(n for n, m in catalog.items() if m.valid and m.quant in ("f16", "f32"))
+
+
+def quantized_name(model_name: str, qtype: str) -> str:
+    """``ggml-small.en.bin`` -> ``ggml-small.en-q5_0.bin`` (upstream naming)."""
+    stem = model_name[:-4] if model_name.endswith(".bin") else model_name
+    return f"{stem}-{qtype}.bin"
+
+
+def quantize_model(
+    tool: str,
+    src: str,
+    dest: str,
+    qtype: str,
+    progress: Optional[Callable[[int, int], None]] = None,
+    cancel: Optional[threading.Event] = None,
+) -> None:
+    """Run whisper.cpp quantize on ``src``; progress is estimated from the output size.
+
+    Raises InterruptedError if cancelled (partial output removed) and RuntimeError
+    with the tool's last output lines if it fails.
+    """
+    info = load_catalog(os.path.dirname(src)).get(os.path.basename(src))
+    src_bits = info.bits if info and info.valid else 16.0
+    expected = int(os.path.getsize(src) * _QUANT_BITS.get(qtype, 8.0) / src_bits)
+    tmp = dest + ".part"
+    tail: deque[str] = deque(maxlen=20)
+    proc = subprocess.Popen(
+        [tool, src, tmp, qtype],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        errors="replace",
+    )
+    reader = threading.Thread(target=lambda: tail.extend(proc.stdout), daemon=True)
+    reader.start()
+    try:
+        while proc.poll() is None:
             if cancel is not None and cancel.is_set():
-                raise InterruptedError("Extract cancelled.")
-            z.extract(info, dest_dir)
+                proc.terminate()
+                proc.wait()
+                raise InterruptedError("Quantization cancelled.")
+            if progress is not None:
+                try:
+                    done = os.path.getsize(tmp)
+                except OSError:
+                    done = 0
+                progress(min(done, expected), expected)
+            time.sleep(0.2)
+        reader.join(timeout=2)
+        if proc.returncode != 0 or not os.path.isfile(tmp):
+            raise RuntimeError(
+                f"quantize exited with code {proc.returncode}:\n" + "".join(tail).strip()
+            )
+        os.replace(tmp, dest)
+        if progress is not None:
+            progress(expected, expected)
+    finally:
+        if os.path.isfile(tmp):
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
 
 
-def save_config(path: str, cfg: configparser.ConfigParser) -> None:
-    with open(path, "w") as f:
-        cfg.write(f)
+def quantize_main(argv: list[str]) -> None:
+    """``installer.py quantize MODEL TYPE [--config PATH] [--no-bench]``"""
+    import argparse
+
+    from model_bench import benchmark_models, format_results
+
+    ap = argparse.ArgumentParser(prog="installer.py quantize", description="Quantize a GGML model.")
+    ap.add_argument("model", help="source .bin (path, or file name inside models_dir)")
+    ap.add_argument("type", choices=QUANT_TYPES)
+    ap.add_argument("--config", default=os.path.join(config_dir(), "config.ini"))
+    ap.add_argument("--no-bench", action="store_true", help="skip the source/result benchmark")
+    args = ap.parse_args(argv)
+
+    cfg = configparser.ConfigParser(interpolation=configparser.ExtendedInterpolation())
+    cfg.read(args.config)
+    cmd = cfg.get("Server", "command", fallback="", raw=True)
+    exe = parse_server_command(cmd) if cmd else None
+    tool = find_quantize_tool(exe or "")
+    if not tool:
+        print("whisper-quantize not found next to whisper-server from Server.command", file=sys.stderr)
+        sys.exit(1)
+    src = args.model
+    if not os.path.isfile(src):
+        raw = cfg.get("Models", "models_dir", fallback="", raw=True)
+        src = os.path.join(os.path.expanduser(os.path.expandvars(raw)), args.model)
+    if not os.path.isfile(src):
+        print(f"Model not found: {args.model}", file=sys.stderr)
+        sys.exit(1)
+    dest = os.path.join(os.path.dirname(src), quantized_name(os.path.basename(src), args.type))
+
+    def prog(done: int, total: int) -> None:
+        pct = 100 * done // total if total else 0
+        print(f"\rQuantizing {os.path.basename(src)} -> {args.type}: ~{pct}%", end="", flush=True)
+
+    try:
+        quantize_model(tool, src, dest, args.type, progress=prog)
+    except KeyboardInterrupt:
+        print("\nCancelled.")
+        sys.exit(1)
+    except RuntimeError as e:
+        print(f"\n{e}", file=sys.stderr)
+        sys.exit(1)
+    print(f"\nWrote {dest} ({format_size(os.path.getsize(dest))})")
+    if not args.no_bench:
+        lang = cfg.get("Defaults", "language", fallback="en")
+        print(format_results(benchmark_models(cmd, [src, dest], exe or "", lang)))
 
 
 def build_server_command(exe_path: str) -> str:
@@ -334,11 +712,25 @@ def run_setup_wizard(
     import tkinter as tk
     from tkinter import filedialog, messagebox, ttk
 
+    from model_bench import (
+        DEFAULT_TARGET_LATENCY,
+        benchmark_models,
+        format_results,
+        rank_results,
+        recommend,
+        reference_clip,
+    )
+
     draft_fd, draft_path = tempfile.mkstemp(prefix="whispertypesetup-", suffix=".ini")
     os.close(draft_fd)
     draft_holder: dict[str, Optional[str]] = {"path": draft_path}
+    # The draft starts as a copy of the current config.ini (or the example) so the
+    # saved file keeps its comments and any keys the wizard does not manage.
+    template = final_config_path
+    if not os.path.isfile(template):
+        template = os.path.join(config_dir(), "config.ini.example")
     try:
-        save_config(draft_path, cfg)
+        save_config(draft_path, cfg, template=template)
     except OSError as e:
         try:
             if os.path.isfile(draft_path):
@@ -398,6 +790,10 @@ def run_setup_wizard(
     step1 = ttk.Frame(wizard_body)
     step2 = ttk.Frame(wizard_body)
     step3 = ttk.Frame(wizard_body)
+    step4 = ttk.Frame(wizard_body)
+    step5 = ttk.Frame(wizard_body)
+    steps = (step0, step1, step2, step3, step4, step5)
+    last_step = len(steps) - 1
     step_num = tk.IntVar(value=0)
 
     # —— Step 1: binary ——
@@ -594,8 +990,99 @@ def run_setup_wizard(
         foreground="gray",
     ).pack(anchor=tk.W, pady=(6, 0))
 
-    # —— Step 3: default model only ——
-    s3 = ttk.Frame(step3, padding=4)
+    # —— Step 3: optional local quantization ——
+    q3 = ttk.Frame(step3, padding=4)
+    q3.pack(fill=tk.BOTH, expand=True)
+    ttk.Label(
+        q3,
+        text=(
+            "Optional: make a quantized copy of a full-precision (f16/f32) model with whisper.cpp's "
+            "quantize tool — e.g. a fine-tuned .bin that has no ready-made quantized download. "
+            "The new file is written next to the source (ggml-<name>-<type>.bin)."
+        ),
+        wraplength=680,
+        justify=tk.LEFT,
+    ).pack(anchor=tk.W)
+    quant_tool_var = tk.StringVar(value="")
+    ttk.Label(q3, textvariable=quant_tool_var, foreground="gray", wraplength=680).pack(
+        anchor=tk.W, pady=(4, 4)
+    )
+    qlist_frame = ttk.Frame(q3)
+    qlist_frame.pack(fill=tk.X, expand=False, pady=4)
+    qscroll = ttk.Scrollbar(qlist_frame)
+    qscroll.pack(side=tk.RIGHT, fill=tk.Y)
+    quant_lb = tk.Listbox(
+        qlist_frame,
+        selectmode=tk.EXTENDED,
+        yscrollcommand=qscroll.set,
+        height=6,
+        width=48,
+    )
+    quant_lb.pack(side=tk.LEFT, fill=tk.X, expand=False)
+    qscroll.config(command=quant_lb.yview)
+    qrow = ttk.Frame(q3)
+    qrow.pack(fill=tk.X, pady=4)
+    ttk.Label(qrow, text="Type:").pack(side=tk.LEFT)
+    quant_type_var = tk.StringVar(value=QUANT_TYPES[0])
+    ttk.Combobox(qrow, textvariable=quant_type_var, values=QUANT_TYPES, state="readonly", width=8).pack(
+        side=tk.LEFT, padx=4
+    )
+    quant_bench_var = tk.BooleanVar(value=True)
+    ttk.Checkbutton(
+        qrow,
+        text="Benchmark source vs. result afterwards (real-time factor, size)",
+        variable=quant_bench_var,
+    ).pack(side=tk.LEFT, padx=8)
+    btn_quantize = ttk.Button(q3, text="Quantize selected models")
+    btn_quantize.pack(anchor=tk.W, pady=4)
+    quant_report = tk.Text(q3, height=8, wrap=tk.NONE, font=("TkFixedFont", 9))
+    quant_report.pack(fill=tk.BOTH, expand=True, pady=(4, 0))
+    quant_report.configure(state=tk.DISABLED)
+
+    # —— Step 4: optional benchmark ——
+    b4 = ttk.Frame(step4, padding=4)
+    b4.pack(fill=tk.BOTH, expand=True)
+    ttk.Label(
+        b4,
+        text=(
+            "Optional: start whisper-server with each model on a temporary port, transcribe a "
+            "reference clip and measure load time, real-time factor (RTF) and peak memory. "
+            "The most accurate model that meets the latency target is pre-selected as default."
+        ),
+        wraplength=680,
+        justify=tk.LEFT,
+    ).pack(anchor=tk.W)
+    brow = ttk.Frame(b4)
+    brow.pack(fill=tk.X, pady=6)
+    ttk.Label(brow, text="Target latency for a 10 s dictation (seconds):").pack(side=tk.LEFT)
+    target_latency_var = tk.DoubleVar(value=DEFAULT_TARGET_LATENCY)
+    ttk.Spinbox(brow, from_=0.2, to=30.0, increment=0.5, textvariable=target_latency_var, width=6).pack(
+        side=tk.LEFT, padx=4
+    )
+    bench_cols = ("size", "load", "rtf", "latency", "rss", "target")
+    bench_tree = ttk.Treeview(b4, columns=bench_cols, height=8, selectmode="extended")
+    bench_tree.heading("#0", text="Model")
+    bench_tree.column("#0", width=240)
+    for col, title, width in zip(
+        bench_cols,
+        ("Size", "Load", "RTF", "10 s latency", "Peak RSS", "Target"),
+        (70, 60, 60, 90, 80, 60),
+    ):
+        bench_tree.heading(col, text=title)
+        bench_tree.column(col, width=width, anchor=tk.E)
+    bench_tree.pack(fill=tk.BOTH, expand=True, pady=4)
+    ttk.Label(
+        b4,
+        text="Select rows to benchmark only those models (none selected = all).",
+        foreground="gray",
+    ).pack(anchor=tk.W)
+    btn_benchmark = ttk.Button(b4, text="Run benchmark")
+    btn_benchmark.pack(anchor=tk.W, pady=4)
+    bench_note_var = tk.StringVar(value="")
+    ttk.Label(b4, textvariable=bench_note_var, wraplength=680, justify=tk.LEFT).pack(anchor=tk.W)
+
+    # —— Step 5: default model only ——
+    s3 = ttk.Frame(step5, padding=4)
     s3.pack(fill=tk.BOTH, expand=True)
     ttk.Label(
         s3,
@@ -609,6 +1096,8 @@ def run_setup_wizard(
     ).pack(anchor=tk.W, pady=(0, 8))
     default_combo = ttk.Combobox(s3, textvariable=default_model_var, state="readonly", width=64)
     default_combo.pack(fill=tk.X, pady=(0, 4))
+    default_info_var = tk.StringVar(value="")
+    ttk.Label(s3, textvariable=default_info_var, foreground="gray").pack(anchor=tk.W, pady=(0, 4))
     ttk.Button(
         s3,
         text="Refresh list from folder",
@@ -632,10 +1121,17 @@ def run_setup_wizard(
     ttk.Label(progress_fr, textvariable=progress_label_var).pack(anchor=tk.W, pady=(4, 0))
     btn_cancel_dl = ttk.Button(progress_fr, text="Cancel download")
 
-    def set_download_ui(active: bool, indeterminate: bool = False) -> None:
+    def set_download_ui(
+        active: bool,
+        indeterminate: bool = False,
+        title: str = "Active download",
+        cancel_text: str = "Cancel download",
+    ) -> None:
         download_busy["active"] = active
         if active:
             download_cancel.clear()
+            progress_fr.configure(text=title)
+            btn_cancel_dl.configure(text=cancel_text)
             progress_fr.pack(side=tk.BOTTOM, fill=tk.X, padx=8, pady=4)
             if indeterminate:
                 progress_bar.configure(mode="indeterminate")
@@ -649,6 +1145,8 @@ def run_setup_wizard(
             back_btn.state(["disabled"])
             btn_download_models.state(["disabled"])
             btn_download_binary.state(["disabled"])
+            btn_quantize.state(["disabled"])
+            btn_benchmark.state(["disabled"])
         else:
             progress_bar.stop()
             progress_fr.pack_forget()
@@ -657,6 +1155,8 @@ def run_setup_wizard(
             progress_label_var.set("")
             btn_download_models.state(["!disabled"])
             btn_download_binary.state(["!disabled"])
+            btn_quantize.state(["!disabled"])
+            btn_benchmark.state(["!disabled"])
             refresh_nav()
 
     def on_cancel_download():
@@ -736,12 +1236,27 @@ def run_setup_wizard(
         else:
             default_combo.state(["!disabled"])
             cur = default_model_var.get().strip()
-            pick = pick_suggested_default(bins, prev_default or cur or "")
+            lang = cfg.get("Defaults", "language", fallback="en")
+            pick = pick_suggested_default(bins, prev_default or cur or "", mdir, lang)
             if cur in bins:
                 pick = cur
             default_model_var.set(pick)
         refresh_nav()
 
+    def refresh_default_model_info():
+        dm = default_model_var.get().strip()
+        info = load_catalog(resolved_models_dir()).get(dm) if dm else None
+        if info is None:
+            default_info_var.set("")
+        elif info.valid:
+            kind = "English-only" if info.english_only else "multilingual"
+            default_info_var.set(
+                f"{info.arch} ({info.params_m}M params), {kind}, {info.quant}, "
+                f"vocab {info.n_vocab}, {format_size(info.size)}"
+            )
+        else:
+            default_info_var.set(f"Not a recognized GGML whisper model ({format_size(info.size)})")
+
     def requirements_met() -> bool:
         if not exe_is_valid():
             return False
@@ -778,18 +1293,9 @@ def run_setup_wizard(
 
     def show_step(which: int) -> None:
         step_num.set(which)
-        step0.pack_forget()
-        step1.pack_forget()
-        step2.pack_forget()
-        step3.pack_forget()
-        if which == 0:
-            step0.pack(fill=tk.BOTH, expand=True)
-        elif which == 1:
-            step1.pack(fill=tk.BOTH, expand=True)
-        elif which == 2:
-            step2.pack(fill=tk.BOTH, expand=True)
-        else:
-            step3.pack(fill=tk.BOTH, expand=True)
+        for frame in steps:
+            frame.pack_forget()
+        steps[which].pack(fill=tk.BOTH, expand=True)
         refresh_nav()
 
     def go_next() -> None:
@@ -819,6 +1325,14 @@ def run_setup_wizard(
                 )
                 return
             show_step(3)
+            refresh_quantize_choices()
+            return
+        if s == 3:
+            show_step(4)
+            refresh_benchmark_rows()
+            return
+        if s == 4:
+            show_step(5)
             refresh_default_model_choices()
             return
 
@@ -870,12 +1384,22 @@ def run_setup_wizard(
                     status_var.set(
                         "Step 2: optional download — or add .bin files to this folder, then Next to select default."
                     )
+        elif s == 3:
+            back_btn.state(["!disabled"])
+            next_btn.state(["!disabled"])
+            save_btn.state(["disabled"])
+            status_var.set("Step 3 (optional): quantize models, or click Next to continue.")
+        elif s == 4:
+            back_btn.state(["!disabled"])
+            next_btn.state(["!disabled"])
+            save_btn.state(["disabled"])
+            status_var.set("Step 4 (optional): benchmark models, or click Next to choose the default model.")
         else:
             back_btn.state(["!disabled"])
             next_btn.state(["disabled"])
             if requirements_met():
                 save_btn.state(["!disabled"])
-                status_var.set("Step 3: all set — Save writes config.ini.")
+                status_var.set("Step 5: all set — Save writes config.ini.")
             else:
                 save_btn.state(["disabled"])
                 parts = []
@@ -889,7 +1413,7 @@ def run_setup_wizard(
                     or default_model_var.get() not in list_bin_models(mdir)
                 ):
                     parts.append("choose a default model from the list")
-                status_var.set("Step 3: still need: " + ", ".join(parts) + ".")
+                status_var.set("Step 5: still need: " + ", ".join(parts) + ".")
         if show_setup_gaps:
             gm = wizard_gap_messages()
             if gm:
@@ -995,7 +1519,6 @@ def run_setup_wizard(
             return
         os.makedirs(root_dir, exist_ok=True)
         url = asset["browser_download_url"]
-        zip_path = os.path.join(root_dir, asset_name)
 
         def prog(done: int, total: int):
             if total:
@@ -1016,11 +1539,8 @@ def run_setup_wizard(
 
         def work():
             try:
-                download_file_cancellable(url, zip_path, progress=prog, cancel=download_cancel)
-                root.after(0, lambda: progress_label_var.set("Extracting…"))
-                extract_zip(zip_path, root_dir, cancel=download_cancel)
-                srv = find_whisper_server_under(root_dir)
-                root.after(0, lambda: _after_extract(srv, zip_path))
+                srv = extract_server_from_zip_url(url, root_dir, progress=prog, cancel=download_cancel)
+                root.after(0, lambda: _after_extract(srv))
             except InterruptedError:
                 root.after(
                     0,
@@ -1033,7 +1553,7 @@ def run_setup_wizard(
             finally:
                 root.after(0, lambda: set_download_ui(False))
 
-        def _after_extract(srv: Optional[str], zp: str):
+        def _after_extract(srv: Optional[str]):
             if srv:
                 exe_var.set(srv)
                 if models_autofill.get():
@@ -1044,12 +1564,8 @@ def run_setup_wizard(
             else:
                 messagebox.showwarning(
                     "Setup",
-                    "Extracted archive but whisper-server.exe was not found.",
+                    "The release zip does not contain whisper-server.exe.",
                 )
-            try:
-                os.remove(zp)
-            except OSError:
-                pass
             refresh_nav()
 
         threading.Thread(target=work, daemon=True).start()
@@ -1069,6 +1585,8 @@ def run_setup_wizard(
 
         set_download_ui(True, indeterminate=False)
 
+        stores = stores_from_config(cfg)
+
         def work():
             try:
                 planned: list[tuple[str, str, str]] = []
@@ -1081,6 +1599,7 @@ def run_setup_wizard(
                     return
 
                 n_plan = len(planned)
+                n_linked = 0
                 for idx, (url, dest, label) in enumerate(planned, start=1):
 
                     def prog(
@@ -1118,10 +1637,17 @@ def run_setup_wizard(
                             f"Starting file {fi}/{n}: {lbl}"
                         ),
                     )
-                    download_file_cancellable(url, dest, progress=prog, cancel=download_cancel)
+                    how = fetch_model_via_store(
+                        url, label, mdir, stores, progress=prog, cancel=download_cancel
+                    )
+                    if how == "store":
+                        n_linked += 1
 
                 root.after(0, lambda: progress_value.set(100.0))
-                root.after(0, lambda: messagebox.showinfo("Models", "Downloads finished."))
+                done_msg = "Downloads finished."
+                if n_linked:
+                    done_msg += f"\n{n_linked} of {n_plan} linked from the shared model store."
+                root.after(0, lambda: messagebox.showinfo("Models", done_msg))
                 root.after(0, refresh_default_model_choices)
             except InterruptedError:
                 root.after(0, lambda: messagebox.showinfo("Models", "Download cancelled."))
@@ -1135,9 +1661,192 @@ def run_setup_wizard(
 
     btn_download_models.configure(command=download_selected_models)
 
+    def refresh_quantize_choices():
+        tool = find_quantize_tool(resolved_exe())
+        if tool:
+            quant_tool_var.set(f"Using {tool}")
+            btn_quantize.state(["!disabled"])
+        else:
+            quant_tool_var.set(
+                "whisper-quantize was not found next to whisper-server — build it with whisper.cpp "
+                "(cmake --build build --target whisper-quantize) to use this step."
+            )
+            btn_quantize.state(["disabled"])
+        mdir = resolved_models_dir()
+        catalog = load_catalog(mdir)
+        quant_lb.delete(0, tk.END)
+        for name in quantizable_models(mdir):
+            quant_lb.insert(tk.END, f"{name}  ({catalog[name].summary()})")
+
+    def append_quant_report(text: str) -> None:
+        quant_report.configure(state=tk.NORMAL)
+        quant_report.insert(tk.END, text + "\n")
+        quant_report.see(tk.END)
+        quant_report.configure(state=tk.DISABLED)
+
+    def quantize_selected():
+        tool = find_quantize_tool(resolved_exe())
+        mdir = resolved_models_dir()
+        sel = [quant_lb.get(i).split("  (", 1)[0] for i in quant_lb.curselection()]
+        if not tool or not sel:
+            messagebox.showinfo("Quantize", "Select at least one full-precision model in the list.")
+            return
+        qtype = quant_type_var.get()
+        bench = quant_bench_var.get()
+        cmd = build_server_command(resolved_exe())
+        lang = cfg.get("Defaults", "language", fallback="en")
+
+        set_download_ui(True, title="Quantization", cancel_text="Cancel")
+
+        def work():
+            pairs = []
+            try:
+                n = len(sel)
+                for idx, name in enumerate(sel, start=1):
+                    src = os.path.join(mdir, name)
+                    dest = os.path.join(mdir, quantized_name(name, qtype))
+
+                    def prog(done: int, total: int, *, fi: int = idx, lbl: str = name):
+                        frac = min(1.0, done / total) if total else 0.0
+                        root.after(0, lambda v=100.0 * (fi - 1 + frac) / n: progress_value.set(v))
+                        root.after(
+                            0,
+                            lambda p=int(100 * frac): progress_label_var.set(
+                                f"Model {fi}/{n} — {lbl} → {qtype}: ~{p}%"
+                            ),
+                        )
+
+                    quantize_model(tool, src, dest, qtype, progress=prog, cancel=download_cancel)
+                    pairs.append((src, dest))
+                    root.after(0, lambda d=dest: append_quant_report(f"Wrote {os.path.basename(d)}"))
+                if bench:
+                    root.after(0, lambda: progress_bar.configure(mode="indeterminate"))
+                    root.after(0, lambda: progress_bar.start(12))
+                    for src, dest in pairs:
+                        root.after(
+                            0,
+                            lambda d=dest: progress_label_var.set(f"Benchmarking {os.path.basename(d)}…"),
+                        )
+                        res = benchmark_models(cmd, [src, dest], resolved_exe(), lang, cancel=download_cancel)
+                        root.after(0, lambda r=res: append_quant_report(format_results(r)))
+                        if len(res) == 2 and not res[0].error and not res[1].error:
+                            speedup = res[0].rtf / res[1].rtf if res[1].rtf else 0.0
+                            shrink = res[1].size / res[0].size if res[0].size else 0.0
+                            root.after(
+                                0,
+                                lambda sp=speedup, sh=shrink: append_quant_report(
+                                    f"→ {sp:.2f}× decode speed, {100 * sh:.0f}% of source size\n"
+                                ),
+                            )
+            except InterruptedError:
+                root.after(0, lambda: append_quant_report("Cancelled."))
+            except Exception as e:
+                root.after(0, lambda err=str(e): messagebox.showerror("Quantize", err))
+            finally:
+                root.after(0, lambda: set_download_ui(False))
+                root.after(0, refresh_quantize_choices)
+
+        threading.Thread(target=work, daemon=True).start()
+
+    btn_quantize.configure(command=quantize_selected)
+
+    def refresh_benchmark_rows():
+        mdir = resolved_models_dir()
+        catalog = load_catalog(mdir)
+        bench_tree.delete(*bench_tree.get_children())
+        for name in sorted(catalog, key=lambda n: (catalog[n].relative_cost, n)):
+            bench_tree.insert("", tk.END, iid=name, text=name, values=(format_size(catalog[name].size),))
+
+    def show_benchmark_result(r) -> None:
+        target = target_latency_var.get()
+        if r.error:
+            values = (format_size(r.size), "", "", "", "", r.error)
+        else:
+            values = (
+                format_size(r.size),
+                f"{r.load_s:.1f}s",
+                f"{r.rtf:.3f}",
+                f"{r.latency_10s:.2f}s",
+                format_size(r.peak_rss) if r.peak_rss else "?",
+                "ok" if r.latency_10s <= target else "slow",
+            )
+        if bench_tree.exists(r.model):
+            bench_tree.item(r.model, values=values)
+
+    def run_benchmark():
+        mdir = resolved_models_dir()
+        names = list(bench_tree.selection()) or list(bench_tree.get_children())
+        if not names or not exe_is_valid():
+            messagebox.showinfo("Benchmark", "Need a valid whisper-server and at least one model.")
+            return
+        try:
+            target = float(target_latency_var.get())
+        except (tk.TclError, ValueError):
+            messagebox.showwarning("Benchmark", "Enter the target latency in seconds.")
+            return
+        cmd = build_server_command(resolved_exe())
+        lang = cfg.get("Defaults", "language", fallback="en")
+        paths = [os.path.join(mdir, n) for n in names]
+
+        set_download_ui(True, title="Benchmark", cancel_text="Cancel")
+        done = {"n": 0}
+
+        def on_result(r) -> None:
+            done["n"] += 1
+            root.after(0, lambda: show_benchmark_result(r))
+            root.after(0, lambda v=100.0 * done["n"] / len(paths): progress_value.set(v))
+
+        def work():
+            try:
+                reference = reference_clip(resolved_exe())
+                _clip, seconds, source = reference
+                root.after(
+                    0,
+                    lambda: progress_label_var.set(
+                        f"Benchmarking {len(paths)} model(s) with {os.path.basename(source)} ({seconds:.1f} s)…"
+                    ),
+                )
+                results = benchmark_models(
+                    cmd, paths, resolved_exe(), lang, on_result=on_result, cancel=download_cancel,
+                    reference=reference,
+                )
+                catalog = load_catalog(mdir)
+                ranked = rank_results(results, catalog, lang)
+                best = recommend(results, catalog, lang, target)
+
+                def finish():
+                    for pos, r in enumerate(ranked):
+                        bench_tree.move(r.model, "", pos)
+                    if best is None:
+                        bench_note_var.set("No model could be benchmarked — check the whisper-server build.")
+                        return
+                    default_model_var.set(best.model)
+                    meets = best.latency_10s <= target
+                    bench_note_var.set(
+                        f"Recommended default: {best.model} "
+                        + (
+                            f"(most accurate within {target:.1f} s for a 10 s dictation)."
+                            if meets
+                            else f"(fastest; no model meets {target:.1f} s on this machine)."
+                        )
+                        + f" Reference clip: {source}."
+                    )
+
+                root.after(0, finish)
+            except InterruptedError:
+                root.after(0, lambda: bench_note_var.set("Benchmark cancelled."))
+            except Exception as e:
+                root.after(0, lambda err=str(e): messagebox.showerror("Benchmark", err))
+            finally:
+                root.after(0, lambda: set_download_ui(False))
+
+        threading.Thread(target=work, daemon=True).start()
+
+    btn_benchmark.configure(command=run_benchmark)
+
     def apply_save():
-        if step_num.get() != 3:
-            messagebox.showerror("Setup", "Finish step 3 (default model) before saving.")
+        if step_num.get() != last_step:
+            messagebox.showerror("Setup", "Finish the last step (default model) before saving.")
             return
         if not requirements_met():
             messagebox.showerror("Setup", "Complete all requirements before saving.")
@@ -1207,6 +1916,7 @@ def run_setup_wizard(
     _bind_trace(exe_var, lambda *_: root.after_idle(on_exe_change))
     _bind_trace(models_dir_var, lambda *_: root.after_idle(refresh_default_model_choices))
     _bind_trace(default_model_var, lambda *_: root.after_idle(refresh_nav))
+    _bind_trace(default_model_var, lambda *_: root.after_idle(refresh_default_model_info))
     _bind_trace(install_var, lambda *_: root.after_idle(refresh_nav))
 
     models_entry.bind("<Key>", lambda _e: models_autofill.set(False))
@@ -1244,6 +1954,9 @@ def run_setup_wizard(
 
 
 def main() -> None:
+    if sys.argv[1:2] == ["quantize"]:
+        quantize_main(sys.argv[2:])
+        return
     script = config_dir()
     config_path = (
         os.path.abspath(sys.argv[1]) if len(sys.argv) > 1 else os.path.join(script, "config.ini")
@@ -0,0 +1,154 @@
+"""
+Keep the model hot between dictations.
+
+* ``prefetch_file`` asks the OS to pull the model file into the page cache
+  right before whisper-server starts (``posix_fadvise(WILLNEED)`` where
+  available, otherwise a streaming read in a background thread), so the
+  server's own load reads from memory instead of disk.
+* ``KeepWarm`` sends a tiny silent inference while the server is idle, so the
+  kernel does not evict the model's working set and the next dictation does not
+  pay to fault it back in. Pings that take longer than the warm baseline are
+  counted as latency absorbed on behalf of the next real request.
+"""
+
+from __future__ import annotations
+
+import os
+import statistics
+import threading
+import time
+from typing import Callable, Optional
+
+PREFETCH_CHUNK = 8 * 1024 * 1024
+SILENCE_SECONDS = 0.5
+# A ping this much slower than the warm baseline counts as a cold page-in.
+COLD_MARGIN_S = 0.05
+
+
+def prefetch_file(path: str, background: bool = True) -> str:
+    """Start reading ``path`` into the page cache; returns the method used ("" on error)."""
+    try:
+        fd = os.open(path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    except OSError:
+        return ""
+    if hasattr(os, "posix_fadvise"):
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            # Kernel readahead of the whole file; returns immediately.
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+            os.close(fd)
+            return "fadvise"
+        except OSError:
+            pass
+
+    def stream():
+        try:
+            while os.read(fd, PREFETCH_CHUNK):
+                pass
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+    if background:
+        threading.Thread(target=stream, daemon=True).start()
+    else:
+        stream()
+    return "read"
+
+
+def silent_wav() -> bytes:
+    from model_bench import SAMPLE_RATE, wav_bytes
+
+    return wav_bytes([0.0] * int(SILENCE_SECONDS * SAMPLE_RATE), SAMPLE_RATE)
+
+
+class KeepWarm:
+    """Ping the server every ``interval`` seconds of idleness.
+
+    ``send(wav)`` performs one request and returns True on success; ``is_idle()``
+    says whether a ping may be sent now (server ready, nothing recording or
+    being transcribed).
+    """
+
+    def __init__(
+        self,
+        send: Callable[[bytes], bool],
+        interval: float,
+        is_idle: Callable[[], bool],
+        log: Callable[[str], None] = print,
+    ) -> None:
+        self.send = send
+        self.interval = interval
+        self.is_idle = is_idle
+        self.log = log
+        self.last_request = time.monotonic()
+        self.pings: list[float] = []
+        self.absorbed_s = 0.0
+        self.cold_pings = 0
+        self._payload: Optional[bytes] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def note_request(self) -> None:
+        """A real request just ran; the model is warm, so restart the interval."""
+        self.last_request = time.monotonic()
+
+    def _run(self) -> None:
+        while not self._stop.wait(min(self.interval, 5.0)):
+            if time.monotonic() - self.last_request >= self.interval and self.is_idle():
+                self.ping()
+
+    def warm_baseline(self) -> Optional[float]:
+        """Typical latency of a ping against a resident model."""
+        if len(self.pings) < 2:
+            return None
+        return statistics.median(sorted(self.pings)[: max(2, len(self.pings) // 2)])
+
+    def ping(self) -> Optional[float]:
+        if self._payload is None:
+            self._payload = silent_wav()
+        t0 = time.perf_counter()
+        ok = self.send(self._payload)
+        elapsed = time.perf_counter() - t0
+        self.last_request = time.monotonic()
+        if not ok:
+            self.log("[WARM] Keep-warm ping failed")
+            return None
+        baseline = self.warm_baseline()
+        self.pings.append(elapsed)
+        if baseline is not None and elapsed - baseline > COLD_MARGIN_S:
+            self.cold_pings += 1
+            self.absorbed_s += elapsed - baseline
+            self.log(
+                f"[WARM] Ping took {elapsed:.2f}s (warm {baseline:.2f}s): absorbed "
+                f"{elapsed - baseline:.2f}s the next dictation would have paid"
+            )
+        else:
+            self.log(f"[WARM] Ping took {elapsed:.2f}s")
+        return elapsed
+
+    def stats(self) -> dict:
+        baseline = self.warm_baseline()
+        return {
+            "pings": len(self.pings),
+            "warm_s": round(baseline, 4) if baseline is not None else None,
+            "cold_pings": self.cold_pings,
+            "absorbed_s": round(self.absorbed_s, 4),
+        }
+
+    def summary(self) -> str:
+        s = self.stats()
+        warm = f"{s['warm_s']:.2f}s" if s["warm_s"] is not None else "n/a"
+        return (
+            f"{s['pings']} pings, warm latency {warm}, {s['cold_pings']} cold "
+            f"({s['absorbed_s']:.2f}s of first-request latency absorbed)"
+        )
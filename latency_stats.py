@@ -0,0 +1,174 @@
+"""
+Per-stage latency instrumentation for the dictation pipeline.
+
+Each dictation is one ``Trace``; the pipeline calls ``trace.mark(stage)`` as
+each stage finishes, so a stage's duration is the time since the previous mark
+(the first starts at key release). Finished traces feed a rolling window of
+samples per (stage, model) from which p50/p95/p99 are computed, and can be
+appended to a JSONL file or exported in Chrome trace format
+(``chrome://tracing`` / Perfetto).
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+# Pipeline order; used to sort summaries. Unknown stages sort last.
+STAGES = (
+    "stream_stop",
+    "encode",
+    "server_wait",
+    "server_decode",
+    "http",
+    "clipboard",
+    "typing",
+    "total",
+)
+MAX_SAMPLES = 1000
+MAX_TRACES = 200
+
+
+class Trace:
+    """Spans of one dictation, in ``time.perf_counter`` seconds."""
+
+    def __init__(self, model: str, start: Optional[float] = None) -> None:
+        self.model = model
+        self.start = time.perf_counter() if start is None else start
+        self.last = self.start
+        self.wall_start = time.time() - (time.perf_counter() - self.start)
+        self.spans: list[tuple[str, float, float]] = []
+
+    def mark(self, stage: str, at: Optional[float] = None) -> float:
+        """Close ``stage`` at ``at`` (default now); returns its duration."""
+        now = time.perf_counter() if at is None else at
+        self.spans.append((stage, self.last, now))
+        self.last = now
+        return now - self.spans[-1][1]
+
+    def add(self, stage: str, t0: float, t1: float) -> None:
+        """Record a span measured elsewhere (does not move the mark)."""
+        self.spans.append((stage, t0, t1))
+
+    def to_dict(self) -> dict:
+        return {
+            "ts": round(self.wall_start, 6),
+            "model": self.model,
+            "stages": {name: round(t1 - t0, 6) for name, t0, t1 in self.spans},
+        }
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def _stage_order(stage: str) -> tuple[int, str]:
+    return (STAGES.index(stage) if stage in STAGES else len(STAGES), stage)
+
+
+class LatencyStats:
+    """Rolling per-stage, per-model latency samples; safe to use from any thread."""
+
+    def __init__(self, trace_path: str = "", max_samples: int = MAX_SAMPLES) -> None:
+        self.trace_path = trace_path
+        self.max_samples = max_samples
+        self._samples: dict[tuple[str, str], deque] = {}
+        self.traces: deque = deque(maxlen=MAX_TRACES)
+        self._lock = threading.Lock()
+
+    def trace(self, model: str, start: Optional[float] = None) -> Trace:
+        return Trace(model, start)
+
+    def finish(self, trace: Trace) -> None:
+        """Add a completed trace (plus its ``total``) to the window and the JSONL file."""
+        if trace.spans:
+            trace.add("total", trace.start, max(t1 for _, _, t1 in trace.spans))
+        with self._lock:
+            for stage, t0, t1 in trace.spans:
+                key = (stage, trace.model)
+                if key not in self._samples:
+                    self._samples[key] = deque(maxlen=self.max_samples)
+                self._samples[key].append(t1 - t0)
+            self.traces.append(trace)
+        if self.trace_path:
+            try:
+                with open(self.trace_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(trace.to_dict()) + "\n")
+            except OSError:
+                pass
+
+    def reset(self) -> None:
+        with self._lock:
+            self._samples.clear()
+            self.traces.clear()
+
+    def models(self) -> list[str]:
+        with self._lock:
+            return sorted({model for _, model in self._samples})
+
+    def percentiles(self, stage: str, model: Optional[str] = None) -> dict:
+        """``{"n", "p50", "p95", "p99"}`` in seconds; all models when ``model`` is None."""
+        with self._lock:
+            values = sorted(
+                v
+                for (s, m), window in self._samples.items()
+                if s == stage and (model is None or m == model)
+                for v in window
+            )
+        return {
+            "n": len(values),
+            "p50": percentile(values, 50),
+            "p95": percentile(values, 95),
+            "p99": percentile(values, 99),
+        }
+
+    def summary(self, model: Optional[str] = None) -> dict:
+        """``{stage: percentiles}`` in pipeline order."""
+        with self._lock:
+            stages = {s for (s, m) in self._samples if model is None or m == model}
+        return {s: self.percentiles(s, model) for s in sorted(stages, key=_stage_order)}
+
+    def summary_lines(self, model: Optional[str] = None) -> list[str]:
+        lines = []
+        for stage, p in self.summary(model).items():
+            lines.append(
+                f"{stage:<13} p50 {p['p50'] * 1000:7.1f} ms  p95 {p['p95'] * 1000:7.1f} ms  "
+                f"p99 {p['p99'] * 1000:7.1f} ms  (n={p['n']})"
+            )
+        return lines
+
+    def write_chrome_trace(self, path: str) -> int:
+        """Write the recent traces as Chrome trace events; returns the number of traces."""
+        with self._lock:
+            traces = list(self.traces)
+        if not traces:
+            return 0
+        origin = min(t.start for t in traces)
+        events = []
+        for i, t in enumerate(traces):
+            for stage, t0, t1 in t.spans:
+                events.append({
+                    "name": stage,
+                    "cat": t.model,
+                    "ph": "X",
+                    "ts": round((t0 - origin) * 1e6, 1),
+                    "dur": round((t1 - t0) * 1e6, 1),
+                    "pid": os.getpid(),
+                    # "total" on its own row so it does not hide the stages.
+                    "tid": 0 if stage == "total" else 1,
+                    "args": {"dictation": i},
+                })
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        os.replace(tmp, path)
+        return len(traces)
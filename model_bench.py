@@ -0,0 +1,387 @@
+"""
+Benchmark GGML models with whisper-server: start a server for one model on a
+free port, time the model load, transcribe a reference clip and report the
+real-time factor (decode time / audio duration; below 1.0 is faster than real time)
+and the server's peak resident memory.
+
+The reference clip is whisper.cpp's ``samples/jfk.wav`` when it can be found next
+to the server build, otherwise a synthetic voiced signal. The synthetic clip
+exercises the full encoder but little of the text decoder, so its RTF is a lower
+bound for real speech.
+
+CLI (ranks every model in the configured models folder)::
+
+    python model_bench.py [--target SECONDS] [MODEL.bin ...]
+"""
+
+from __future__ import annotations
+
+import array
+import http.client
+import io
+import math
+import os
+import platform
+import shlex
+import socket
+import subprocess
+import sys
+import threading
+import time
+import wave
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from model_catalog import ModelInfo, load_catalog
+
+SAMPLE_RATE = 16000
+LOAD_TIMEOUT = 300.0
+REQUEST_TIMEOUT = 600.0
+# Recommendation target: seconds to transcribe a 10 s dictation
+DEFAULT_TARGET_LATENCY = 2.0
+LATENCY_REFERENCE_S = 10.0
+
+
+@dataclass
+class BenchResult:
+    model: str
+    size: int
+    load_s: float = 0.0
+    decode_s: float = 0.0
+    audio_s: float = 0.0
+    peak_rss: int = 0
+    text: str = ""
+    error: str = ""
+
+    @property
+    def rtf(self) -> float:
+        return self.decode_s / self.audio_s if self.audio_s else float("inf")
+
+    @property
+    def latency_10s(self) -> float:
+        """Expected decode time for a 10 s dictation on this machine."""
+        return self.rtf * LATENCY_REFERENCE_S
+
+
+def find_free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def probe_server(port, host: str = "127.0.0.1", timeout: float = 1.0) -> Optional[bool]:
+    """Readiness of a whisper-server: True ready, False loading, None not listening.
+
+    Newer servers answer ``/health`` with 503 while the model loads; older ones only
+    start listening once the model is loaded, so any other answer means ready.
+    """
+    conn = http.client.HTTPConnection(host, int(port), timeout=timeout)
+    try:
+        conn.request("GET", "/health")
+        status = conn.getresponse().status
+    except (OSError, http.client.HTTPException):
+        return None
+    finally:
+        conn.close()
+    return status != 503
+
+
+def wait_until_ready(
+    port,
+    process: Optional[subprocess.Popen] = None,
+    timeout: float = LOAD_TIMEOUT,
+    cancel: Optional[threading.Event] = None,
+    interval: float = 0.05,
+) -> bool:
+    """Poll :func:`probe_server` until ready; False on timeout, cancel or process exit."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if cancel is not None and cancel.is_set():
+            return False
+        if process is not None and process.poll() is not None:
+            return False
+        if probe_server(port):
+            return True
+        time.sleep(interval)
+    return False
+
+
+def wav_bytes(samples, sample_rate: int = SAMPLE_RATE) -> bytes:
+    """16-bit mono WAV from float samples in [-1, 1]."""
+    pcm = array.array("h", (int(max(-1.0, min(1.0, v)) * 32767) for v in samples))
+    if sys.byteorder == "big":
+        pcm.byteswap()
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        wf.writeframes(pcm.tobytes())
+    return buf.getvalue()
+
+
+def synthetic_clip(seconds: float = 11.0, sample_rate: int = SAMPLE_RATE) -> bytes:
+    """Deterministic voiced signal: a 120 Hz harmonic source gated at syllable rate."""
+    n = int(seconds * sample_rate)
+    out = []
+    for i in range(n):
+        t = i / sample_rate
+        gate = max(0.0, math.sin(2 * math.pi * 3.3 * t)) ** 2
+        f0 = 120.0 + 15.0 * math.sin(2 * math.pi * 0.4 * t)
+        v = sum(math.sin(2 * math.pi * f0 * k * t) / k for k in (1, 2, 3, 5, 8))
+        out.append(0.25 * gate * v)
+    return wav_bytes(out, sample_rate)
+
+
+def reference_clip(server_exe: str = "") -> tuple[bytes, float, str]:
+    """``(wav bytes, duration seconds, source description)`` for benchmarking."""
+    if server_exe:
+        d = os.path.dirname(os.path.abspath(server_exe))
+        for _ in range(4):
+            cand = os.path.join(d, "samples", "jfk.wav")
+            if os.path.isfile(cand):
+                with open(cand, "rb") as f:
+                    data = f.read()
+                with wave.open(io.BytesIO(data), "rb") as wf:
+                    return data, wf.getnframes() / wf.getframerate(), cand
+            d = os.path.dirname(d)
+    data = synthetic_clip()
+    with wave.open(io.BytesIO(data), "rb") as wf:
+        return data, wf.getnframes() / wf.getframerate(), "synthetic clip"
+
+
+def launch_server(cmd_template: str, model_path: str, port, language: str = "en") -> subprocess.Popen:
+    cmd = cmd_template.format(model_path=model_path, language=language, port=port)
+    cmd = os.path.expanduser(os.path.expandvars(cmd))
+    args = shlex.split(cmd, posix=os.name != "nt")
+    return subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def process_rss_bytes(process: subprocess.Popen, peak: bool = False) -> int:
+    """Resident set size of a running process; ``peak=True`` for the high-water mark.
+
+    The peak is only exposed on Linux and Windows; elsewhere the current RSS is returned.
+    """
+    pid = process.pid
+    sysname = platform.system().lower()
+    try:
+        if sysname == "linux":
+            field = "VmHWM:" if peak else "VmRSS:"
+            with open(f"/proc/{pid}/status", "r") as f:
+                for line in f:
+                    if line.startswith(field):
+                        return int(line.split()[1]) * 1024
+            return 0
+        if sysname == "windows":
+            import ctypes
+            from ctypes import wintypes
+
+            class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+                _fields_ = [
+                    ("cb", wintypes.DWORD),
+                    ("PageFaultCount", wintypes.DWORD),
+                    ("PeakWorkingSetSize", ctypes.c_size_t),
+                    ("WorkingSetSize", ctypes.c_size_t),
+                    ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                    ("PagefileUsage", ctypes.c_size_t),
+                    ("PeakPagefileUsage", ctypes.c_size_t),
+                ]
+
+            counters = PROCESS_MEMORY_COUNTERS()
+            counters.cb = ctypes.sizeof(counters)
+            ok = ctypes.windll.psapi.GetProcessMemoryInfo(
+                int(process._handle), ctypes.byref(counters), counters.cb
+            )
+            if not ok:
+                return 0
+            return int(counters.PeakWorkingSetSize if peak else counters.WorkingSetSize)
+        out = subprocess.run(
+            ["ps", "-o", "rss=", "-p", str(pid)], capture_output=True, text=True, timeout=5
+        ).stdout.strip()
+        return int(out) * 1024 if out else 0
+    except (OSError, ValueError, AttributeError, subprocess.SubprocessError):
+        return 0
+
+
+def stop_process(process: subprocess.Popen, timeout: float = 5.0) -> None:
+    if process.poll() is None:
+        process.terminate()
+        try:
+            process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+
+def benchmark_model(
+    cmd_template: str,
+    model_path: str,
+    clip: bytes,
+    clip_seconds: float,
+    language: str = "en",
+    cancel: Optional[threading.Event] = None,
+) -> BenchResult:
+    """Start whisper-server for ``model_path`` on a free port and time one transcription."""
+    import requests
+
+    res = BenchResult(model=os.path.basename(model_path), size=os.path.getsize(model_path))
+    port = find_free_port()
+    t0 = time.perf_counter()
+    try:
+        proc = launch_server(cmd_template, model_path, port, language)
+    except (OSError, ValueError, KeyError) as e:
+        res.error = f"could not start server: {e}"
+        return res
+    try:
+        if not wait_until_ready(port, proc, cancel=cancel):
+            if cancel is not None and cancel.is_set():
+                raise InterruptedError("Benchmark cancelled.")
+            res.error = "server exited or did not become ready"
+            return res
+        res.load_s = time.perf_counter() - t0
+        t1 = time.perf_counter()
+        r = requests.post(
+            f"http://127.0.0.1:{port}/inference",
+            files={"file": ("clip.wav", clip, "audio/wav")},
+            data={"response_format": "json"},
+            timeout=REQUEST_TIMEOUT,
+        )
+        res.decode_s = time.perf_counter() - t1
+        res.audio_s = clip_seconds
+        if r.status_code != 200:
+            res.error = f"HTTP {r.status_code}"
+        else:
+            res.text = " ".join(r.json().get("text", "").split())
+        res.peak_rss = process_rss_bytes(proc, peak=True)
+    except requests.RequestException as e:
+        res.error = str(e)
+    finally:
+        stop_process(proc)
+    return res
+
+
+def benchmark_models(
+    cmd_template: str,
+    model_paths: list[str],
+    server_exe: str = "",
+    language: str = "en",
+    on_result: Optional[Callable[[BenchResult], None]] = None,
+    cancel: Optional[threading.Event] = None,
+    reference: Optional[tuple[bytes, float, str]] = None,
+) -> list[BenchResult]:
+    """Benchmark each model in turn; ``reference`` is a ``reference_clip()`` result
+    the caller already has (built from ``server_exe`` when omitted)."""
+    clip, seconds, _source = reference or reference_clip(server_exe)
+    results = []
+    for path in model_paths:
+        if cancel is not None and cancel.is_set():
+            raise InterruptedError("Benchmark cancelled.")
+        r = benchmark_model(cmd_template, path, clip, seconds, language, cancel)
+        results.append(r)
+        if on_result is not None:
+            on_result(r)
+    return results
+
+
+def accuracy_key(info: Optional[ModelInfo], language: str = "en") -> tuple:
+    """Sort key, higher = expected to be more accurate for ``language``.
+
+    Larger architectures win; at equal size English-only checkpoints win for
+    English, and less aggressive quantization wins over more.
+    """
+    if info is None or not info.valid:
+        return (0, False, 0.0)
+    return (info.params_m, info.english_only == (language == "en"), info.bits)
+
+
+def rank_results(
+    results: list[BenchResult],
+    catalog: dict[str, ModelInfo],
+    language: str = "en",
+) -> list[BenchResult]:
+    """Successful results, most accurate first (ties broken by speed)."""
+    ok = [r for r in results if not r.error]
+    return sorted(ok, key=lambda r: (accuracy_key(catalog.get(r.model), language), -r.rtf), reverse=True)
+
+
+def recommend(
+    results: list[BenchResult],
+    catalog: dict[str, ModelInfo],
+    language: str = "en",
+    target_latency: float = DEFAULT_TARGET_LATENCY,
+) -> Optional[BenchResult]:
+    """Most accurate model whose 10 s latency meets the target; else the fastest one."""
+    ranked = rank_results(results, catalog, language)
+    for r in ranked:
+        if r.latency_10s <= target_latency:
+            return r
+    return min(ranked, key=lambda r: r.rtf) if ranked else None
+
+
+def format_results(results: list[BenchResult], target_latency: Optional[float] = None) -> str:
+    lines = [f"{'model':<34} {'size':>8} {'load':>7} {'RTF':>6} {'10s':>6} {'peak RSS':>9}"]
+    for r in results:
+        size = f"{r.size / 1024**2:.0f} MB"
+        if r.error:
+            lines.append(f"{r.model:<34} {size:>8}  error: {r.error}")
+            continue
+        rss = f"{r.peak_rss / 1024**2:.0f} MB" if r.peak_rss else "?"
+        mark = ""
+        if target_latency is not None:
+            mark = "  ok" if r.latency_10s <= target_latency else "  slow"
+        lines.append(
+            f"{r.model:<34} {size:>8} {r.load_s:6.2f}s {r.rtf:6.3f} {r.latency_10s:5.2f}s {rss:>9}{mark}"
+        )
+    return "\n".join(lines)
+
+
+def main() -> None:
+    import argparse
+    import configparser
+
+    from installer import config_dir, parse_server_command
+
+    ap = argparse.ArgumentParser(description="Benchmark whisper models with whisper-server.")
+    ap.add_argument("models", nargs="*", help="model files (default: every .bin in models_dir)")
+    ap.add_argument("--config", default=os.path.join(config_dir(), "config.ini"))
+    ap.add_argument(
+        "--target",
+        type=float,
+        default=DEFAULT_TARGET_LATENCY,
+        help="target seconds to transcribe a 10 s dictation (default: %(default)s)",
+    )
+    args = ap.parse_args()
+
+    cfg = configparser.ConfigParser(interpolation=configparser.ExtendedInterpolation())
+    cfg.read(args.config)
+    cmd = cfg.get("Server", "command", fallback="", raw=True)
+    if not cmd:
+        print("Server.command is not set", file=sys.stderr)
+        sys.exit(1)
+    models_dir = os.path.expanduser(os.path.expandvars(cfg.get("Models", "models_dir", fallback="", raw=True)))
+    lang = cfg.get("Defaults", "language", fallback="en")
+    catalog = load_catalog(models_dir)
+    paths = [p if os.path.isfile(p) else os.path.join(models_dir, p) for p in args.models]
+    if not paths:
+        paths = [os.path.join(models_dir, n) for n in sorted(catalog, key=lambda n: catalog[n].relative_cost)]
+    results = benchmark_models(
+        cmd,
+        paths,
+        parse_server_command(cmd) or "",
+        lang,
+        on_result=lambda r: print(f"{r.model}: {r.error or f'RTF {r.rtf:.3f}'}", file=sys.stderr),
+    )
+    for p in paths:
+        catalog.setdefault(os.path.basename(p), load_catalog(os.path.dirname(p)).get(os.path.basename(p)))
+    ranked = rank_results(results, catalog, lang)
+    print(format_results(ranked + [r for r in results if r.error], args.target))
+    best = recommend(results, catalog, lang, args.target)
+    if best:
+        print(f"\nRecommended default_model: {best.model}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,350 @@
+"""
+Model catalog: metadata for GGML whisper models read from their file headers.
+
+Only the first few KB of each ``.bin`` are mapped (``mmap``), which is enough for
+the hyper-parameters whisper.cpp writes right after the ``ggml`` magic. Results
+are cached in ``.whispertype-catalog.json`` inside the models folder, keyed by
+(size, mtime), so repeated scans of multi-GB files cost one ``stat`` each.
+
+``ModelInventory`` keeps the catalog in memory for the tray and rescans only
+when the folder's own mtime changes.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+from dataclasses import asdict, dataclass
+from typing import Callable, Optional
+
+log = logging.getLogger("whispertype.models")
+
+GGML_MAGIC = 0x67676D6C  # "ggml"
+HEADER_BYTES = 4096
+INDEX_FILE = ".whispertype-catalog.json"
+INDEX_VERSION = 1
+POLL_INTERVAL = 5.0
+
+# whisper_hparams as written by convert-pt-to-ggml.py (all int32, after the magic)
+_HPARAMS = struct.Struct("<I11i")
+
+# (n_audio_layer, n_audio_state) -> (architecture, parameters in millions)
+_ARCHS = {
+    (4, 384): ("tiny", 39),
+    (6, 512): ("base", 74),
+    (12, 768): ("small", 244),
+    (24, 1024): ("medium", 769),
+    (32, 1280): ("large", 1550),
+}
+
+# ggml ftype -> (name, approximate bits per weight)
+_FTYPES = {
+    0: ("f32", 32.0),
+    1: ("f16", 16.0),
+    2: ("q4_0", 4.5),
+    3: ("q4_1", 5.0),
+    4: ("q4_1", 5.0),
+    7: ("q8_0", 8.5),
+    8: ("q5_0", 5.5),
+    9: ("q5_1", 6.0),
+    10: ("q2_k", 2.6),
+    11: ("q3_k", 3.4),
+    12: ("q4_k", 4.5),
+    13: ("q5_k", 5.5),
+    14: ("q6_k", 6.6),
+}
+
+# whisper.cpp: GGML_QNT_VERSION_FACTOR; ftype is stored as qntvr * 1000 + ftype
+_QNT_VERSION_FACTOR = 1000
+
+# Relative cost budget for the suggested default (millions of f16-equivalent
+# parameters): admits base f16 and small q5_x, rejects small f16 and larger.
+DEFAULT_COST_BUDGET = 100.0
+
+
+@dataclass(frozen=True)
+class ModelInfo:
+    filename: str
+    size: int
+    mtime_ns: int
+    valid: bool = False
+    arch: str = ""
+    params_m: int = 0
+    multilingual: bool = False
+    quant: str = ""
+    bits: float = 0.0
+    n_vocab: int = 0
+    n_mels: int = 0
+    n_audio_layer: int = 0
+    n_text_layer: int = 0
+
+    @property
+    def english_only(self) -> bool:
+        return self.valid and not self.multilingual
+
+    @property
+    def relative_cost(self) -> float:
+        """Rough decode cost in millions of f16-equivalent parameters.
+
+        Decoding on CPU is largely memory-bandwidth bound, so cost scales with
+        parameter count times bytes per weight. Only useful for ranking.
+        """
+        if not self.valid:
+            return float("inf")
+        return self.params_m * self.bits / 16.0
+
+    def summary(self) -> str:
+        """Short label, e.g. ``small.en, q5_1, 181 MB``."""
+        size = format_size(self.size)
+        if not self.valid:
+            return f"unrecognized, {size}"
+        name = self.arch + (".en" if self.english_only else "")
+        return f"{name}, {self.quant}, {size}"
+
+
+def format_size(size_bytes: int) -> str:
+    if size_bytes >= 1024**3:
+        return f"{size_bytes / 1024**3:.1f} GB"
+    return f"{size_bytes / 1024**2:.0f} MB"
+
+
+def read_ggml_header(path: str) -> Optional[dict]:
+    """Parse the hyper-parameters of a GGML whisper model; ``None`` if not one."""
+    try:
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < _HPARAMS.size:
+                return None
+            with mmap.mmap(f.fileno(), min(size, HEADER_BYTES), access=mmap.ACCESS_READ) as m:
+                fields = _HPARAMS.unpack_from(m, 0)
+    except (OSError, ValueError):
+        return None
+    (
+        magic,
+        n_vocab,
+        _n_audio_ctx,
+        n_audio_state,
+        _n_audio_head,
+        n_audio_layer,
+        _n_text_ctx,
+        _n_text_state,
+        _n_text_head,
+        n_text_layer,
+        n_mels,
+        ftype,
+    ) = fields
+    if magic != GGML_MAGIC:
+        return None
+    arch, params_m = _ARCHS.get((n_audio_layer, n_audio_state), ("", 0))
+    if arch == "large":
+        if n_text_layer == 4:
+            arch, params_m = "large-v3-turbo", 809
+        elif n_mels == 128:
+            arch = "large-v3"
+    quant, bits = _FTYPES.get(ftype % _QNT_VERSION_FACTOR, (f"ftype{ftype}", 16.0))
+    return {
+        "valid": bool(arch),
+        "arch": arch,
+        "params_m": params_m,
+        # whisper.cpp: is_multilingual = n_vocab >= 51865
+        "multilingual": n_vocab >= 51865,
+        "quant": quant,
+        "bits": bits,
+        "n_vocab": n_vocab,
+        "n_mels": n_mels,
+        "n_audio_layer": n_audio_layer,
+        "n_text_layer": n_text_layer,
+    }
+
+
+def _read_index(models_dir: str) -> dict:
+    try:
+        with open(os.path.join(models_dir, INDEX_FILE), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != INDEX_VERSION:
+        return {}
+    models = data.get("models")
+    return models if isinstance(models, dict) else {}
+
+
+def _write_index(models_dir: str, entries: dict[str, ModelInfo]) -> None:
+    path = os.path.join(models_dir, INDEX_FILE)
+    tmp = path + ".tmp"
+    payload = {
+        "version": INDEX_VERSION,
+        "models": {name: asdict(info) for name, info in entries.items()},
+    }
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(payload, f, indent=1, sort_keys=True)
+        os.replace(tmp, path)
+    except OSError:
+        # Read-only or shared models folder: the catalog just is not cached.
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+
+
+def load_catalog(models_dir: str, previous: Optional[dict[str, ModelInfo]] = None) -> dict[str, ModelInfo]:
+    """Metadata for every ``.bin`` in models_dir, using the cached index when fresh.
+
+    ``previous`` (an earlier result for the same folder) stands in for the
+    index file, so a rescan does not re-read it."""
+    if not models_dir or not os.path.isdir(models_dir):
+        return {}
+    if previous is not None:
+        cached = previous
+    else:
+        cached = {}
+        for name, hit in _read_index(models_dir).items():
+            try:
+                cached[name] = ModelInfo(**hit)
+            except TypeError:
+                pass
+    catalog: dict[str, ModelInfo] = {}
+    dirty = False
+    try:
+        entries = list(os.scandir(models_dir))
+    except OSError:
+        return {}
+    for entry in entries:
+        if not entry.name.endswith(".bin"):
+            continue
+        try:
+            if not entry.is_file():
+                continue
+            st = entry.stat()
+        except OSError:
+            continue
+        hit = cached.get(entry.name)
+        if hit is not None and hit.size == st.st_size and hit.mtime_ns == st.st_mtime_ns:
+            catalog[entry.name] = hit
+            continue
+        header = read_ggml_header(entry.path) or {}
+        catalog[entry.name] = ModelInfo(
+            filename=entry.name, size=st.st_size, mtime_ns=st.st_mtime_ns, **header
+        )
+        dirty = True
+    if dirty or set(cached) != set(catalog):
+        _write_index(models_dir, catalog)
+    return catalog
+
+
+def sort_key(info: ModelInfo) -> tuple:
+    """Cheapest first, as listed in the tray."""
+    return info.relative_cost, info.size, info.filename
+
+
+class ModelInventory:
+    """The catalog of one models folder, kept in memory and refreshed on change.
+
+    Adding, removing or renaming a file bumps the folder's mtime; downloads
+    finish with a rename. While the mtime is unchanged, ``refresh()`` costs one
+    ``stat``. When it changes, the ``.bin`` files are listed again and only new or
+    changed ones have their headers read. Polling the mtime also works on
+    network shares, where inotify does not see changes made by other hosts.
+    ``start()`` polls in a thread and calls ``on_change()`` when the catalog differs.
+    """
+
+    def __init__(self, models_dir: str, on_change: Optional[Callable[[], None]] = None,
+                 interval: float = POLL_INTERVAL) -> None:
+        self.models_dir = models_dir
+        self.on_change = on_change
+        self.interval = interval
+        self.scans = 0
+        self.catalog: dict[str, ModelInfo] = {}
+        self.models: list[str] = []
+        self._dir_mtime: Optional[int] = None
+        self._scanned = False
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def refresh(self, force: bool = False) -> bool:
+        """Rescan if the folder changed (or ``force``); True if the catalog changed."""
+        with self._lock:
+            try:
+                mtime = os.stat(self.models_dir).st_mtime_ns if self.models_dir else None
+            except OSError:
+                mtime = None
+            if self._scanned and not force and mtime == self._dir_mtime:
+                return False
+            # Taken before the scan: a change made while scanning (including our own
+            # index write) shows up as a new mtime and causes one more scan.
+            self._dir_mtime = mtime
+            catalog = load_catalog(self.models_dir, self.catalog if self._scanned else None)
+            self._scanned = True
+            self.scans += 1
+            if catalog == self.catalog:
+                return False
+            # Replace, never mutate: the tray thread may be reading the old ones.
+            self.catalog = catalog
+            self.models = sorted(catalog, key=lambda name: sort_key(catalog[name]))
+            return True
+
+    def set_models_dir(self, models_dir: str) -> bool:
+        """Switch folders; True if the catalog changed."""
+        with self._lock:
+            if models_dir == self.models_dir:
+                return False
+            old = self.catalog
+            self.models_dir = models_dir
+            self._scanned = False
+            self.catalog, self.models = {}, []
+        self.refresh()
+        return self.catalog != old
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="model-inventory", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            if self.refresh() and self.on_change is not None:
+                try:
+                    self.on_change()
+                except Exception as e:
+                    log.error("[MODELS] Updating after a models folder change failed: %s", e)
+
+
+def suggest_default(
+    catalog: dict[str, ModelInfo],
+    language: str = "en",
+    budget: float = DEFAULT_COST_BUDGET,
+) -> str:
+    """Most capable model whose estimated cost fits ``budget``.
+
+    English-only checkpoints are preferred for ``language == "en"`` (they are more
+    accurate at equal size); for other languages only multilingual models qualify
+    when any exist. If nothing fits the budget, the cheapest candidate wins.
+    """
+    known = [m for m in catalog.values() if m.valid]
+    if not known:
+        return ""
+    if language and language != "en":
+        multi = [m for m in known if m.multilingual]
+        known = multi or known
+    affordable = [m for m in known if m.relative_cost <= budget]
+    if not affordable:
+        return min(known, key=lambda m: (m.relative_cost, m.filename)).filename
+    best = max(
+        affordable,
+        key=lambda m: (
+            m.english_only == (language == "en"),
+            m.params_m,
+            -m.relative_cost,
+            m.filename,
+        ),
+    )
+    return best.filename
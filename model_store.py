@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Content-addressed model store shared by every WhisperType install of a user
+(and optionally by all users of a machine).
+
+Layout::
+
+    <store>/objects/<sha256>.bin    one file per distinct model
+    <store>/names.json              filename -> sha256 (lookup hint for offline use)
+
+A ``models_dir`` only holds hardlinks (or symlinks across filesystems) to the
+objects, so the same multi-GB file is stored once no matter how many
+whisper.cpp checkouts or WhisperType installs point at it.
+
+CLI::
+
+    python model_store.py list                 # objects in the store(s)
+    python model_store.py adopt MODELS_DIR     # move existing .bin files into the store
+"""
+
+from __future__ import annotations
+
+import configparser
+import hashlib
+import json
+import os
+import platform
+import shutil
+import sys
+from typing import Callable, Optional
+
+os.environ.setdefault("HOME", os.path.expanduser("~"))
+
+HASH_CHUNK = 4 * 1024 * 1024
+NAMES_FILE = "names.json"
+
+
+def default_store_dir() -> str:
+    sysname = platform.system().lower()
+    if sysname == "windows":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+        return os.path.join(base, "whispertype", "model-store")
+    if sysname == "darwin":
+        return os.path.expanduser("~/Library/Application Support/whispertype/model-store")
+    return os.path.expanduser("~/.local/share/whispertype/model-store")
+
+
+def sha256_file(path: str, cancel=None) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            if cancel is not None and cancel.is_set():
+                raise InterruptedError("Hashing cancelled.")
+            chunk = f.read(HASH_CHUNK)
+            if not chunk:
+                break
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def link_file(src: str, dest: str) -> str:
+    """Make ``dest`` refer to ``src``: hardlink, else symlink, else copy.
+
+    Returns the method used (``"hardlink"``, ``"symlink"`` or ``"copy"``).
+    """
+    tmp = dest + ".link"
+    if os.path.lexists(tmp):
+        os.remove(tmp)
+    try:
+        os.link(src, tmp)
+        method = "hardlink"
+    except OSError:
+        try:
+            os.symlink(os.path.abspath(src), tmp)
+            method = "symlink"
+        except (OSError, NotImplementedError):
+            shutil.copy2(src, tmp)
+            method = "copy"
+    os.replace(tmp, dest)
+    return method
+
+
+class ModelStore:
+    """One store root; see the module docstring for the layout."""
+
+    def __init__(self, root: str) -> None:
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+
+    def __repr__(self) -> str:
+        return f"ModelStore({self.root!r})"
+
+    def exists(self) -> bool:
+        return os.path.isdir(self.objects_dir)
+
+    def writable(self) -> bool:
+        try:
+            os.makedirs(self.objects_dir, exist_ok=True)
+        except OSError:
+            return False
+        return os.access(self.objects_dir, os.W_OK)
+
+    def object_path(self, digest: str) -> str:
+        return os.path.join(self.objects_dir, f"{digest}.bin")
+
+    def incoming_path(self, filename: str) -> str:
+        """Scratch path inside the store (same filesystem, so add() is a rename)."""
+        return os.path.join(self.objects_dir, f".incoming-{os.getpid()}-{filename}")
+
+    def names(self) -> dict[str, str]:
+        try:
+            with open(os.path.join(self.root, NAMES_FILE), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _remember(self, filename: str, digest: str) -> None:
+        names = self.names()
+        if names.get(filename) == digest:
+            return
+        names[filename] = digest
+        path = os.path.join(self.root, NAMES_FILE)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(names, f, indent=1, sort_keys=True)
+            os.replace(tmp, path)
+        except OSError:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+
+    def find(self, digest: Optional[str] = None, filename: Optional[str] = None) -> Optional[str]:
+        """Object path for ``digest`` (or, failing that, the last digest seen for ``filename``)."""
+        if not digest and filename:
+            digest = self.names().get(filename)
+        if not digest:
+            return None
+        path = self.object_path(digest)
+        return path if os.path.isfile(path) else None
+
+    def add(self, path: str, filename: str, digest: Optional[str] = None) -> str:
+        """Move ``path`` into the store (unless already there) and return the object path."""
+        digest = digest or sha256_file(path)
+        obj = self.object_path(digest)
+        os.makedirs(self.objects_dir, exist_ok=True)
+        if os.path.isfile(obj):
+            if not os.path.samefile(path, obj):
+                os.remove(path)
+        else:
+            try:
+                os.replace(path, obj)
+            except OSError:
+                # Different filesystem: copy in, then drop the original.
+                shutil.copy2(path, obj + ".tmp")
+                os.replace(obj + ".tmp", obj)
+                os.remove(path)
+            if os.name != "nt":
+                os.chmod(obj, 0o444)
+        self._remember(filename, digest)
+        return obj
+
+    def objects(self) -> list[tuple[str, int, list[str]]]:
+        """``(digest, size, known names)`` for every object."""
+        by_digest: dict[str, list[str]] = {}
+        for name, digest in self.names().items():
+            by_digest.setdefault(digest, []).append(name)
+        out = []
+        try:
+            entries = list(os.scandir(self.objects_dir))
+        except OSError:
+            return []
+        for e in entries:
+            if e.name.endswith(".bin") and not e.name.startswith("."):
+                digest = e.name[: -len(".bin")]
+                out.append((digest, e.stat().st_size, sorted(by_digest.get(digest, []))))
+        return sorted(out, key=lambda t: t[2] or [t[0]])
+
+
+def stores_from_config(cfg: Optional[configparser.ConfigParser]) -> list[ModelStore]:
+    """Stores to consult, system-wide first; the last entry is the user store."""
+    stores: list[ModelStore] = []
+    user = ""
+    if cfg is not None:
+        shared = cfg.get("Models", "shared_store_dir", fallback="", raw=True).strip()
+        if shared:
+            stores.append(ModelStore(os.path.expanduser(os.path.expandvars(shared))))
+        user = cfg.get("Models", "store_dir", fallback="", raw=True).strip()
+    user = os.path.expanduser(os.path.expandvars(user)) if user else default_store_dir()
+    stores.append(ModelStore(user))
+    return stores
+
+
+def writable_store(stores: list[ModelStore]) -> Optional[ModelStore]:
+    """Where new downloads go: the shared store if we may write there, else the user store."""
+    for s in stores:
+        if s.writable():
+            return s
+    return None
+
+
+def find_in_stores(
+    stores: list[ModelStore], digest: Optional[str] = None, filename: Optional[str] = None
+) -> Optional[str]:
+    for s in stores:
+        hit = s.find(digest=digest, filename=filename)
+        if hit:
+            return hit
+    return None
+
+
+def adopt_dir(
+    models_dir: str,
+    store: ModelStore,
+    log: Callable[[str], None] = print,
+) -> int:
+    """Move every regular .bin in models_dir into ``store`` and link it back.
+
+    Returns the number of bytes freed by deduplication.
+    """
+    freed = 0
+    for name in sorted(os.listdir(models_dir)):
+        path = os.path.join(models_dir, name)
+        if not name.endswith(".bin") or os.path.islink(path) or not os.path.isfile(path):
+            continue
+        size = os.path.getsize(path)
+        digest = sha256_file(path)
+        obj = store.object_path(digest)
+        if os.path.isfile(obj) and os.path.samefile(path, obj):
+            store._remember(name, digest)
+            continue
+        had_object = os.path.isfile(obj)
+        store.add(path, name, digest)
+        method = link_file(obj, path)
+        if had_object:
+            freed += size
+        log(f"{name}: {digest[:12]}… ({method}{', deduplicated' if had_object else ''})")
+    return freed
+
+
+def main() -> None:
+    from installer import config_dir
+
+    cfg = configparser.ConfigParser(interpolation=configparser.ExtendedInterpolation())
+    cfg.read(os.path.join(config_dir(), "config.ini"))
+    stores = stores_from_config(cfg)
+    args = sys.argv[1:]
+    if args[:1] == ["list"]:
+        for s in stores:
+            print(f"{s.root}:")
+            for digest, size, names in s.objects():
+                print(f"  {digest[:12]}…  {size / 1024**2:8.0f} MB  {', '.join(names) or '?'}")
+    elif args[:1] == ["adopt"] and len(args) == 2:
+        store = writable_store(stores)
+        if store is None:
+            print("No writable model store.", file=sys.stderr)
+            sys.exit(1)
+        freed = adopt_dir(os.path.expanduser(args[1]), store)
+        print(f"Freed {freed / 1024**2:.0f} MB")
+    else:
+        print(__doc__.strip().split("CLI::", 1)[1].rstrip(), file=sys.stderr)
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,546 @@
+"""
+One whisper-server per model, shared by every WhisperType instance of a user.
+
+A small daemon (this file, run with ``--daemon``) owns the servers. The first
+client that needs one starts it; it holds ``serverd.lock`` for as long as it
+runs, so a user never has two. Clients connect to its socket (the same
+transport and per-user key as control.py) and ``acquire`` a server for their
+model. The daemon either launches one or hands out the one already running,
+so a second session or terminal does not load the model again.
+
+Each lease is one open connection, and a server's refcount is the number of
+its open leases. A client that crashes releases its lease when the kernel
+closes the socket. When the last lease of a server goes away, the daemon stops
+that server. When it has had no servers and no clients for ``IDLE_EXIT``
+seconds, the daemon exits.
+
+Requests on a lease connection::
+
+    {"cmd": "acquire", "command": ..., "model": ..., "port": 7777, ...}
+        -> {"ok": true, "port": 7777, "pid": 1234, "clients": 2, "launched": false}
+    {"cmd": "poll"}      -> {"ok": true, "returncode": null}
+    {"cmd": "release"}   -> {"ok": true}   (closing the connection does the same)
+
+``{"cmd": "status"}`` on a fresh connection lists the servers and their clients.
+If the requested port is taken by a server for another model, the daemon picks
+a free port; clients use the ``port`` of the reply.
+
+CLI::
+
+    python whispertype.py servers           # shared servers and client counts
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Optional
+
+from control import _family, _recv, _runtime_dir, _send, load_authkey
+
+log = logging.getLogger("whispertype.serverd")
+
+# Seconds without servers or clients before the daemon exits
+IDLE_EXIT = 5.0
+# How long a client waits for a daemon it started to accept connections
+SPAWN_TIMEOUT = 10.0
+# How long a new daemon waits for the lock of one that is shutting down
+LOCK_WAIT = 5.0
+# How long an acquire waits for a server that is stopping to free the port it asks for
+STOP_WAIT = 10.0
+_LOG_MAX_BYTES = 1024 * 1024
+
+
+def default_address() -> str:
+    if os.name == "nt":
+        user = os.environ.get("USERNAME", "user")
+        return rf"\\.\pipe\whispertype-serverd-{user}"
+    return os.path.join(_runtime_dir(), "serverd.sock")
+
+
+def _state_path(address: str, suffix: str) -> str:
+    """Lock or log file that belongs to the daemon on ``address``."""
+    if _family(address) == "AF_UNIX":
+        return os.path.splitext(address)[0] + suffix
+    if address == default_address():
+        return os.path.join(_runtime_dir(), "serverd" + suffix)
+    digest = hashlib.sha1(address.encode()).hexdigest()[:12]
+    return os.path.join(_runtime_dir(), f"serverd-{digest}{suffix}")
+
+
+def _try_lock(fd: int) -> bool:
+    try:
+        if os.name == "nt":
+            import msvcrt
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        return False
+
+
+def lock_daemon(address: str, wait: float = LOCK_WAIT) -> Optional[int]:
+    """Descriptor of the held daemon lock, or None if another daemon keeps it.
+
+    Waits up to ``wait`` seconds in case the holder is shutting down; gives up at
+    once if the holder is serving (its Unix socket exists)."""
+    path = _state_path(address, ".lock")
+    os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+    serving = (lambda: os.path.exists(address)) if _family(address) == "AF_UNIX" else (lambda: False)
+    deadline = time.monotonic() + wait
+    while not _try_lock(fd):
+        if serving() or time.monotonic() >= deadline:
+            os.close(fd)
+            return None
+        time.sleep(0.1)
+    try:
+        os.ftruncate(fd, 0)
+        os.write(fd, f"{os.getpid()}\n".encode())
+    except OSError:
+        pass  # the pid is only informative
+    return fd
+
+
+class _Shared:
+    """A daemon-managed whisper-server and the connections leasing it."""
+
+    def __init__(self, key: tuple, process: subprocess.Popen, port: int) -> None:
+        self.key = key
+        self.process = process
+        self.port = port
+        self.leases: set[Connection] = set()
+
+
+class ServerDaemon:
+    """Launches whisper-servers for clients and stops each when its last lease closes."""
+
+    def __init__(self, address: str = "", authkey: Optional[bytes] = None, output=None) -> None:
+        self.address = address or default_address()
+        self.authkey = authkey if authkey is not None else load_authkey(create=True)
+        self.output = output  # file for the servers' stdout/stderr (None: inherit)
+        self.servers: dict[tuple, _Shared] = {}
+        self.connections = 0
+        self.launches = 0
+        self.listener: Optional[Listener] = None
+        self._lock = threading.Lock()
+        # Ports of servers being stopped, and the port reserved for each server being
+        # started, outside the lock; notified when one of those settles.
+        self._stopping: set[int] = set()
+        self._starting: dict[tuple, int] = {}
+        self._changed = threading.Condition(self._lock)
+        self._idle_since = time.monotonic()
+        self._running = False
+
+    def serve(self, idle_exit: float = IDLE_EXIT) -> None:
+        """Accept clients until ``close()``, or until idle for ``idle_exit`` seconds (0 = never).
+        The caller must hold the daemon lock. Every server is stopped on return."""
+        if _family(self.address) == "AF_UNIX":
+            os.makedirs(os.path.dirname(self.address), mode=0o700, exist_ok=True)
+            if os.path.exists(self.address):
+                os.remove(self.address)  # we hold the lock, so it is stale
+        self.listener = Listener(self.address, family=_family(self.address), authkey=self.authkey)
+        self._running = True
+        if idle_exit > 0:
+            threading.Thread(target=self._idle_watch, args=(idle_exit,), daemon=True).start()
+        log.info("[SERVERD] Listening on %s (pid %d)", self.address, os.getpid())
+        try:
+            while self._running:
+                try:
+                    conn = self.listener.accept()
+                except Exception:
+                    # Failed handshake (wrong key) or listener closed.
+                    if not self._running:
+                        break
+                    continue
+                if not self._running:
+                    conn.close()  # the wake-up connection from close()
+                    break
+                with self._lock:
+                    self.connections += 1
+                threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+        finally:
+            self.listener.close()
+            self.stop_all()
+            log.info("[SERVERD] Stopped after %d server launch(es)", self.launches)
+
+    def close(self) -> None:
+        """Make ``serve()`` return (safe from any thread and from signal handlers)."""
+        if not self._running:
+            return
+        self._running = False
+        # accept() does not notice the listener closing; a connection wakes it. From a
+        # thread, since a signal handler runs on the thread that is blocked in accept().
+        threading.Thread(target=self._wake, daemon=True).start()
+
+    def _wake(self) -> None:
+        try:
+            Client(self.address, family=_family(self.address), authkey=self.authkey).close()
+        except Exception:
+            pass
+
+    def stop_all(self) -> None:
+        from model_bench import stop_process
+
+        with self._lock:
+            servers, self.servers = list(self.servers.values()), {}
+        for shared in servers:
+            stop_process(shared.process)
+
+    def status(self) -> dict:
+        with self._lock:
+            servers = [
+                {
+                    "model": shared.key[1],
+                    "port": shared.port,
+                    "pid": shared.process.pid,
+                    "clients": len(shared.leases),
+                }
+                for shared in self.servers.values()
+            ]
+            return {"pid": os.getpid(), "connections": self.connections, "launches": self.launches, "servers": servers}
+
+    def _idle_watch(self, idle_exit: float) -> None:
+        while self._running:
+            time.sleep(min(1.0, idle_exit / 4))
+            with self._lock:
+                idle = not self.servers and not self.connections
+                expired = idle and time.monotonic() - self._idle_since >= idle_exit
+            if expired:
+                log.info("[SERVERD] No clients left, exiting")
+                self.close()
+
+    def _serve(self, conn: Connection) -> None:
+        shared = None
+        try:
+            msg = _recv(conn)
+            cmd = msg.get("cmd")
+            if cmd == "status":
+                _send(conn, {"ok": True, **self.status()})
+                return
+            if cmd != "acquire":
+                _send(conn, {"ok": False, "error": f"unknown command: {cmd!r}"})
+                return
+            try:
+                shared, launched = self._acquire(msg, conn)
+            except Exception as e:
+                log.warning("[SERVERD] Could not start whisper-server: %s", e)
+                _send(conn, {"ok": False, "error": str(e)})
+                return
+            _send(conn, {
+                "ok": True,
+                "port": shared.port,
+                "pid": shared.process.pid,
+                "clients": len(shared.leases),
+                "launched": launched,
+            })
+            # The lease lasts as long as the connection.
+            while True:
+                msg = _recv(conn)
+                cmd = msg.get("cmd")
+                if cmd == "poll":
+                    _send(conn, {"ok": True, "returncode": shared.process.poll()})
+                elif cmd == "release":
+                    self._release(shared, conn)
+                    shared = None
+                    _send(conn, {"ok": True})
+                    return
+                else:
+                    _send(conn, {"ok": False, "error": f"unknown command: {cmd!r}"})
+        except (EOFError, OSError, ValueError):
+            pass
+        finally:
+            if shared is not None:
+                self._release(shared, conn)
+            conn.close()
+            with self._lock:
+                self.connections -= 1
+                self._idle_since = time.monotonic()
+
+    def _acquire(self, msg: dict, conn: Connection) -> tuple[_Shared, bool]:
+        from keep_warm import prefetch_file
+        from whispertype import server_command_args
+
+        command = str(msg["command"])
+        model = os.path.abspath(str(msg["model"]))
+        # Language and translation are sent with every request, so they don't split servers.
+        key = (command, model)
+        requested = int(msg.get("port") or 0)
+        with self._lock:
+            # A client switching models asks for the port its old server is giving up.
+            self._changed.wait_for(lambda: requested not in self._stopping, STOP_WAIT)
+            # Another client is starting this model's server: join it once it is up.
+            self._changed.wait_for(lambda: key not in self._starting)
+            shared = self.servers.get(key)
+            if shared is not None and shared.process.poll() is None:
+                shared.leases.add(conn)
+                log.info("[SERVERD] Client joined %s on port %d (%d clients)",
+                         os.path.basename(model), shared.port, len(shared.leases))
+                return shared, False
+            if not os.path.isfile(model):
+                raise FileNotFoundError(f"model not found: {model}")
+            taken = {shared.port for shared in self.servers.values()} | self._stopping | set(self._starting.values())
+            wanted = requested if requested not in taken else 0
+            self._starting[key] = wanted
+        # Probing the port, the prefetch and the launch run without the lock, so other
+        # clients' acquire, poll and status requests are not held up meanwhile.
+        try:
+            port = self._pick_port(wanted, requested)
+            with self._lock:
+                self._starting[key] = port
+            if msg.get("prefetch", True):
+                prefetch_file(model)
+            args = server_command_args(command, model, msg.get("language") or "en", port, bool(msg.get("translate")))
+            process = subprocess.Popen(
+                args, cwd=msg.get("cwd") or None, stdin=subprocess.DEVNULL, stdout=self.output, stderr=self.output
+            )
+            shared = _Shared(key, process, port)
+            shared.leases.add(conn)
+            with self._lock:
+                self.servers[key] = shared
+                self.launches += 1
+        finally:
+            with self._lock:
+                del self._starting[key]
+                self._changed.notify_all()
+        log.info("[SERVERD] Started whisper-server for %s on port %d (pid %d)",
+                 os.path.basename(model), port, process.pid)
+        return shared, True
+
+    def _pick_port(self, wanted: int, requested: int) -> int:
+        """``wanted`` unless something else listens on it; then any free port."""
+        from model_bench import find_free_port, probe_server
+
+        if wanted and probe_server(wanted, timeout=0.5) is None:
+            return wanted
+        port = find_free_port()
+        log.info("[SERVERD] Port %s is in use, using %d", requested or "-", port)
+        return port
+
+    def _release(self, shared: _Shared, conn: Connection) -> None:
+        from model_bench import stop_process
+
+        with self._lock:
+            shared.leases.discard(conn)
+            if shared.leases:
+                log.info("[SERVERD] Client left %s (%d clients)", os.path.basename(shared.key[1]), len(shared.leases))
+                return
+            if self.servers.get(shared.key) is shared:
+                del self.servers[shared.key]
+            self._stopping.add(shared.port)
+            log.info("[SERVERD] Last client left, stopping whisper-server for %s", os.path.basename(shared.key[1]))
+        # Outside the lock: other clients keep joining and polling while this one exits.
+        try:
+            stop_process(shared.process)
+        finally:
+            with self._lock:
+                self._stopping.discard(shared.port)
+                self._changed.notify_all()
+
+
+class SharedServer:
+    """A lease on a daemon-managed whisper-server.
+
+    Stands in for the ``Popen`` of a private server (``pid``, ``poll``,
+    ``terminate``, ``wait``), so the app's server handling works unchanged;
+    terminating it releases the lease."""
+
+    def __init__(self, conn: Connection, reply: dict) -> None:
+        self.pid = reply["pid"]
+        self.port = reply["port"]
+        self.clients = reply["clients"]
+        self.launched = reply["launched"]
+        self.returncode: Optional[int] = None
+        self._conn: Optional[Connection] = conn
+        self._lock = threading.Lock()
+
+    def _request(self, cmd: str) -> Optional[dict]:
+        with self._lock:
+            if self._conn is None:
+                return None
+            try:
+                _send(self._conn, {"cmd": cmd})
+                return _recv(self._conn)
+            except (EOFError, OSError, ValueError):
+                self._conn.close()
+                self._conn = None
+                return None
+
+    def poll(self) -> Optional[int]:
+        if self.returncode is None:
+            reply = self._request("poll")
+            if reply is None:
+                self.returncode = -1  # the daemon went away, and its servers with it
+            elif reply.get("returncode") is not None:
+                self.returncode = reply["returncode"]
+                self.terminate()
+        return self.returncode
+
+    def terminate(self) -> None:
+        """Release the lease; the daemon stops the server if this was the last one."""
+        self._request("release")
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+        if self.returncode is None:
+            self.returncode = 0
+
+    kill = terminate
+
+    def wait(self, timeout: Optional[float] = None) -> int:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.poll() is None:
+            if deadline is not None and time.monotonic() >= deadline:
+                raise subprocess.TimeoutExpired("whisper-server", timeout)
+            time.sleep(0.1)
+        return self.returncode
+
+
+def spawn_daemon(address: str = "") -> subprocess.Popen:
+    """Start a detached daemon; it outlives this process and exits when idle."""
+    args = [sys.executable, os.path.abspath(__file__), "--daemon"]
+    if address:
+        args += ["--address", address]
+    kwargs = {}
+    if os.name == "nt":
+        kwargs["creationflags"] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        kwargs["start_new_session"] = True  # not killed with the terminal or the tray app
+    return subprocess.Popen(
+        args,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        **kwargs,
+    )
+
+
+def acquire(command: str, model_path: str, port, language: str = "en", translate: bool = False,
+            prefetch: bool = True, address: str = "", authkey: Optional[bytes] = None,
+            timeout: float = SPAWN_TIMEOUT) -> SharedServer:
+    """Lease the shared whisper-server for ``model_path``, starting the daemon if needed."""
+    address = address or default_address()
+    key = authkey if authkey is not None else load_authkey(create=True)
+    request = {
+        "cmd": "acquire",
+        "command": command,
+        "model": os.path.abspath(model_path),
+        "port": int(port),
+        "language": language,
+        "translate": bool(translate),
+        "prefetch": bool(prefetch),
+        "cwd": os.getcwd(),
+    }
+    deadline = time.monotonic() + timeout
+    spawned = False
+    while True:
+        try:
+            conn = Client(address, family=_family(address), authkey=key)
+            try:
+                _send(conn, request)
+                reply = _recv(conn)
+            except (EOFError, OSError):
+                conn.close()  # the daemon was exiting as we connected; start a new one
+                spawned = False
+                raise
+        except (EOFError, OSError) as e:
+            if time.monotonic() >= deadline:
+                raise OSError(f"whisper-server daemon not reachable on {address}: {e}") from e
+            if not spawned:
+                spawn_daemon(address if address != default_address() else "")
+                spawned = True
+            time.sleep(0.05)
+            continue
+        if not reply.get("ok"):
+            conn.close()
+            raise RuntimeError(reply.get("error", "acquire failed"))
+        return SharedServer(conn, reply)
+
+
+def daemon_status(address: str = "", authkey: Optional[bytes] = None) -> dict:
+    """Status of the running daemon; raises OSError if there is none."""
+    address = address or default_address()
+    key = authkey if authkey is not None else load_authkey()
+    conn = Client(address, family=_family(address), authkey=key)
+    try:
+        _send(conn, {"cmd": "status"})
+        return _recv(conn)
+    finally:
+        conn.close()
+
+
+def daemon_main(address: str = "", idle_exit: float = IDLE_EXIT) -> int:
+    address = address or default_address()
+    lock = lock_daemon(address)
+    if lock is None:
+        return 0  # another daemon is running
+    log_path = _state_path(address, ".log")
+    try:
+        if os.path.getsize(log_path) > _LOG_MAX_BYTES:
+            os.replace(log_path, log_path + ".1")
+    except OSError:
+        pass
+    output = open(log_path, "ab")
+    logging.basicConfig(
+        stream=open(log_path, "a", encoding="utf-8", buffering=1),
+        level=logging.INFO,
+        format="%(asctime)s %(message)s",
+    )
+    daemon = ServerDaemon(address, output=output)
+    for name in ("SIGTERM", "SIGINT", "SIGHUP"):
+        if hasattr(signal, name):
+            signal.signal(getattr(signal, name), lambda signum, frame: daemon.close())
+    try:
+        daemon.serve(idle_exit)
+    finally:
+        output.close()
+        os.close(lock)
+    return 0
+
+
+def servers_main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="whispertype.py servers",
+        description="Show the whisper-servers shared between WhisperType instances.",
+    )
+    parser.add_argument("--address", default="", help=f"default: {default_address()}")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+    try:
+        status = daemon_status(args.address)
+    except (OSError, EOFError) as e:
+        print(f"No shared whisper-server daemon running: {e}", file=sys.stderr)
+        return 1
+    if args.json:
+        print(json.dumps(status))
+        return 0
+    print(f"daemon pid {status['pid']}, {status['connections']} connection(s), {status['launches']} launch(es)")
+    for server in status["servers"]:
+        print(f"  port {server['port']:<6} pid {server['pid']:<8} clients {server['clients']:<3} {server['model']}")
+    if not status["servers"]:
+        print("  no servers running")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-user whisper-server daemon (started by WhisperType).")
+    parser.add_argument("--daemon", action="store_true", help="run the daemon (otherwise: show its status)")
+    parser.add_argument("--address", default="")
+    parser.add_argument("--idle-exit", type=float, default=IDLE_EXIT)
+    args, rest = parser.parse_known_args()
+    if args.daemon:
+        sys.exit(daemon_main(args.address, args.idle_exit))
+    sys.exit(servers_main(rest + (["--address", args.address] if args.address else [])))
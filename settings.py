@@ -0,0 +1,78 @@
+"""
+Typed, validated snapshot of the settings the dictation path reads.
+
+``Settings.from_config`` parses config.ini once; bad values are reported
+then (and replaced by the default) rather than failing mid-dictation. The
+object is frozen: a change builds a new one (``dataclasses.replace`` or
+another ``from_config``) and the app swaps its ``settings`` attribute, so a
+reader on another thread always sees one consistent snapshot.
+"""
+
+from __future__ import annotations
+
+import configparser
+from dataclasses import dataclass, field, fields
+
+
+def _setting(default, section: str, key: str, low=None, high=None):
+    return field(default=default, metadata={"ini": (section, key), "low": low, "high": high})
+
+
+@dataclass(frozen=True)
+class Settings:
+    # [Recording]
+    sample_rate: int = _setting(16000, "Recording", "sample_rate", 8000, 192000)
+    min_duration: float = _setting(0.1, "Recording", "min_duration", 0.0)
+    max_duration: float = _setting(3600.0, "Recording", "max_duration", 1.0)
+    spill_after: float = _setting(120.0, "Recording", "spill_after", 0.0)
+    # [Server]
+    request_timeout: float = _setting(10.0, "Server", "request_timeout", 0.1)
+    idle_unload_minutes: float = _setting(0.0, "Server", "idle_unload_minutes", 0.0)
+    keep_warm_seconds: float = _setting(0.0, "Server", "keep_warm_seconds", 0.0)
+    prefetch_model: bool = _setting(True, "Server", "prefetch_model")
+    # [Defaults]
+    auto_copy: bool = _setting(False, "Defaults", "auto_copy")
+    auto_type: bool = _setting(False, "Defaults", "auto_type")
+    show_audio_meter: bool = _setting(False, "Defaults", "show_audio_meter")
+    verbose: bool = _setting(False, "Defaults", "verbose")
+    # [UI]
+    typing_delay: float = _setting(0.5, "UI", "typing_delay", 0.0, 10.0)
+
+    @classmethod
+    def from_config(cls, config: configparser.ConfigParser) -> tuple["Settings", list[str]]:
+        """Settings from ``config`` plus a description of every value that was rejected."""
+        values = {}
+        errors = []
+        for f in fields(cls):
+            section, key = f.metadata["ini"]
+            try:
+                raw = config.get(section, key, fallback=None) if config is not None else None
+            except configparser.Error as e:
+                errors.append(f"[{section}] {key}: {e}; using {f.default!r}")
+                continue
+            if raw is None or not raw.strip():
+                continue
+            try:
+                value = _parse(f.type, raw)
+            except ValueError:
+                errors.append(f"[{section}] {key} = {raw!r} is not a valid {f.type}; using {f.default!r}")
+                continue
+            low, high = f.metadata["low"], f.metadata["high"]
+            if (low is not None and value < low) or (high is not None and value > high):
+                bounds = f">= {low}" if high is None else f"between {low} and {high}"
+                errors.append(f"[{section}] {key} = {raw!r} must be {bounds}; using {f.default!r}")
+                continue
+            values[f.name] = value
+        return cls(**values), errors
+
+
+def _parse(type_name: str, raw: str):
+    raw = raw.strip()
+    if type_name == "bool":
+        state = configparser.ConfigParser.BOOLEAN_STATES.get(raw.lower())
+        if state is None:
+            raise ValueError(raw)
+        return state
+    if type_name == "int":
+        return int(raw)
+    return float(raw)
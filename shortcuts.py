@@ -0,0 +1,148 @@
+"""
+Chord matching for the global keyboard hook.
+
+The hook sees every keystroke on the system, so matching is compiled ahead of
+time: the held modifiers are a bitmask, and each mask has its own dict from key
+to handler. Left and right modifiers share a bit, which stays set while either
+is held (each physical key also has a bit of its own for that). A keystroke
+costs one class check and one or two dict lookups; keys that match nothing
+allocate nothing and format nothing.
+
+Chords are written as in ``[Shortcuts]``: ``ctrl+shift+z``, ``alt+f9``,
+``super+space``, ``f8``. Several chords for one action are comma-separated.
+"""
+
+from __future__ import annotations
+
+from typing import Callable, Iterable, Optional
+
+CTRL, SHIFT, ALT, SUPER = 1, 2, 4, 8
+
+MODIFIER_NAMES = {
+    "ctrl": CTRL, "control": CTRL,
+    "shift": SHIFT,
+    "alt": ALT, "option": ALT, "altgr": ALT,
+    "super": SUPER, "win": SUPER, "cmd": SUPER, "meta": SUPER,
+}
+# pynput.keyboard.Key members that set each modifier bit (missing ones are skipped)
+MODIFIER_KEYS = {
+    CTRL: ("ctrl", "ctrl_l", "ctrl_r"),
+    SHIFT: ("shift", "shift_l", "shift_r"),
+    ALT: ("alt", "alt_l", "alt_r", "alt_gr"),
+    SUPER: ("cmd", "cmd_l", "cmd_r"),
+}
+# Chord spellings of pynput.keyboard.Key names
+KEY_ALIASES = {
+    "escape": "esc", "return": "enter", "del": "delete",
+    "pgup": "page_up", "pgdn": "page_down", "pageup": "page_up", "pagedown": "page_down",
+    "ins": "insert", "capslock": "caps_lock", "printscreen": "print_screen",
+}
+
+
+def parse_chord(text: str) -> tuple[int, str]:
+    """``"ctrl+shift+z"`` -> ``(CTRL | SHIFT, "z")``; raises ValueError if malformed."""
+    parts = [p.strip().lower() for p in text.split("+")]
+    if not parts or not parts[-1]:
+        raise ValueError(f"empty shortcut: {text!r}")
+    mask = 0
+    for part in parts[:-1]:
+        if part not in MODIFIER_NAMES:
+            raise ValueError(f"unknown modifier {part!r} in {text!r}")
+        mask |= MODIFIER_NAMES[part]
+    return mask, KEY_ALIASES.get(parts[-1], parts[-1])
+
+
+def format_chord(text: str) -> str:
+    """Display form for menus: ``ctrl+shift+z`` -> ``Ctrl+Shift+Z``."""
+    return ", ".join(
+        "+".join(p.strip().capitalize() for p in chord.split("+"))
+        for chord in text.split(",") if chord.strip()
+    )
+
+
+class ChordMatcher:
+    """Tracks held modifiers and maps (modifiers, key) to a handler.
+
+    ``keyboard`` is ``pynput.keyboard`` (or anything with ``Key`` and ``KeyCode``).
+    Chords that do not parse are skipped and described in ``errors``.
+    """
+
+    def __init__(self, keyboard, bindings: Iterable[tuple[str, Callable]]) -> None:
+        self.mask = 0
+        self._keycode = keyboard.KeyCode
+        # Modifier key -> (its bit, its own bit among that modifier's keys)
+        self._modifiers: dict = {}
+        # Keys held per modifier bit; small ints, so tracking them allocates nothing.
+        self._held = [0] * 16
+        for bit, names in MODIFIER_KEYS.items():
+            key_bit = 1
+            for name in names:
+                key = getattr(keyboard.Key, name, None)
+                if key is not None and key not in self._modifiers:
+                    self._modifiers[key] = (bit, key_bit)
+                    key_bit <<= 1
+        self._tables: list[dict] = [{} for _ in range(16)]
+        self.chords: list[tuple[int, str, Callable]] = []
+        self.errors: list[str] = []
+        for chord, handler in bindings:
+            try:
+                mask, name = parse_chord(chord)
+            except ValueError as e:
+                self.errors.append(str(e))
+                continue
+            table = self._tables[mask]
+            if len(name) == 1:
+                # Characters arrive in either case depending on Shift/Caps Lock;
+                # on Windows Ctrl turns letters into control characters, so
+                # those are matched by virtual key code instead.
+                table[name.lower()] = table[name.upper()] = handler
+                if name.isascii() and name.isalnum():
+                    table[ord(name.upper())] = handler
+            else:
+                key = getattr(keyboard.Key, name, None)
+                if key is None:
+                    self.errors.append(f"unknown key {name!r} in {chord!r}")
+                    continue
+                table[key] = handler
+            self.chords.append((mask, name, handler))
+
+    def lookup(self, key, mask: int) -> Optional[Callable]:
+        """Handler bound to ``key`` under ``mask``, without touching the held modifiers."""
+        if key.__class__ is not self._keycode:
+            return self._tables[mask].get(key)
+        char = key.char
+        if char is None or char < " ":
+            return self._tables[mask].get(key.vk)
+        return self._tables[mask].get(char)
+
+    def press(self, key) -> Optional[Callable]:
+        """Handler bound to ``key`` with the currently held modifiers, if any."""
+        if key.__class__ is not self._keycode:
+            modifier = self._modifiers.get(key)
+            if modifier is not None:
+                bit, key_bit = modifier
+                self._held[bit] |= key_bit
+                self.mask |= bit
+                return None
+            return self._tables[self.mask].get(key)
+        char = key.char
+        if char is None or char < " ":
+            return self._tables[self.mask].get(key.vk)
+        return self._tables[self.mask].get(char)
+
+    def release(self, key) -> int:
+        """Modifier bit cleared by releasing ``key``: 0 for ordinary keys, and while
+        the other key of the pair (e.g. the right Ctrl) is still held."""
+        if key.__class__ is self._keycode:
+            return 0
+        modifier = self._modifiers.get(key)
+        if modifier is None:
+            return 0
+        bit, key_bit = modifier
+        held = self._held[bit]
+        # An unseen press (e.g. before the hook started) clears the modifier.
+        held = self._held[bit] = held ^ key_bit if held & key_bit else 0
+        if held:
+            return 0
+        self.mask &= ~bit
+        return bit
@@ -0,0 +1,357 @@
+"""
+Continuous transcription of audio piped in on stdin or read from a FIFO.
+
+    arecord -f S16_LE -r 16000 -c 1 -t raw | python whispertype.py stream
+    python whispertype.py stream --input /run/user/1000/mic.fifo --format wav
+
+Audio is cut into utterances with an energy VAD and each one is sent to the
+configured whisper-server as soon as it ends; results are written to stdout as
+newline-delimited JSON::
+
+    {"start": 12.48, "end": 15.9, "text": "...", "latency": 0.41}
+
+``start``/``end`` are seconds since the start of the stream, ``latency`` the time
+from the end of the utterance to its result. Memory stays bounded however long
+the stream runs: only the current utterance (at most ``--max-segment`` seconds)
+is buffered, in the same ``CaptureBuffer`` the tray app records into, and at
+most ``QUEUE_SEGMENTS`` finished utterances wait for the server before reading
+pauses.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import math
+import queue
+import struct
+import sys
+import threading
+import time
+from collections import deque
+from typing import BinaryIO, Optional
+
+FRAME_MS = 30
+QUEUE_SEGMENTS = 4
+READ_BYTES = 64 * 1024
+
+_SAMPLE_FORMATS = {
+    # name: (numpy dtype, bytes per sample, scale to [-1, 1])
+    "s16le": ("<i2", 2, 1 / 32768.0),
+    "s32le": ("<i4", 4, 1 / 2147483648.0),
+    "f32le": ("<f4", 4, 1.0),
+    "u8": ("u1", 1, None),
+}
+
+
+def read_wav_header(stream: BinaryIO) -> tuple[int, int, str]:
+    """Parse a RIFF/WAVE header up to the data chunk; returns (rate, channels, format).
+
+    Streamed WAVs often carry a placeholder data size, so the data chunk is read
+    until EOF rather than trusting its length.
+    """
+    head = _read_exact(stream, 12)
+    if head[:4] != b"RIFF" or head[8:12] != b"WAVE":
+        raise ValueError("input is not a WAV stream (use --format raw)")
+    rate = channels = bits = tag = None
+    while True:
+        chunk_id, size = struct.unpack("<4sI", _read_exact(stream, 8))
+        if chunk_id == b"data":
+            break
+        body = _read_exact(stream, size + (size & 1))
+        if chunk_id == b"fmt ":
+            tag, channels, rate, _, _, bits = struct.unpack_from("<HHIIHH", body)
+    if rate is None:
+        raise ValueError("WAV stream has no fmt chunk before its data")
+    if tag == 3 and bits == 32:
+        fmt = "f32le"
+    elif tag in (1, 0xFFFE) and bits in (8, 16, 32):
+        fmt = {8: "u8", 16: "s16le", 32: "s32le"}[bits]
+    else:
+        raise ValueError(f"unsupported WAV encoding (format {tag}, {bits} bits)")
+    return rate, channels, fmt
+
+
+def _read_exact(stream: BinaryIO, n: int) -> bytes:
+    data = b""
+    while len(data) < n:
+        chunk = stream.read(n - len(data))
+        if not chunk:
+            raise ValueError("stream ended inside the WAV header")
+        data += chunk
+    return data
+
+
+class PcmDecoder:
+    """Bytes of interleaved PCM in, mono float32 at ``out_rate`` out; keeps partial
+    frames and the resampling phase between calls."""
+
+    def __init__(self, rate: int, channels: int, fmt: str, out_rate: int) -> None:
+        self.dtype, self.width, self.scale = _SAMPLE_FORMATS[fmt]
+        self.channels = channels
+        self.frame_bytes = self.width * channels
+        self.step = rate / out_rate
+        self._rest = b""
+        self._pos = 0.0
+        self._prev = None
+
+    def __call__(self, data: bytes):
+        from whispertype import _numpy
+
+        np = _numpy()
+        data = self._rest + data
+        usable = len(data) - len(data) % self.frame_bytes
+        self._rest = data[usable:]
+        x = np.frombuffer(data[:usable], dtype=self.dtype).astype(np.float32)
+        x = (x - 128.0) / 128.0 if self.scale is None else x * self.scale
+        if self.channels > 1:
+            x = x.reshape(-1, self.channels).mean(axis=1)
+        if self.step == 1.0 or not len(x):
+            return x
+        # Linear interpolation, continuous across calls: index 0 of xb is the
+        # previous call's last sample when there is one.
+        xb = x if self._prev is None else np.concatenate(([self._prev], x))
+        positions = np.arange(self._pos, len(xb) - 1 + 1e-9, self.step)
+        out = np.interp(positions, np.arange(len(xb)), xb).astype(np.float32)
+        next_pos = positions[-1] + self.step if len(positions) else self._pos
+        self._pos = next_pos - (len(xb) - 1)
+        self._prev = xb[-1]
+        return out
+
+
+class EnergyVAD:
+    """Frame-energy voice activity detector with an adaptive noise floor.
+
+    A frame is speech when its RMS level is ``margin_db`` above the running noise
+    floor (and above ``min_db``). An utterance starts after ``start_ms`` of speech
+    and ends after ``silence_ms`` of non-speech.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int,
+        margin_db: float = 10.0,
+        min_db: float = -50.0,
+        start_ms: int = 90,
+        silence_ms: int = 600,
+    ) -> None:
+        self.frame = sample_rate * FRAME_MS // 1000
+        self.margin_db = margin_db
+        self.min_db = min_db
+        self.start_frames = max(1, start_ms // FRAME_MS)
+        self.end_frames = max(1, silence_ms // FRAME_MS)
+        self.noise_db = min_db
+        self.in_speech = False
+        self._voiced = 0
+        self._unvoiced = 0
+
+    def level_db(self, frame) -> float:
+        from whispertype import _numpy
+
+        rms = float(_numpy().sqrt(_numpy().mean(frame * frame))) if len(frame) else 0.0
+        return 20.0 * math.log10(rms) if rms > 1e-10 else -200.0
+
+    def update(self, frame) -> Optional[str]:
+        """Feed one frame; returns "start", "end" or None."""
+        db = self.level_db(frame)
+        voiced = db > max(self.min_db, self.noise_db + self.margin_db)
+        if not voiced:
+            # Track the floor quickly downwards and slowly upwards.
+            rate = 0.3 if db < self.noise_db else 0.02
+            self.noise_db += rate * (max(db, -100.0) - self.noise_db)
+        if self.in_speech:
+            self._unvoiced = 0 if voiced else self._unvoiced + 1
+            if self._unvoiced >= self.end_frames:
+                self.in_speech = False
+                self._voiced = 0
+                return "end"
+        else:
+            self._voiced = self._voiced + 1 if voiced else 0
+            if self._voiced >= self.start_frames:
+                self.in_speech = True
+                self._unvoiced = 0
+                return "start"
+        return None
+
+
+class Segmenter:
+    """Cuts a sample stream into utterances held in a ``CaptureBuffer``.
+
+    ``feed()`` returns finished ``(start_s, end_s, wav)`` tuples. Each utterance
+    keeps ``preroll_ms`` of audio before the detected onset and is force-split at
+    ``max_segment_s``.
+    """
+
+    def __init__(self, vad: EnergyVAD, sample_rate: int, max_segment_s: float = 25.0, preroll_ms: int = 300) -> None:
+        from whispertype import CaptureBuffer
+
+        self.vad = vad
+        self.sample_rate = sample_rate
+        self.max_samples = int(max_segment_s * sample_rate)
+        self.buffer = CaptureBuffer(sample_rate, initial_seconds=max_segment_s + 1)
+        self.preroll: deque = deque(maxlen=max(1, preroll_ms // FRAME_MS))
+        self.position = 0  # samples consumed from the stream
+        self.segment_start = 0
+        self._pending = None  # partial frame
+
+    def feed(self, samples) -> list[tuple[float, float, object]]:
+        from whispertype import _numpy
+
+        out = []
+        if self._pending is not None and len(self._pending):
+            samples = _numpy().concatenate((self._pending, samples))
+        frame = self.vad.frame
+        whole = len(samples) - len(samples) % frame
+        self._pending = samples[whole:].copy()
+        for i in range(0, whole, frame):
+            f = samples[i:i + frame]
+            event = self.vad.update(f)
+            if event == "start":
+                self.segment_start = self.position - sum(len(p) for p in self.preroll)
+                self.buffer.clear()
+                for p in self.preroll:
+                    self.buffer.append(p)
+                self.preroll.clear()
+            if self.vad.in_speech or event == "end":
+                self.buffer.append(f)
+                if event == "end" or len(self.buffer) >= self.max_samples:
+                    out.append(self._cut())
+            else:
+                self.preroll.append(f)
+            self.position += len(f)
+        return out
+
+    def flush(self) -> list[tuple[float, float, object]]:
+        """End of stream: emit the utterance in progress, if any."""
+        if self.vad.in_speech and len(self.buffer):
+            return [self._cut()]
+        return []
+
+    def _cut(self) -> tuple[float, float, object]:
+        start = self.segment_start / self.sample_rate
+        end = (self.segment_start + len(self.buffer)) / self.sample_rate
+        wav = self.buffer.to_wav()
+        self.buffer.clear()
+        self.segment_start = self.position + self.vad.frame
+        return start, end, wav
+
+
+def stream_main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="whispertype.py stream",
+        description="Transcribe audio from stdin or a FIFO; NDJSON results on stdout.",
+    )
+    parser.add_argument("--input", default="-", help="FIFO or file to read (default: stdin)")
+    parser.add_argument("--format", choices=("auto", "raw", "wav"), default="auto",
+                        help="auto: WAV if the stream starts with a RIFF header, else raw")
+    parser.add_argument("--rate", type=int, default=16000, help="raw input sample rate")
+    parser.add_argument("--channels", type=int, default=1, help="raw input channels")
+    parser.add_argument("--sample-format", choices=sorted(_SAMPLE_FORMATS), default="s16le",
+                        help="raw input sample format")
+    parser.add_argument("--silence-ms", type=int, default=600, help="silence that ends an utterance")
+    parser.add_argument("--margin-db", type=float, default=10.0, help="speech level above the noise floor")
+    parser.add_argument("--max-segment", type=float, default=25.0, help="force a cut after this many seconds")
+    parser.add_argument("--port", default="", help="server port (default: [Server] port)")
+    args = parser.parse_args(argv)
+
+    import whispertype
+    from batch_transcribe import start_servers
+    from model_bench import stop_process
+
+    cfg = whispertype.ensure_config_file()
+    if cfg is None:
+        return 1
+    if args.port:
+        cfg.set("Server", "port", args.port)
+    cfg.set("Server", "request_timeout", str(max(30, int(args.max_segment * 4))))
+    # stdout is reserved for results.
+    with contextlib.redirect_stdout(sys.stderr):
+        client = whispertype.WhisperType(headless=True)
+        try:
+            started = start_servers(cfg, [int(client.port)], client.model_path, client.language, client.translate)
+        except (OSError, RuntimeError) as e:
+            print(f"[STREAM] {e}")
+            return 1
+
+    source = sys.stdin.buffer if args.input == "-" else open(args.input, "rb")
+    out = sys.stdout
+    segments: queue.Queue = queue.Queue(maxsize=QUEUE_SEGMENTS)
+
+    def transcriber():
+        while True:
+            item = segments.get()
+            if item is None:
+                return
+            start, end, wav, ended_at = item
+            text = client.transcribe_audio(wav)
+            if text:
+                out.write(json.dumps({
+                    "start": round(start, 2),
+                    "end": round(end, 2),
+                    "text": text,
+                    "latency": round(time.perf_counter() - ended_at, 3),
+                }, ensure_ascii=False) + "\n")
+                out.flush()
+
+    worker = threading.Thread(target=transcriber, daemon=True)
+    worker.start()
+    status = 0
+    try:
+        fmt = args.format
+        head = b""
+        if fmt != "raw":
+            head = source.read(4)
+            if fmt == "auto":
+                fmt = "wav" if head == b"RIFF" else "raw"
+        if fmt == "wav":
+            rate, channels, sample_format = read_wav_header(_Prefixed(head, source))
+            head = b""
+        else:
+            rate, channels, sample_format = args.rate, args.channels, args.sample_format
+        print(f"[STREAM] {fmt} input: {rate} Hz, {channels} ch, {sample_format}", file=sys.stderr)
+        decode = PcmDecoder(rate, channels, sample_format, client.sample_rate)
+        segmenter = Segmenter(
+            EnergyVAD(client.sample_rate, margin_db=args.margin_db, silence_ms=args.silence_ms),
+            client.sample_rate,
+            max_segment_s=args.max_segment,
+        )
+        # read1 returns whatever is available, so utterances are cut as they end
+        # instead of when a full READ_BYTES block has arrived.
+        read = getattr(source, "read1", source.read)
+        chunk = head or read(READ_BYTES)
+        while chunk:
+            for start, end, wav in segmenter.feed(decode(chunk)):
+                segments.put((start, end, wav, time.perf_counter()))
+            chunk = read(READ_BYTES)
+        for start, end, wav in segmenter.flush():
+            segments.put((start, end, wav, time.perf_counter()))
+    except KeyboardInterrupt:
+        pass
+    except ValueError as e:
+        print(f"[STREAM] {e}", file=sys.stderr)
+        status = 1
+    finally:
+        segments.put(None)
+        worker.join()
+        if source is not sys.stdin.buffer:
+            source.close()
+        for proc in started:
+            stop_process(proc)
+        with contextlib.redirect_stdout(sys.stderr):
+            client.quit()
+    return status
+
+
+class _Prefixed:
+    """Read-only stream that replays ``head`` before the rest of ``stream``."""
+
+    def __init__(self, head: bytes, stream: BinaryIO) -> None:
+        self.head = head
+        self.stream = stream
+
+    def read(self, n: int) -> bytes:
+        if self.head:
+            data, self.head = self.head[:n], self.head[n:]
+            return data
+        return self.stream.read(n)
@@ -0,0 +1,180 @@
+"""
+Tray icon frames, rendered once and cached on disk as a sprite sheet.
+
+The sheet holds the idle microphone, a busy frame (transcribing or waiting for
+the model) and ``LEVELS`` recording frames whose level bar grows with the input
+volume. Swapping icons while recording is then a list lookup; PIL only draws
+when the sheet is missing or its source icons changed.
+
+The audio callback publishes an RMS value and nothing else; ``level_index``
+maps it to a frame on the (throttled) recording thread.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import math
+import os
+import platform
+from typing import Optional
+
+log = logging.getLogger("whispertype.tray")
+
+SPRITE_SIZE = 64
+LEVELS = 16
+# Frame rate of the level meter; the tray backend re-encodes the icon on every swap.
+METER_FPS = 15
+# RMS range shown by the meter, in dBFS (speech sits around -30 to -10)
+FLOOR_DB = -60.0
+CEIL_DB = -6.0
+_SHEET_VERSION = 1
+
+RECORD_COLOR = (220, 30, 30, 255)
+BUSY_COLOR = (235, 160, 20, 255)
+_BAR_COLORS = ((60, 200, 80, 255), (240, 200, 40, 255), (230, 60, 40, 255))
+
+
+def cache_dir() -> str:
+    sysname = platform.system().lower()
+    if sysname == "windows":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+        return os.path.join(base, "whispertype", "cache")
+    if sysname == "darwin":
+        return os.path.expanduser("~/Library/Caches/whispertype")
+    return os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "whispertype")
+
+
+def level_index(rms: float, levels: int = LEVELS) -> int:
+    """Recording frame for an RMS amplitude (0..1): 0 at or below FLOOR_DB."""
+    if rms <= 0.0:
+        return 0
+    db = 20.0 * math.log10(rms)
+    step = round((db - FLOOR_DB) / (CEIL_DB - FLOOR_DB) * (levels - 1))
+    return min(max(step, 0), levels - 1)
+
+
+class SpriteSet:
+    """``idle``, ``busy`` and ``recording[level]`` images (RGBA, SPRITE_SIZE square)."""
+
+    def __init__(self, frames: list) -> None:
+        self.idle = frames[0]
+        self.busy = frames[1]
+        self.recording = frames[2:]
+
+    @classmethod
+    def load(cls, icon_path: str, recording_path: str = "", dark: bool = False,
+             folder: Optional[str] = None) -> "SpriteSet":
+        """Frames for these source icons, from the disk cache or freshly rendered.
+
+        ``dark`` draws the fallback microphone in black (macOS menu bar)."""
+        from PIL import Image
+
+        folder = cache_dir() if folder is None else folder
+        sheet_path = os.path.join(folder, f"tray-{_sheet_key(icon_path, recording_path, dark)}.png")
+        count = 2 + LEVELS
+        try:
+            with Image.open(sheet_path) as sheet:
+                if sheet.size == (SPRITE_SIZE * count, SPRITE_SIZE):
+                    sheet = sheet.convert("RGBA")
+                    return cls([
+                        sheet.crop((i * SPRITE_SIZE, 0, (i + 1) * SPRITE_SIZE, SPRITE_SIZE))
+                        for i in range(count)
+                    ])
+        except (OSError, ValueError):
+            pass
+        frames = render_frames(icon_path, recording_path, dark)
+        sheet = Image.new("RGBA", (SPRITE_SIZE * count, SPRITE_SIZE))
+        for i, frame in enumerate(frames):
+            sheet.paste(frame, (i * SPRITE_SIZE, 0))
+        tmp = f"{sheet_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(folder, exist_ok=True)
+            sheet.save(tmp, format="PNG")
+            os.replace(tmp, sheet_path)
+            log.debug("[ICON] Cached %d tray icon frames in %s", count, sheet_path)
+        except OSError as e:
+            log.debug("[ICON] Could not cache tray icons (%s)", e)
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+        return cls(frames)
+
+
+def _sheet_key(icon_path: str, recording_path: str, dark: bool) -> str:
+    parts = [str(_SHEET_VERSION), str(SPRITE_SIZE), str(LEVELS), str(dark)]
+    for path in (icon_path, recording_path):
+        try:
+            st = os.stat(path)
+            parts.append(f"{os.path.abspath(path)}:{st.st_size}:{st.st_mtime_ns}")
+        except OSError:
+            parts.append("-")
+    return hashlib.sha1("|".join(parts).encode()).hexdigest()[:16]
+
+
+def _open_icon(path: str):
+    from PIL import Image
+
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with Image.open(path) as image:
+            return image.convert("RGBA").resize((SPRITE_SIZE, SPRITE_SIZE), Image.LANCZOS)
+    except (OSError, ValueError):
+        return None
+
+
+def draw_microphone(size: int, color):
+    """The built-in microphone, used when the platform icon file is missing."""
+    from PIL import Image, ImageDraw
+
+    image = Image.new("RGBA", (size, size), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(image)
+    padding = size // 8
+    mic_width = size // 3
+    mic_height = size // 2
+    base_height = size // 6
+    mic_left = (size - mic_width) // 2
+    mic_bottom = padding + mic_height
+    draw.rounded_rectangle([mic_left, padding, mic_left + mic_width, mic_bottom], radius=mic_width // 2, fill=color)
+    base_top = mic_bottom - base_height // 2
+    draw.rounded_rectangle(
+        [size // 4, base_top, size - size // 4, base_top + base_height], radius=base_height // 2, fill=color
+    )
+    stand_width = size // 8
+    stand_left = (size - stand_width) // 2
+    draw.rectangle([stand_left, base_top, stand_left + stand_width, size - padding], fill=color)
+    return image
+
+
+def render_frames(icon_path: str, recording_path: str = "", dark: bool = False) -> list:
+    """[idle, busy, recording level 0 .. LEVELS-1], drawn with PIL."""
+    from PIL import ImageDraw
+
+    size = SPRITE_SIZE
+    idle = _open_icon(icon_path) or draw_microphone(size, "black" if dark else "white")
+    # Same spot as the red dot of icons/mic-recording-*.
+    dot = [size * 5 // 8, size // 8, size * 7 // 8, size * 3 // 8]
+
+    busy = idle.copy()
+    ImageDraw.Draw(busy).ellipse(dot, fill=BUSY_COLOR)
+
+    recording = _open_icon(recording_path)
+    if recording is None:
+        recording = idle.copy()
+        ImageDraw.Draw(recording).ellipse(dot, fill=RECORD_COLOR)
+
+    # Level bar along the left edge, filling upwards.
+    bar_width = max(2, size // 8)
+    bar_bottom = size - size // 16
+    bar_top = size // 16
+    frames = [idle, busy]
+    for level in range(LEVELS):
+        frame = recording.copy()
+        if level:
+            height = (bar_bottom - bar_top) * level // (LEVELS - 1)
+            color = _BAR_COLORS[min(level * len(_BAR_COLORS) // LEVELS, len(_BAR_COLORS) - 1)]
+            ImageDraw.Draw(frame).rectangle([0, bar_bottom - height, bar_width - 1, bar_bottom], fill=color)
+        frames.append(frame)
+    return frames
@@ -2,26 +2,288 @@
 
 import os
 import io
+import importlib
 import time
 import wave
 import threading
 import subprocess
-import numpy as np
 
 # Ensure $HOME is defined on Windows so config paths using ${HOME}/... expand correctly.
 os.environ.setdefault("HOME", os.path.expanduser("~"))
-import sounddevice as sd
-import requests
-import pyperclip
 import sys
 import configparser
 import shutil
-from PIL import Image, ImageDraw
-import pystray
-import pyautogui
-from pynput import keyboard
 import platform
 import shlex
+import logging
+from keep_warm import KeepWarm, prefetch_file
+from latency_stats import LatencyStats
+from model_catalog import ModelInventory
+from tray_icons import METER_FPS, SpriteSet, level_index
+from audio_spill import MultipartUpload, SpillFile
+from settings import Settings
+from config_store import ConfigWriter
+from dataclasses import fields, replace
+
+# Messages use %-style arguments so they are only formatted if a sink keeps them;
+# main() attaches the queued console/file/ring-buffer sinks (applog.py).
+log = logging.getLogger("whispertype")
+
+# Reference point for the startup timings reported in the log
+STARTED_AT = time.perf_counter()
+# Seconds to wait for whisper-server to load its model before giving up
+SERVER_LOAD_TIMEOUT = 300
+# [Shortcuts] bindings used when config.ini does not set them
+SHORTCUT_DEFAULTS = {
+    "record": "ctrl+shift+z",
+    "quit": "ctrl+shift+x",
+    "toggle_type": "ctrl+shift+t",
+}
+
+# Heavy third-party modules are imported on first use (see the accessors below) so
+# the tray icon appears quickly; prewarm_imports() loads the dictation path in the
+# background right after startup. benchmarks/startup_importtime.py guards this.
+np = None
+sd = None
+pyautogui = None
+
+
+def _numpy():
+    global np
+    if np is None:
+        import numpy
+        np = numpy
+    return np
+
+
+def _sounddevice():
+    global sd
+    if sd is None:
+        import sounddevice
+        sd = sounddevice
+    return sd
+
+
+def _pyautogui():
+    """Import pyautogui (slow: pulls in screenshot/window helpers) and configure it."""
+    global pyautogui
+    if pyautogui is None:
+        import pyautogui as mod
+        mod.FAILSAFE = False
+        if platform.system().lower() == 'linux':
+            mod.KEYBOARD_MAPPING = {
+                'enter': 'Return',
+                'tab': 'Tab',
+                'space': 'space'
+            }
+        pyautogui = mod
+    return pyautogui
+
+
+def encode_wav(samples, sample_rate):
+    """16-bit mono WAV of float samples in [-1, 1], as a rewound in-memory buffer."""
+    np = _numpy()
+    buf = io.BytesIO()
+    with wave.open(buf, 'wb') as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        wf.writeframes((samples * 32767).astype(np.int16).tobytes())
+    buf.seek(0)
+    return buf
+
+
+def wav_seconds(wav_buf):
+    """Length in seconds of an ``encode_wav`` buffer or a ``SpillFile``."""
+    if isinstance(wav_buf, SpillFile):
+        return wav_buf.n / wav_buf.sample_rate
+    with wav_buf.getbuffer() as view:
+        rate = int.from_bytes(view[24:28], 'little')
+        return (len(view) - 44) / 2 / rate if rate else 0.0
+
+
+class CaptureBuffer:
+    """Growable mono float32 sample buffer, filled block by block (the input-stream
+    callback, or a stream reader). Capacity doubles as needed and survives clear(),
+    so steady-state capture allocates nothing beyond the block copy itself.
+
+    ``max_seconds`` caps the capture: later samples are dropped and ``full`` is set
+    (0 = no cap). With a cap, a capture longer than ``spill_seconds`` moves to a
+    memory-mapped temp file in ``spill_dir`` (audio_spill.py) instead of growing in RAM.
+    The move is made by ``spill_if_due()`` on the recording thread; the callback
+    only appends, to RAM or to the spill file."""
+
+    # RAM kept past spill_seconds for blocks that arrive while the spill file is set up
+    SPILL_HEADROOM_SECONDS = 5.0
+
+    def __init__(self, sample_rate, initial_seconds=30.0, max_seconds=0.0, spill_seconds=0.0, spill_dir=""):
+        self.sample_rate = sample_rate
+        self._initial = int(sample_rate * initial_seconds)
+        self._buf = None
+        self._n = 0
+        self._max = int(sample_rate * max_seconds) if max_seconds > 0 else 0
+        self._spill_at = int(sample_rate * spill_seconds) if self._max and 0 < spill_seconds < max_seconds else 0
+        self.spill_dir = spill_dir
+        self.spill = None
+        self.full = False
+        # Held by append() and by the final hand-over in spill_if_due(), which copies
+        # at most one poll interval of audio; uncontended otherwise.
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._n
+
+    @property
+    def seconds(self):
+        return self._n / self.sample_rate
+
+    def append(self, block):
+        """Copy in a (frames,) or (frames, channels) block; channels are averaged."""
+        if block.ndim > 1:
+            block = block[:, 0] if block.shape[1] == 1 else block.mean(axis=1)
+        with self._lock:
+            n = len(block)
+            if self._max and self._n + n >= self._max:
+                self.full = True
+                n = self._max - self._n
+                if n <= 0:
+                    return
+                block = block[:n]
+            if self.spill is not None:
+                self.spill.append(block)
+                self._n += n
+                return
+            if self._buf is None or self._n + n > len(self._buf):
+                need = self._n + n
+                size = max(self._initial, 2 * need)
+                cap = self._spill_at + int(self.sample_rate * self.SPILL_HEADROOM_SECONDS)
+                if self._spill_at and need <= cap:
+                    # Past this the recording thread moves the capture to disk; grow
+                    # further only if it falls behind.
+                    size = min(size, cap)
+                grown = _numpy().empty(size, dtype='float32')
+                if self._n:
+                    grown[:self._n] = self._buf[:self._n]
+                self._buf = grown
+            self._buf[self._n:self._n + n] = block
+            self._n += n
+
+    def spill_if_due(self):
+        """Move a capture longer than ``spill_seconds`` to its spill file; True once moved.
+
+        Call from the recording thread: creating the file and copying the RAM
+        backlog happen here while the callback keeps appending to RAM, and only
+        the last few blocks are copied under the lock before the switch."""
+        if self.spill is not None or not self._spill_at or self._n < self._spill_at:
+            return self.spill is not None
+        from audio_spill import SpillFile
+        spill = SpillFile(self.sample_rate, self._max, self.spill_dir)
+        copied = 0
+        while self._n - copied > self.sample_rate // 10:
+            end = self._n
+            buf = self._buf
+            for start in range(copied, end, 65536):  # bounded scratch space
+                spill.append(buf[start:min(start + 65536, end)])
+            copied = end
+        with self._lock:
+            if self._n > copied:
+                spill.append(self._buf[copied:self._n])
+            self.spill = spill
+            self._buf = None  # the backlog now lives in the file
+        return True
+
+    def samples(self):
+        """View of the captured samples (valid until the next append/clear); a copy
+        read back from disk once the capture has spilled."""
+        if self.spill is not None:
+            return self.spill.samples()
+        if self._buf is None:
+            return _numpy().zeros(0, dtype='float32')
+        return self._buf[:self._n]
+
+    def tail_rms(self, n):
+        """RMS of the last ``n`` captured samples; allocates only the result."""
+        if self.spill is not None:
+            return self.spill.tail_rms()
+        n = min(n, self._n)
+        if not n:
+            return 0.0
+        tail = self._buf[self._n - n:self._n]
+        return (float(tail.dot(tail)) / n) ** 0.5
+
+    def release(self):
+        """Drop spilled pages that are on disk from RSS (call from the recording thread)."""
+        spill = self.spill
+        return spill.release() if spill is not None else 0
+
+    def consume(self, n):
+        """Drop the first ``n`` samples, keeping the rest."""
+        n = min(n, self._n)
+        if n:
+            self._buf[:self._n - n] = self._buf[n:self._n]
+            self._n -= n
+
+    def clear(self):
+        if self.spill is not None:
+            self.spill.close()
+            self.spill = None
+        self._n = 0
+        self.full = False
+
+    def to_wav(self):
+        """In-memory WAV, or for a spilled capture its ``SpillFile``: ownership moves
+        to the caller (upload it with audio_spill.MultipartUpload, then close it)
+        and the buffer starts over empty."""
+        if self.spill is not None:
+            spill, self.spill = self.spill, None
+            self._n = 0
+            self.full = False
+            return spill
+        return encode_wav(self.samples(), self.sample_rate)
+
+
+def load_audio_file(path, sample_rate=16000):
+    """Mono float32 samples at ``sample_rate`` from a PCM WAV file, or via ffmpeg for
+    anything else (mp3, m4a voice memos, ...)."""
+    np = _numpy()
+    if path.lower().endswith('.wav'):
+        with wave.open(path, 'rb') as wf:
+            channels, width, rate = wf.getnchannels(), wf.getsampwidth(), wf.getframerate()
+            raw = wf.readframes(wf.getnframes())
+        if width == 2:
+            data = np.frombuffer(raw, dtype='<i2').astype(np.float32) / 32768.0
+        elif width == 4:
+            data = np.frombuffer(raw, dtype='<i4').astype(np.float32) / 2147483648.0
+        elif width == 1:
+            data = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+        else:
+            raise ValueError(f"unsupported WAV sample width: {width} bytes")
+        if channels > 1:
+            data = data.reshape(-1, channels).mean(axis=1)
+        if rate != sample_rate and len(data):
+            n = int(len(data) * sample_rate / rate)
+            data = np.interp(np.linspace(0, len(data) - 1, n), np.arange(len(data)), data).astype(np.float32)
+        return data
+    ffmpeg = shutil.which('ffmpeg')
+    if not ffmpeg:
+        raise ValueError("not a WAV file and ffmpeg is not installed")
+    proc = subprocess.run(
+        [ffmpeg, '-nostdin', '-v', 'error', '-i', path, '-f', 's16le', '-ac', '1', '-ar', str(sample_rate), '-'],
+        capture_output=True,
+    )
+    if proc.returncode != 0:
+        raise ValueError(proc.stderr.decode(errors='replace').strip() or "ffmpeg failed")
+    return np.frombuffer(proc.stdout, dtype='<i2').astype(np.float32) / 32768.0
+
+
+def prewarm_imports():
+    """Import the modules the first dictation needs, in the order they are used."""
+    for load in (_numpy, _sounddevice, 'requests', 'pyperclip', _pyautogui):
+        try:
+            load() if callable(load) else importlib.import_module(load)
+        except Exception:
+            # Reported again, with context, when the feature is actually used.
+            pass
 
 
 def load_config():
@@ -44,11 +306,6 @@ def load_config():
 
 
 CONFIG = None
-MIN_RECORDING_DURATION = 0.1
-REQUEST_TIMEOUT = 10
-SHOW_AUDIO_METER = False
-AUTO_COPY = False
-AUTO_TYPE = False
 
 
 def config_file_paths():
@@ -89,22 +346,68 @@ def reload_config_from_disk():
     cfg = configparser.ConfigParser(interpolation=configparser.ExtendedInterpolation())
     cfg.read(config_path)
     CONFIG = cfg
-    sync_globals_from_config()
     return cfg
 
 
-def sync_globals_from_config():
-    global MIN_RECORDING_DURATION, SHOW_AUDIO_METER, AUTO_COPY, AUTO_TYPE
-    if CONFIG is None:
-        MIN_RECORDING_DURATION = 0.1
-        SHOW_AUDIO_METER = False
-        AUTO_COPY = False
-        AUTO_TYPE = False
-        return
-    MIN_RECORDING_DURATION = float(CONFIG.get('Recording', 'min_duration', fallback='0.1'))
-    SHOW_AUDIO_METER = CONFIG.getboolean('Defaults', 'show_audio_meter', fallback=False)
-    AUTO_COPY = CONFIG.getboolean('Defaults', 'auto_copy', fallback=False)
-    AUTO_TYPE = CONFIG.getboolean('Defaults', 'auto_type', fallback=False)
+def server_command_args(cmd_template, model_path, language, port, translate):
+    """Argument list for whisper-server from the [Server] command template."""
+    cmd = cmd_template.format(
+        model_path=model_path,
+        language=language,
+        port=port
+    )
+    if translate:
+        cmd += ' -tr'
+    posix = os.name != "nt"
+    return shlex.split(cmd, posix=posix)
+
+
+def spawn_server(config, model_path, language, port, translate, prefetch=True):
+    """whisper-server for ``model_path``. With ``[Server] shared`` (the default) this
+    is a ``server_share.SharedServer`` lease on the server every WhisperType of the
+    user shares; it may listen on another port than ``port`` (see its ``port``).
+    Otherwise, or if the shared daemon fails, a private child process."""
+    command = config.get("Server", "command", raw=True)
+    if config.getboolean('Server', 'shared', fallback=True):
+        from server_share import acquire
+        try:
+            lease = acquire(command, model_path, port, language, translate, prefetch)
+        except Exception as e:
+            log.warning("[SERVER] Shared whisper-server unavailable (%s), starting a private one", e)
+        else:
+            log.info(
+                "[SERVER] %s shared whisper-server on port %s (pid %s, %d client(s))",
+                "Started" if lease.launched else "Joined", lease.port, lease.pid, lease.clients,
+            )
+            return lease
+    if prefetch:
+        method = prefetch_file(model_path)
+        log.debug("[SERVER] Prefetching model into the page cache (%s)", method or 'failed')
+    args = server_command_args(command, model_path, language, port, translate)
+    log.debug("[SERVER] Starting server with command: %s", shlex.join(args))
+    return subprocess.Popen(args)
+
+
+def launch_server_from_config(config):
+    """Start whisper-server for the configured default model (used before the UI exists)."""
+    models_dir = os.path.expanduser(os.path.expandvars(config.get("Models", "models_dir", raw=True) or ""))
+    model_path = os.path.join(models_dir, config.get('Models', 'default_model', fallback='ggml-tiny.en.bin'))
+    if not os.path.exists(model_path):
+        return None
+    return spawn_server(
+        config,
+        model_path,
+        config.get('Defaults', 'language', fallback='en'),
+        config.get('Server', 'port', fallback='7777'),
+        config.getboolean('Defaults', 'translate', fallback=False),
+        config.getboolean('Server', 'prefetch_model', fallback=True),
+    )
+
+
+def server_url_for(process, port):
+    """Inference URL of a server from ``spawn_server`` (a shared one has its own port)."""
+    return f"http://localhost:{getattr(process, 'port', port)}/inference"
+
 
 class WhisperTypeConfig:
     def __init__(self):
@@ -123,270 +426,360 @@ class WhisperTypeConfig:
         return self.config.getfloat(section, key, fallback=fallback)
 
 class WhisperType:
-    def __init__(self):
-        print("[INIT] Starting WhisperType initialization...")
+    def __init__(self, server_process=None, headless=False, input_stream_factory=None):
+        """``server_process``: a whisper-server main() already launched for the
+        configured model, so the model loads while the tray and hooks are built.
+
+        ``headless``: no tray, keyboard hooks or server auto-start; the caller drives
+        start_recording()/stop_recording() against a server it manages (benchmarks).
+        ``input_stream_factory``: replaces ``sounddevice.InputStream`` (same
+        signature and callback contract), e.g. to feed audio from WAV files."""
+        log.info("[INIT] Starting WhisperType initialization...")
         self.config = WhisperTypeConfig()
-        self.verbose = self.config.getboolean('Defaults', 'verbose', fallback=False)
+        self.settings = self.load_settings()
         
         # Initialize state variables
         self.recording = False
         self.menu_recording = False
         self.running = True
-        self.ctrl_pressed = False
-        self.shift_pressed = False
-        self.audio_data = []
+        self.shortcuts = None
+        self._hold_mask = 0
+        self._hold_handler = None
+        self.headless = headless
+        self.input_stream_factory = input_stream_factory
         
         # Load settings from config
-        self.sample_rate = self.config.getint('Recording', 'sample_rate', 16000)
+        self.sample_rate = self.settings.sample_rate
+        # Capped at max_duration; past spill_after seconds the audio goes to a mapped temp file
+        spill_dir = self.config.get('Recording', 'spill_dir', fallback='', raw=True).strip()
+        self.capture = CaptureBuffer(
+            self.sample_rate,
+            max_seconds=self.settings.max_duration,
+            spill_seconds=self.settings.spill_after,
+            spill_dir=os.path.expanduser(os.path.expandvars(spill_dir)) if spill_dir else "",
+        )
         
-        # Server state
+        # Server state; server_ready is set once the readiness probe passes
         self.server_running = False
         self.server_process = None
+        self.server_ready = False
+        self.tray_icon = None
+        self._first_dictation_reported = False
+        self._server_ready_event = threading.Event()
+        self._server_lock = threading.Lock()
+        # Serializes settings changes (tray, control socket, config watcher, wizard)
+        # and the server swaps they cause; reentrant for reload -> rebind.
+        self._settings_lock = threading.RLock()
+        # Dictations between key-up and the text being handed on; a swap waits for them.
+        self._in_flight = 0
+        self._idle_cond = threading.Condition()
+        self._wizard_running = False
         
-        # Configure pyautogui
-        self.log("[INIT] Configuring pyautogui settings...")
-        pyautogui.FAILSAFE = False
-        if platform.system().lower() == 'linux':
-            self.log("[INIT] Linux detected, setting up X11 keyboard mapping")
-            pyautogui.KEYBOARD_MAPPING = {
-                'enter': 'Return',
-                'tab': 'Tab',
-                'space': 'space'
-            }
+        # Idle policy: stop the server after this many minutes without a request
+        # (0 = never); the next recording relaunches it while the user speaks.
+        self.idle_unload_minutes = self.settings.idle_unload_minutes
+        self.idle_unloaded = False
+        self.last_activity = time.monotonic()
+        self._relaunch_started = None
+        # Set from key-down until the relaunch worker has started the server (or failed).
+        self._relaunching = False
+        
+        # Per-stage dictation latency (tray "Performance stats")
+        trace_file = self.config.get('Performance', 'trace_file', fallback='', raw=True).strip()
+        self.latency = LatencyStats(os.path.expanduser(os.path.expandvars(trace_file)) if trace_file else "")
+        self._record_thread = None
+        self._record_stop = threading.Event()
+        # Tray level meter: the audio callback stores the block RMS, the recording
+        # thread swaps in the matching pre-rendered icon (tray_icons.py).
+        self.sprites = None
+        self._normal_icon = None
+        self.meter_rms = 0.0
+        self._meter_on = False
+        self._meter_shown = 0
+        self._icon_lock = threading.Lock()
+        
+        # Keep-warm: silent ping after this many idle seconds (0 = off)
+        self.keep_warm = None
+        keep_warm_seconds = self.settings.keep_warm_seconds
+        if keep_warm_seconds > 0:
+            self.keep_warm = KeepWarm(
+                self._keep_warm_ping,
+                keep_warm_seconds,
+                lambda: self.server_ready and not self.recording and not self._in_flight,
+                log=log.debug,
+            )
+        
+        # config.ini changes from the tray are persisted by a debounced background writer
+        self.config_writer = ConfigWriter(*config_file_paths())
+        
+        # Local control socket (control.py); started with the tray unless disabled
+        self.control = None
+        self.config_watcher = None
+        # Transcription history (history.py); opened with the tray unless disabled
+        self.history = None
         
         # Load configuration
         raw_models = self.config.get("Models", "models_dir", raw=True)
         self.models_dir = os.path.expanduser(os.path.expandvars(raw_models or ""))
         if not self.models_dir:
-            print("Error: models_dir not set in config.ini")
+            log.error("Error: models_dir not set in config.ini")
             sys.exit(1)
         if not os.path.exists(self.models_dir):
-            print(f"Error: Models directory not found: {self.models_dir}")
+            log.error("Error: Models directory not found: %s", self.models_dir)
             sys.exit(1)
             
         default_model = self.config.get('Models', 'default_model', fallback='ggml-tiny.en.bin')
         self.model_path = os.path.join(self.models_dir, default_model)
+        # Models offered in the tray; rescanned only when the folder changes
+        self.model_inventory = ModelInventory(self.models_dir, on_change=self._models_changed)
         self.language = self.config.get('Defaults', 'language', fallback='en')
         self.port = self.config.get('Server', 'port', fallback='7777')
         self.translate = self.config.getboolean('Defaults', 'translate', fallback=False)
         
-        # Initialize server URL and persistent HTTP session
+        # Initialize server URL; the persistent HTTP session is created on first use
         self.server_url = f"http://localhost:{self.port}/inference"
-        self.session = requests.Session()
+        self._session = None
+        self._warm_session = None  # keep-warm pings: requests.Session is not thread-safe
+        
+        if server_process is not None:
+            log.debug("[INIT] Adopting whisper-server launched at startup...")
+            self.server_process = server_process
+            self.server_url = server_url_for(server_process, self.port)
+            self.server_running = True
+            self._watch_server_ready(server_process)
         
         # Platform-specific setup
-        self.log("[INIT] Setting up platform-specific configurations...")
+        log.debug("[INIT] Setting up platform-specific configurations...")
         self.setup_platform()
         
+        if headless:
+            log.debug("[INIT] Headless mode: no tray, hotkeys or server auto-start")
+            log.debug("[INIT] WhisperType initialization complete!")
+            return
+        
         # Create tray icon
-        self.log("[INIT] Creating system tray icon...")
+        log.debug("[INIT] Creating system tray icon...")
         self.create_tray_icon()
         
         # Start keyboard listener
-        self.log("[INIT] Setting up keyboard listeners...")
+        log.debug("[INIT] Setting up keyboard listeners...")
         try:
             self.setup_keyboard_listener()
         except Exception as e:
-            self.log(f"[INIT] Error setting up keyboard listener: {e}")
+            log.error("[INIT] Error setting up keyboard listener: %s", e)
             sys.exit(1)
         
-        # Auto-start server
-        self.log("[INIT] Auto-starting server...")
-        self.start_server()
+        # Auto-start server (unless main() already did)
+        if not self.server_running:
+            log.debug("[INIT] Auto-starting server...")
+            self.start_server()
         
-        self.log("[INIT] WhisperType initialization complete!")
-
-    def log(self, message):
-        """Log a message to console if verbose is enabled."""
-        if self.verbose:
-            print(message)
-
-    def setup_keyboard_listener(self):
-        """Setup keyboard event handling"""
-        def parse_shortcut(shortcut_str):
-            """Parse shortcut string into modifier keys and main key"""
-            parts = shortcut_str.lower().split('+')
-            return {'ctrl': 'ctrl' in parts, 'shift': 'shift' in parts, 'key': parts[-1]}
-            
-        # Load shortcuts from config
-        record_shortcut = parse_shortcut(self.config.get('Shortcuts', 'record', fallback='ctrl+shift+z'))
-        quit_shortcut = parse_shortcut(self.config.get('Shortcuts', 'quit', fallback='ctrl+shift+x'))
-        toggle_type_shortcut = parse_shortcut(self.config.get('Shortcuts', 'toggle_type', fallback='ctrl+shift+t'))
+        self.model_inventory.start()
+        if self.config.getboolean('Control', 'enabled', fallback=True):
+            self.start_control_server(self.config.get('Control', 'address', fallback='', raw=True).strip())
+        if self.config.getboolean('History', 'enabled', fallback=True):
+            self.open_history()
+        if self.config.getboolean('Defaults', 'watch_config', fallback=True):
+            from config_watch import ConfigWatcher
+            self.config_watcher = ConfigWatcher(config_file_paths()[0], self.reload_config)
+            self.config_watcher.start()
         
+        threading.Thread(target=prewarm_imports, daemon=True).start()
+        if self.idle_unload_minutes > 0:
+            threading.Thread(target=self._idle_monitor, daemon=True).start()
+        if self.keep_warm is not None:
+            self.keep_warm.start()
+        self.ui_ready_at = time.perf_counter()
+        log.info("[PERF] Tray and hotkeys ready after %.2fs", self.ui_ready_at - STARTED_AT)
+        self.update_tray_status()
+        log.debug("[INIT] WhisperType initialization complete!")
+
+    def load_settings(self):
+        """Typed snapshot of config.ini; rejected values are logged and defaulted."""
+        settings, errors = Settings.from_config(self.config.config)
+        for error in errors:
+            log.warning("[CONFIG] %s", error)
+        return settings
+
+    @property
+    def session(self):
+        """Persistent HTTP session (requests is imported on first use)."""
+        if self._session is None:
+            import requests
+            self._session = requests.Session()
+        return self._session
+
+    def start_control_server(self, address=""):
+        """Listen for start/stop/cancel/status/switch_model on the local control socket."""
+        from control import ControlServer
+        try:
+            server = ControlServer(self, address)
+            server.start()
+        except Exception as e:
+            log.warning("[CONTROL] Control socket disabled: %s", e)
+            return None
+        self.control = server
+        log.debug("[CONTROL] Listening on %s", server.address)
+        return server
+
+    def open_history(self):
+        """Record transcriptions in the history database; on error history stays off."""
+        from history import HistoryStore
+        raw_path = self.config.get('History', 'path', fallback='', raw=True).strip()
+        try:
+            store = HistoryStore(
+                os.path.expanduser(os.path.expandvars(raw_path)),
+                keep_audio=self.config.getboolean('History', 'keep_audio', fallback=False),
+            )
+        except Exception as e:
+            log.warning("[HISTORY] Transcription history disabled: %s", e)
+            return None
+        self.history = store
+        log.debug("[HISTORY] Saving transcriptions to %s", store.path)
+        return store
+
+    def copy_from_history(self, text):
+        """Tray "Recent transcriptions": put an earlier transcription on the clipboard."""
+        try:
+            import pyperclip
+            pyperclip.copy(text)
+            log.debug("[HISTORY] Copied earlier transcription to clipboard")
+        except Exception as e:
+            log.error("[HISTORY] Could not copy to clipboard: %s", e)
+
+    def _emit(self, event, **fields):
+        """Push an event to control-socket subscribers (no-op without subscribers)."""
+        if self.control is not None:
+            self.control.publish({"event": event, **fields})
+
+    def setup_keyboard_listener(self, keyboard=None):
+        """Compile ``[Shortcuts]`` into a chord matcher and start the global hook
+        (``keyboard`` defaults to ``pynput.keyboard``)"""
+        with self._settings_lock:
+            self._setup_keyboard_listener(keyboard)
+
+    def _setup_keyboard_listener(self, keyboard):
+        from shortcuts import ChordMatcher, parse_chord
+
+        if keyboard is None:
+            from pynput import keyboard
+
+        actions = {
+            "toggle_record": self.toggle_recording,
+            "cancel": self.cancel_recording,
+            "quit": self.quit,
+            "toggle_type": self.toggle_auto_type,
+            "toggle_copy": self.toggle_auto_copy,
+            "toggle_translation": self.toggle_translation,
+        }
+        bindings = []
+        for action, chords in self.shortcut_bindings().items():
+            if action != "record" and action not in actions:
+                log.warning("[KEYBOARD] Unknown action '%s' in [Shortcuts], ignored", action)
+                continue
+            for chord in chords.split(","):
+                chord = chord.strip()
+                if not chord:
+                    continue
+                if action == "record":
+                    try:
+                        handler = self._hold_to_record(parse_chord(chord)[0])
+                    except ValueError:
+                        handler = None  # reported by the matcher
+                else:
+                    handler = actions[action]
+                bindings.append((chord, handler))
+        matcher = ChordMatcher(keyboard, bindings)
+        for error in matcher.errors:
+            log.warning("[KEYBOARD] Ignoring shortcut: %s", error)
+        self.shortcuts = matcher
+        press, release, lookup = matcher.press, matcher.release, matcher.lookup
+
         def on_press(key):
-            try:
-                self.log(f"[KEYBOARD] Key pressed: {key}")
-                if key == keyboard.Key.ctrl_l or key == keyboard.Key.ctrl_r:
-                    self.log("[KEYBOARD] Ctrl key pressed")
-                    self.ctrl_pressed = True
-                elif key == keyboard.Key.shift_l or key == keyboard.Key.shift_r:
-                    self.log("[KEYBOARD] Shift key pressed")
-                    self.shift_pressed = True
-                elif hasattr(key, 'char'):
-                    # On Windows, Ctrl held down makes key.char a control character
-                    # (e.g. Ctrl+A → '\x01'). Fall back to vk (virtual key code) to
-                    # recover the plain letter (vk 65-90 → 'a'-'z').
-                    raw = key.char
-                    if raw and ord(raw) < 32 and hasattr(key, 'vk') and key.vk is not None:
-                        raw = chr(key.vk).lower()
-                    key_char = raw.lower() if raw else None
-                    if key_char:
-                        # Check record shortcut
-                        if (record_shortcut['ctrl'] == self.ctrl_pressed and 
-                            record_shortcut['shift'] == self.shift_pressed and 
-                            key_char == record_shortcut['key']):
-                            self.log("[KEYBOARD] Record shortcut detected, starting recording")
-                            self.start_recording()
-                        # Check quit shortcut
-                        elif (quit_shortcut['ctrl'] == self.ctrl_pressed and 
-                              quit_shortcut['shift'] == self.shift_pressed and 
-                              key_char == quit_shortcut['key']):
-                            self.log("[KEYBOARD] Quit shortcut detected, quitting application")
-                            self.quit()
-                        # Check toggle type shortcut
-                        elif (toggle_type_shortcut['ctrl'] == self.ctrl_pressed and 
-                              toggle_type_shortcut['shift'] == self.shift_pressed and 
-                              key_char == toggle_type_shortcut['key']):
-                            self.log("[KEYBOARD] Toggle type shortcut detected, toggling auto-type")
-                            self.toggle_auto_type()
-            except AttributeError as e:
-                self.log(f"[KEYBOARD] AttributeError in on_press: {e}")
+            handler = press(key)
+            if handler is not None:
+                log.debug("[KEYBOARD] Shortcut %s -> %s", key, getattr(handler, '__name__', handler))
+                handler()
 
         def on_release(key):
-            try:
-                self.log(f"[KEYBOARD] Key released: {key}")
-                if key in (keyboard.Key.ctrl_l, keyboard.Key.ctrl_r):
-                    self.log("[KEYBOARD] Ctrl key released")
-                    self.ctrl_pressed = False
-                elif key in (keyboard.Key.shift_l, keyboard.Key.shift_r):
-                    self.log("[KEYBOARD] Shift key released")
-                    self.shift_pressed = False
-                
-                # Stop recording if either Ctrl or Shift is released
-                if (key in (keyboard.Key.ctrl_l, keyboard.Key.ctrl_r, keyboard.Key.shift_l, keyboard.Key.shift_r) 
-                    and not (self.ctrl_pressed and self.shift_pressed)
-                    and not self.menu_recording  # Only stop if not menu-triggered recording
-                    and self.recording):
-                    self.log("[KEYBOARD] Hotkey released, stopping recording")
-                    self.stop_recording()
-            except AttributeError as e:
-                self.log(f"[KEYBOARD] AttributeError in on_release: {e}")
+            bit = release(key)
+            if not self.recording or self.menu_recording:
+                return
+            # Hold-to-record ends when a modifier of the chord (or a bare hotkey) is released.
+            if bit & self._hold_mask or (not self._hold_mask and lookup(key, 0) is self._hold_handler):
+                log.debug("[KEYBOARD] Hotkey released, stopping recording")
+                self.stop_recording()
 
         self.listener = keyboard.Listener(on_press=on_press, on_release=on_release)
         self.listener.start()
-        self.log("[KEYBOARD] Keyboard listener started successfully")
+        log.debug("[KEYBOARD] Keyboard listener started with %s shortcut(s)", len(matcher.chords))
+
+    def shortcut_bindings(self):
+        """``[Shortcuts]`` action -> chord(s), on top of the built-in defaults."""
+        bindings = dict(SHORTCUT_DEFAULTS)
+        cfg = self.config.config
+        if cfg.has_section('Shortcuts'):
+            for action, chords in cfg.items('Shortcuts', raw=True):
+                if action not in cfg.defaults():
+                    bindings[action] = chords
+        return bindings
+
+    def _hold_to_record(self, mask):
+        """Handler for a record chord: records while the chord's modifiers stay held."""
+        def record():
+            if not self.recording:
+                self._hold_mask = mask
+                self._hold_handler = record
+                self.start_recording()
+        return record
 
     def setup_platform(self):
         """Setup platform-specific configurations"""
         self.platform = platform.system().lower()
-        self.log(f"[PLATFORM] Detected platform: {self.platform}")
+        log.debug("[PLATFORM] Detected platform: %s", self.platform)
         
         # Get the directory where the script is located
         script_dir = os.path.dirname(os.path.abspath(__file__))
         
         if self.platform == 'windows':
             self.icon_path = os.path.join(script_dir, 'icons/mic-windows.ico')
+            self.recording_icon_path = os.path.join(script_dir, 'icons/mic-recording-windows.ico')
         elif self.platform == 'darwin':  # macOS
             self.icon_path = os.path.join(script_dir, 'icons/mic-macos.png')
+            self.recording_icon_path = os.path.join(script_dir, 'icons/mic-recording-macos.png')
         else:  # Linux
             self.icon_path = os.path.join(script_dir, 'icons/mic-linux.png')
-        self.log(f"[PLATFORM] Using icon path: {self.icon_path}")
+            self.recording_icon_path = os.path.join(script_dir, 'icons/mic-recording-linux.png')
+        log.debug("[PLATFORM] Using icon path: %s", self.icon_path)
 
     def create_default_icon(self):
         """Create a default icon if the icon file is not found"""
-        self.log("[ICON] Creating default icon...")
-        size = 256
-        color = 'white' if self.platform != 'darwin' else 'black'
-        
-        # Create a new image with transparent background
-        image = Image.new('RGBA', (size, size), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(image)
-        
-        # Calculate dimensions for microphone icon
-        padding = size // 8
-        mic_width = size // 3
-        mic_height = size // 2
-        base_height = size // 6
-        
-        # Draw microphone body
-        mic_left = (size - mic_width) // 2
-        mic_top = padding
-        mic_right = mic_left + mic_width
-        mic_bottom = mic_top + mic_height
-        
-        # Microphone body (rounded rectangle)
-        draw.rounded_rectangle(
-            [mic_left, mic_top, mic_right, mic_bottom],
-            radius=mic_width // 2,
-            fill=color
-        )
-        
-        # Microphone base
-        base_left = size // 4
-        base_right = size - size // 4
-        base_top = mic_bottom - base_height // 2
-        base_bottom = base_top + base_height
-        
-        draw.rounded_rectangle(
-            [base_left, base_top, base_right, base_bottom],
-            radius=base_height // 2,
-            fill=color
-        )
-        
-        # Stand
-        stand_width = size // 8
-        stand_left = (size - stand_width) // 2
-        stand_top = base_top
-        stand_bottom = size - padding
-        
-        draw.rectangle(
-            [stand_left, stand_top, stand_left + stand_width, stand_bottom],
-            fill=color
-        )
-        
-        self.log("[ICON] Default icon created successfully")
-        return image
-
-    def create_recording_icon(self):
-        """Create a solid red circle icon shown while recording"""
-        size = 256
-        image = Image.new('RGBA', (size, size), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(image)
-        margin = size // 8
-        draw.ellipse([margin, margin, size - margin, size - margin], fill=(220, 30, 30, 255))
-        return image
+        from tray_icons import draw_microphone
+        log.debug("[ICON] Creating default icon...")
+        return draw_microphone(256, 'white' if self.platform != 'darwin' else 'black')
 
     def create_tray_icon(self):
         """Create the system tray icon and menu"""
-        self.log("[TRAY] Starting tray icon creation...")
-        image = Image.open(self.icon_path) if os.path.exists(self.icon_path) else self.create_default_icon()
+        import pystray
+        log.debug("[TRAY] Starting tray icon creation...")
+        self.model_inventory.refresh()
+        # Idle, busy and recording/level frames, from the on-disk sprite cache
+        self.sprites = SpriteSet.load(self.icon_path, self.recording_icon_path, dark=self.platform == 'darwin')
+        image = self.sprites.idle
         self._normal_icon = image
-        self._recording_icon = self.create_recording_icon()
-        self.log(f"[TRAY] Icon loaded: {self.icon_path if os.path.exists(self.icon_path) else 'default icon'}")
+        log.debug("[TRAY] Icon loaded: %s", self.icon_path if os.path.exists(self.icon_path) else 'default icon')
         
         def fmt_shortcut(key):
-            raw = self.config.get('Shortcuts', key, fallback='')
-            return '+'.join(p.capitalize() for p in raw.split('+')) if raw else ''
+            from shortcuts import format_chord
+            return format_chord(self.shortcut_bindings().get(key, ''))
 
         def create_menu():
-            self.log("[TRAY] Creating menu structure...")
+            log.debug("[TRAY] Creating menu structure...")
             
-            # Create model submenu
-            models = []
-            if os.path.exists(self.models_dir):
-                models = sorted(
-                    [f for f in os.listdir(self.models_dir) if f.endswith('.bin')],
-                    key=lambda f: os.path.getsize(os.path.join(self.models_dir, f))
-                )
-            
-            def create_model_item(model_name):
-                model_file = os.path.join(self.models_dir, model_name)
-                size_bytes = os.path.getsize(model_file)
-                if size_bytes >= 1024 ** 3:
-                    size_str = f"{size_bytes / 1024**3:.1f} GB"
-                else:
-                    size_str = f"{size_bytes / 1024**2:.0f} MB"
-                label = f"{model_name} ({size_str})"
+            # Model submenu, built from the in-memory inventory whenever the menu is
+            # updated; the inventory triggers an update when the folder changes.
+            def create_model_item(model_name, catalog):
+                label = f"{model_name} ({catalog[model_name].summary()})"
                 return pystray.MenuItem(
                     label,
                     lambda item: self.change_model(model_name),
@@ -416,9 +809,49 @@ class WhisperType:
                     radio=True
                 )
 
+            # Recent transcriptions submenu; clicking one copies it again
+            def create_history_item(entry):
+                return pystray.MenuItem(entry.label(), lambda item: self.copy_from_history(entry.text))
+
+            def history_items():
+                history = self.history
+                entries = list(reversed(history.recent)) if history is not None else []
+                items = [create_history_item(entry) for entry in entries]
+                if not items:
+                    items.append(pystray.MenuItem(
+                        "No transcriptions yet" if history is not None else "History is off",
+                        lambda item: None, enabled=False,
+                    ))
+                return items
+
+            def model_items():
+                inventory = self.model_inventory
+                catalog = inventory.catalog
+                items = [create_model_item(name, catalog) for name in inventory.models if name in catalog]
+                if not items:
+                    items.append(pystray.MenuItem("No models found", lambda item: None, enabled=False))
+                return items
+
             # Create settings submenu
+            def perf_items():
+                items = []
+                for model in self.latency.models():
+                    items.append(pystray.MenuItem(model, lambda item: None, enabled=False))
+                    items.extend(
+                        pystray.MenuItem(f"  {line}", lambda item: None, enabled=False)
+                        for line in self.latency.summary_lines(model)
+                    )
+                if not items:
+                    items.append(pystray.MenuItem("No dictations yet", lambda item: None, enabled=False))
+                return items + [
+                    pystray.Menu.SEPARATOR,
+                    pystray.MenuItem("Export Chrome trace", lambda item: self.export_chrome_trace()),
+                    pystray.MenuItem("Save diagnostics log", lambda item: self.dump_diagnostics_log()),
+                    pystray.MenuItem("Reset", lambda item: self.latency.reset()),
+                ]
+
             settings_menu = pystray.Menu(
-                pystray.MenuItem("Model", pystray.Menu(*[create_model_item(model) for model in models])),
+                pystray.MenuItem("Model", pystray.Menu(model_items)),
                 pystray.MenuItem("Language", pystray.Menu(*(
                     create_language_item(lang) for lang in common_languages
                 ))),
@@ -426,19 +859,27 @@ class WhisperType:
                     create_port_item(port) for port in common_ports
                 ))),
                 pystray.MenuItem("Translation", lambda item: self.toggle_translation(), checked=lambda item: self.translate),
-                pystray.MenuItem("Show Audio Meter", lambda item: self.toggle_audio_meter(), checked=lambda item: SHOW_AUDIO_METER),
+                pystray.MenuItem("Show Audio Meter", lambda item: self.toggle_audio_meter(), checked=lambda item: self.settings.show_audio_meter),
             )
             
             menu = (
-                pystray.MenuItem(f"Auto-Type Text ({fmt_shortcut('toggle_type')})", lambda item: self.toggle_auto_type(), checked=lambda item: AUTO_TYPE),
-                pystray.MenuItem("Auto-Copy to Clipboard", lambda item: self.toggle_auto_copy(), checked=lambda item: AUTO_COPY),
+                pystray.MenuItem(
+                    "Loading model…",
+                    lambda item: None,
+                    enabled=False,
+                    visible=lambda item: self.server_running and not self.server_ready,
+                ),
+                pystray.MenuItem(f"Auto-Type Text ({fmt_shortcut('toggle_type')})", lambda item: self.toggle_auto_type(), checked=lambda item: self.settings.auto_type),
+                pystray.MenuItem("Auto-Copy to Clipboard", lambda item: self.toggle_auto_copy(), checked=lambda item: self.settings.auto_copy),
                 pystray.Menu.SEPARATOR,
                 pystray.MenuItem(f"Record ({fmt_shortcut('record')})", lambda item: self.toggle_recording(), checked=lambda item: self.recording),
+                pystray.MenuItem("Recent transcriptions", pystray.Menu(history_items)),
                 pystray.Menu.SEPARATOR,
                 pystray.MenuItem("Start Server", lambda item: self.start_server(), enabled=lambda item: not self.server_running),
                 pystray.MenuItem("Stop Server", lambda item: self.stop_server(), enabled=lambda item: self.server_running),
                 pystray.Menu.SEPARATOR,
                 pystray.MenuItem("Settings", settings_menu),
+                pystray.MenuItem("Performance stats", pystray.Menu(perf_items)),
                 pystray.Menu.SEPARATOR,
                 pystray.MenuItem(
                     "Setup whisper.cpp / models…",
@@ -447,10 +888,10 @@ class WhisperType:
                 pystray.Menu.SEPARATOR,
                 pystray.MenuItem(f"Quit ({fmt_shortcut('quit')})", lambda item: self.quit())
             )
-            self.log("[TRAY] Menu structure created successfully")
+            log.debug("[TRAY] Menu structure created successfully")
             return menu
         
-        self.log("[TRAY] Initializing system tray icon...")
+        log.debug("[TRAY] Initializing system tray icon...")
         self.tray_icon = pystray.Icon(
             name="whispertype",
             icon=image,
@@ -462,356 +903,780 @@ class WhisperType:
         self.update_tray_status()
         
         # Check if menu is supported
-        self.log("[TRAY] Checking menu support...")
+        log.debug("[TRAY] Checking menu support...")
         if hasattr(self.tray_icon, 'HAS_MENU'):
             has_menu = self.tray_icon.HAS_MENU
-            self.log(f"[TRAY] Menu support: {'Yes' if has_menu else 'No'}")
+            log.debug("[TRAY] Menu support: %s", 'Yes' if has_menu else 'No')
             if not has_menu:
-                self.log("[TRAY] WARNING: Menu support is not available. You may need to install system GTK packages.")
-                self.log("[TRAY] Try: sudo apt-get install python3-gi python3-gi-cairo gir1.2-gtk-3.0")
+                log.warning("[TRAY] WARNING: Menu support is not available. You may need to install system GTK packages.")
+                log.warning("[TRAY] Try: sudo apt-get install python3-gi python3-gi-cairo gir1.2-gtk-3.0")
         
-        self.log(f"[TRAY] Tray icon backend: {type(self.tray_icon).__module__}.{type(self.tray_icon).__name__}")
-        self.log("[TRAY] Tray icon initialized")
+        log.debug("[TRAY] Tray icon backend: %s.%s", type(self.tray_icon).__module__, type(self.tray_icon).__name__)
+        log.debug("[TRAY] Tray icon initialized")
 
     def update_tray_status(self):
         """Update tray icon title with current status"""
-        status = "Running" if self.server_running else "Stopped"
+        if self.tray_icon is None:
+            return
+        if self.idle_unloaded:
+            status = "Idle (model unloaded)"
+        elif not self.server_running:
+            status = "Stopped"
+        elif not self.server_ready:
+            status = "Loading model"
+        else:
+            status = "Running"
         model_name = os.path.basename(self.model_path)
         title = f"WhisperType - Server {status}\nModel: {model_name}\nLanguage: {self.language}"
         self.tray_icon.title = title
 
     def change_language(self, lang_code):
-        """Change the language setting"""
-        self.log(f"[SETTINGS] Changing language to: {lang_code}")
-        restart_server = False
-        
-        if self.server_running:
-            self.log("[SETTINGS] Server is running, will restart after language change")
-            restart_server = True
-            
-        # Update language
-        self.language = lang_code
-        
-        # Save to config
-        self.config.config.set('Defaults', 'language', lang_code)
-        config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.ini')
-        with open(config_path, 'w') as f:
-            self.config.config.write(f)
+        """Change the language setting (sent with each request; no server restart)"""
+        log.debug("[SETTINGS] Changing language to: %s", lang_code)
+        with self._settings_lock:
+            self.language = lang_code
+
+            # Save to config (written in the background, coalesced with other changes)
+            self.config.config.set('Defaults', 'language', lang_code)
+            self.config_writer.set('Defaults', 'language', lang_code)
             
-        self.log("[SETTINGS] Language changed and config saved")
+        log.debug("[SETTINGS] Language changed and config saved")
         
         # Update tray status
         self.update_tray_status()
-        
-        # Restart server if it was running
-        if restart_server:
-            self.log("[SETTINGS] Restarting server with new language...")
-            self.stop_server()
-            self.start_server()
 
     def change_port(self, port):
         """Change the server port"""
-        self.log(f"[SETTINGS] Changing port to: {port}")
-        restart_server = False
-        
-        if self.server_running:
-            self.log("[SETTINGS] Server is running, will restart after port change")
-            restart_server = True
-            
-        # Update port
-        self.port = port
-        self.server_url = f"http://localhost:{self.port}/inference"
-        
-        # Save to config
-        self.config.config.set('Server', 'port', port)
-        config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.ini')
-        with open(config_path, 'w') as f:
-            self.config.config.write(f)
-            
-        self.log("[SETTINGS] Port changed and config saved")
-        
-        # Restart server if it was running
-        if restart_server:
-            self.log("[SETTINGS] Restarting server with new port...")
-            self.stop_server()
-            self.start_server()
+        log.debug("[SETTINGS] Changing port to: %s", port)
+        with self._settings_lock:
+            restart_server = False
+
+            if self.server_running:
+                log.debug("[SETTINGS] Server is running, will restart after port change")
+                restart_server = True
+
+            # Update port
+            self.port = port
+            self.server_url = f"http://localhost:{self.port}/inference"
+
+            # Save to config (written in the background, coalesced with other changes)
+            self.config.config.set('Server', 'port', port)
+            self.config_writer.set('Server', 'port', port)
+
+            log.debug("[SETTINGS] Port changed and config saved")
+
+            # Restart server if it was running
+            if restart_server:
+                log.debug("[SETTINGS] Restarting server with new port...")
+                self._restart_server()
 
     def toggle_translation(self):
-        """Toggle translation setting"""
-        self.log("[SETTINGS] Toggling translation...")
-        restart_server = False
-        
-        if self.server_running:
-            self.log("[SETTINGS] Server is running, will restart after translation change")
-            restart_server = True
-            
-        # Update translation setting
-        self.translate = not self.translate
-        
-        # Save to config
-        self.config.config.set('Defaults', 'translate', str(self.translate))
-        config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.ini')
-        with open(config_path, 'w') as f:
-            self.config.config.write(f)
-            
-        self.log("[SETTINGS] Translation setting changed and config saved")
-        
-        # Restart server if it was running
-        if restart_server:
-            self.log("[SETTINGS] Restarting server with new translation setting...")
-            self.stop_server()
-            self.start_server()
+        """Toggle translation setting (sent with each request; no server restart)"""
+        log.debug("[SETTINGS] Toggling translation...")
+        with self._settings_lock:
+            self.translate = not self.translate
+
+            # Save to config (written in the background, coalesced with other changes)
+            self.config.config.set('Defaults', 'translate', str(self.translate))
+            self.config_writer.set('Defaults', 'translate', str(self.translate))
+
+        log.debug("[SETTINGS] Translation setting changed and config saved")
 
     def change_model(self, model_name):
         """Change the Whisper model"""
-        self.log(f"[MODEL] Changing model to: {model_name}")
-        restart_server = False
-        
-        if self.server_running:
-            self.log("[MODEL] Server is running, will restart after model change")
-            restart_server = True
-            
-        # Update model path
-        self.model_path = os.path.join(self.models_dir, model_name)
-        
-        # Save to config
-        self.config.config.set('Models', 'default_model', model_name)
-        config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.ini')
-        with open(config_path, 'w') as f:
-            self.config.config.write(f)
-            
-        self.log("[MODEL] Model changed and config saved")
-        
-        # Restart server if it was running
-        if restart_server:
-            self.log("[MODEL] Restarting server with new model...")
-            self.stop_server()
-            self.start_server()
+        log.debug("[MODEL] Changing model to: %s", model_name)
+        with self._settings_lock:
+            restart_server = False
+
+            if self.server_running:
+                log.debug("[MODEL] Server is running, will restart after model change")
+                restart_server = True
+
+            # Update model path
+            self.model_path = os.path.join(self.models_dir, model_name)
+
+            # Save to config (written in the background, coalesced with other changes)
+            self.config.config.set('Models', 'default_model', model_name)
+            self.config_writer.set('Models', 'default_model', model_name)
+
+            log.debug("[MODEL] Model changed and config saved")
+
+            # Restart server if it was running
+            if restart_server:
+                log.debug("[MODEL] Restarting server with new model...")
+                self._restart_server()
+
+    def _restart_server(self):
+        """Swap the server once no dictation is recording or waiting for its text
+        (call with ``_settings_lock`` held)."""
+        self.wait_until_idle()
+        self.stop_server()
+        self.start_server()
+
+    def wait_until_idle(self, timeout=None):
+        """Block until nothing is recording or being transcribed; False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._idle_cond:
+            while self.recording or self._in_flight:
+                remaining = 0.1 if deadline is None else min(0.1, deadline - time.monotonic())
+                if remaining <= 0:
+                    return False
+                self._idle_cond.wait(remaining)  # recording is not signalled: re-check
+        return True
+
+    def _begin_dictation(self):
+        with self._idle_cond:
+            self._in_flight += 1
+
+    def _end_dictation(self):
+        with self._idle_cond:
+            self._in_flight -= 1
+            self._idle_cond.notify_all()
+
+    def _models_changed(self):
+        """The models folder gained, lost or replaced a model: rebuild the model menu."""
+        log.info("[MODELS] Models folder changed: %d model(s) available", len(self.model_inventory.models))
+        if self.tray_icon is not None:
+            self.tray_icon.update_menu()
+
+    def reload_config(self):
+        """Re-read config.ini after an outside edit and apply only what changed.
+
+        Shortcuts rebind the listener, language/translate apply to the next request,
+        a model or port change swaps the server, and everything else is a settings swap.
+        Returns the changed ``(section, key)`` pairs. Skipped while the setup wizard
+        runs; it applies its own result when it exits."""
+        if self._wizard_running:
+            return set()
+        with self._settings_lock:
+            return self._reload_config()
+
+    def _reload_config(self):
+        cfg_path, _ = config_file_paths()
+        new = configparser.ConfigParser(interpolation=configparser.ExtendedInterpolation())
+        try:
+            if not new.read(cfg_path):
+                return set()
+        except configparser.Error as e:
+            log.warning("[CONFIG] Not reloading %s: %s", cfg_path, e)
+            return set()
+        old = self.config.config
+
+        def raw_items(cfg):
+            return {
+                (section, key): cfg.get(section, key, raw=True)
+                for section in cfg.sections() for key in cfg.options(section)
+            }
+
+        before, after = raw_items(old), raw_items(new)
+        changed = {k for k in before.keys() | after.keys() if before.get(k) != after.get(k)}
+        if not changed:
+            return changed  # our own ConfigWriter save, or a touch
+        global CONFIG
+        CONFIG = new
+        self.config.config = new
+        sections = {section for section, _ in changed}
+        log.info("[CONFIG] config.ini changed: %s", ", ".join(f"{s}.{k}" for s, k in sorted(changed)))
+
+        # Typed settings: take only the changed fields, so tray toggles survive.
+        settings = self.load_settings()
+        updates = {f.name: getattr(settings, f.name) for f in fields(Settings) if f.metadata["ini"] in changed}
+        if updates:
+            self.settings = replace(self.settings, **updates)
+        needs_restart = sorted(
+            f"{s}.{k}" for s, k in changed
+            if s in ("Control", "History", "Logging") or (s, k) in (
+                ("Recording", "sample_rate"), ("Recording", "max_duration"), ("Recording", "spill_after"),
+                ("Recording", "spill_dir"), ("Server", "idle_unload_minutes"), ("Server", "keep_warm_seconds"),
+                ("Server", "shared"),
+            )
+        )
+        if needs_restart:
+            log.warning("[CONFIG] Restart WhisperType to apply: %s", ", ".join(needs_restart))
+
+        if "Shortcuts" in sections and getattr(self, "listener", None) is not None:
+            stop = getattr(self.listener, "stop", None)
+            if stop is not None:
+                stop()
+            self.setup_keyboard_listener()
+        if ("Defaults", "language") in changed:
+            self.language = new.get("Defaults", "language", fallback="en")
+        if ("Defaults", "translate") in changed:
+            self.translate = new.getboolean("Defaults", "translate", fallback=False)
+
+        server_keys = {("Models", "models_dir"), ("Models", "default_model"), ("Server", "port"), ("Server", "command")}
+        if changed & server_keys:
+            raw_models = new.get("Models", "models_dir", raw=True) or ""
+            self.models_dir = os.path.expanduser(os.path.expandvars(raw_models))
+            self.model_inventory.set_models_dir(self.models_dir)
+            self.model_path = os.path.join(
+                self.models_dir, new.get("Models", "default_model", fallback="ggml-tiny.en.bin")
+            )
+            self.port = new.get("Server", "port", fallback="7777")
+            self.server_url = f"http://localhost:{self.port}/inference"
+            if self.server_running:
+                log.info("[CONFIG] Restarting whisper-server for the new model/port...")
+                self._restart_server()
+
+        if self.tray_icon is not None:
+            self.tray_icon.update_menu()
+            self.update_tray_status()
+        return changed
 
     def start_server(self):
         """Start the whisper server"""
         if self.server_running:
-            self.log("[SERVER] Server is already running")
+            log.debug("[SERVER] Server is already running")
             return
             
         try:
             # Get models directory from environment or config
             models_dir = self.models_dir
             if not models_dir:
-                self.log("[SERVER] Error: models_dir not set in config.ini")
+                log.error("[SERVER] Error: models_dir not set in config.ini")
                 return
                 
             model_path = self.model_path
             
             if not os.path.exists(model_path):
-                self.log(f"[SERVER] Model file not found: {model_path}")
+                log.error("[SERVER] Model file not found: %s", model_path)
                 return
             
-            cmd_template = self.config.get("Server", "command", raw=True)
-            cmd = cmd_template.format(
-                model_path=model_path,
-                language=self.language,
-                port=self.port
+            self.server_process = spawn_server(
+                self.config,
+                model_path,
+                self.language,
+                self.port,
+                self.translate,
+                self.settings.prefetch_model,
             )
-            
-            if self.translate:
-                cmd += ' -tr'
-            
-            self.log(f"[SERVER] Starting server with command: {cmd}")
-            posix = os.name != "nt"
-            args = shlex.split(cmd, posix=posix)
-            self.server_process = subprocess.Popen(args)
+            self.server_url = server_url_for(self.server_process, self.port)
             self.server_running = True
-            self.log("[SERVER] Server starting...")
+            self.server_ready = False
+            self.idle_unloaded = False
+            self._server_ready_event.clear()
+            log.debug("[SERVER] Server starting...")
+            self._watch_server_ready(self.server_process)
             
             # Update menu items and tray status
-            self.tray_icon.update_menu()
-            self.update_tray_status()
+            if self.tray_icon is not None:
+                self.tray_icon.update_menu()
+                self.update_tray_status()
             
         except Exception as e:
-            self.log(f"[SERVER] Error starting server: {e}")
+            log.error("[SERVER] Error starting server: %s", e)
             self.server_running = False
             self.server_process = None
 
+    def _watch_server_ready(self, process):
+        """Poll the server in the background and flip the tray out of "loading"."""
+        def watch():
+            from model_bench import wait_until_ready
+            launched = time.perf_counter()
+            ready = wait_until_ready(getattr(process, "port", self.port), process, timeout=SERVER_LOAD_TIMEOUT)
+            if process is not self.server_process:
+                return  # restarted or stopped meanwhile
+            if ready:
+                self.server_ready = True
+                self._server_ready_event.set()
+                now = time.perf_counter()
+                log.info(
+                    "[PERF] whisper-server ready after %.2fs (model load %.2fs)",
+                    now - STARTED_AT, now - launched,
+                )
+            else:
+                log.warning("[SERVER] whisper-server exited or did not become ready")
+                if process.poll() is not None:
+                    self.server_running = False
+                    self.server_process = None
+            if self.tray_icon is not None:
+                self.tray_icon.update_menu()
+                self.update_tray_status()
+
+        threading.Thread(target=watch, daemon=True).start()
+
     def stop_server(self):
         """Stop the whisper server"""
         if not self.server_running:
-            self.log("[SERVER] Server is not running")
+            log.debug("[SERVER] Server is not running")
             return
             
+        from model_bench import stop_process
         try:
-            self.log("[SERVER] Stopping server...")
-            if self.platform == 'windows':
-                subprocess.run(['taskkill', '/F', '/IM', 'whisper-server.exe'])
-            else:
-                subprocess.run(['pkill', '-f', 'whisper-server'])
-            
+            log.debug("[SERVER] Stopping server...")
+            # Only our own server (or our lease on the shared one): other
+            # WhisperType instances may be using a whisper-server too.
             if self.server_process:
-                self.server_process.terminate()
+                stop_process(self.server_process)
                 self.server_process = None
                 
             self.server_running = False
-            self.log("[SERVER] Server stopped")
+            self.server_ready = False
+            self.idle_unloaded = False
+            self._server_ready_event.clear()
+            log.debug("[SERVER] Server stopped")
             
             # Update menu items and tray status
-            self.tray_icon.update_menu()
-            self.update_tray_status()
+            if self.tray_icon is not None:
+                self.tray_icon.update_menu()
+                self.update_tray_status()
             
         except Exception as e:
-            self.log(f"[SERVER] Error stopping server: {e}")
+            log.error("[SERVER] Error stopping server: %s", e)
+
+    def export_chrome_trace(self):
+        """Write recent dictation spans for chrome://tracing / Perfetto."""
+        path = self.config.get('Performance', 'chrome_trace_file', fallback='', raw=True).strip()
+        if path:
+            path = os.path.expanduser(os.path.expandvars(path))
+        else:
+            import tempfile
+            path = os.path.join(tempfile.gettempdir(), 'whispertype-trace.json')
+        try:
+            count = self.latency.write_chrome_trace(path)
+        except OSError as e:
+            log.error("[PERF] Could not write trace: %s", e)
+            return
+        log.info("[PERF] Wrote %d dictation traces to %s", count, path)
+
+    def dump_diagnostics_log(self):
+        """Write the in-memory ring buffer of recent log records to a file."""
+        from applog import logging_service
+        service = logging_service()
+        if service is None:
+            log.warning("[LOG] Logging service not running, nothing to save")
+            return None
+        import tempfile
+        path = os.path.join(tempfile.gettempdir(), 'whispertype-diagnostics.log')
+        try:
+            count = service.ring.dump(path)
+        except OSError as e:
+            log.error("[LOG] Could not write diagnostics log: %s", e)
+            return None
+        log.info("[LOG] Wrote %d recent log records to %s", count, path)
+        return path
+
+    def _idle_monitor(self):
+        """Unload the server once it has been idle for idle_unload_minutes."""
+        limit = self.idle_unload_minutes * 60
+        while self.running:
+            time.sleep(min(30.0, max(1.0, limit / 4)))
+            if (self.server_running and self.server_ready and not self.recording
+                    and time.monotonic() - self.last_activity >= limit):
+                self._unload_idle_server()
+
+    def _unload_idle_server(self):
+        """Stop the supervised whisper-server to free the model's memory."""
+        from model_bench import process_rss_bytes, stop_process
+        with self._server_lock:
+            if self.recording or not self.server_running:
+                return
+            process = self.server_process
+            rss = process_rss_bytes(process) if process else 0
+            idle_min = (time.monotonic() - self.last_activity) / 60
+            self.server_process = None
+            self.server_running = False
+            self.server_ready = False
+            self._server_ready_event.clear()
+            self.idle_unloaded = True
+            if process:
+                stop_process(process)
+        if hasattr(process, "launched"):
+            # Shared: the daemon only stops it once no other WhisperType holds it.
+            log.info("[IDLE] Released the shared whisper-server after %.0f min idle (~%.0f MB)", idle_min, rss / 1024**2)
+        else:
+            log.info("[IDLE] Unloaded whisper-server after %.0f min idle, freed ~%.0f MB", idle_min, rss / 1024**2)
+        if self.tray_icon is not None:
+            self.tray_icon.update_menu()
+            self.update_tray_status()
+
+    def _relaunch_after_idle(self):
+        """Start the server again; model loading overlaps with the recording.
+
+        Runs on its own thread: acquiring a shared server can take seconds,
+        which must not stall the keyboard hook.
+        """
+        try:
+            with self._server_lock:
+                if not self.idle_unloaded or self.server_running:
+                    return
+                self._relaunch_started = time.perf_counter()
+                log.info("[IDLE] Relaunching whisper-server while recording...")
+                self.start_server()
+        finally:
+            self._relaunching = False
 
     def toggle_audio_meter(self):
         """Toggle audio meter display"""
-        global SHOW_AUDIO_METER
-        SHOW_AUDIO_METER = not SHOW_AUDIO_METER
+        self.settings = replace(self.settings, show_audio_meter=not self.settings.show_audio_meter)
 
     def toggle_auto_copy(self):
         """Toggle auto-copy to clipboard"""
-        global AUTO_COPY
-        AUTO_COPY = not AUTO_COPY
+        self.settings = replace(self.settings, auto_copy=not self.settings.auto_copy)
 
     def toggle_auto_type(self):
         """Toggle auto-type functionality"""
-        global AUTO_TYPE
-        self.log("[AUTO-TYPE] Toggling auto-type...")
-        AUTO_TYPE = not AUTO_TYPE
-        self.log(f"[AUTO-TYPE] Auto-Type is now {'enabled' if AUTO_TYPE else 'disabled'}")
-        self.tray_icon.update_menu()
-        self.update_tray_status()
+        log.debug("[AUTO-TYPE] Toggling auto-type...")
+        self.settings = replace(self.settings, auto_type=not self.settings.auto_type)
+        log.debug("[AUTO-TYPE] Auto-Type is now %s", 'enabled' if self.settings.auto_type else 'disabled')
+        if self.tray_icon is not None:
+            self.tray_icon.update_menu()
+            self.update_tray_status()
 
     def quit(self):
         """Quit the application"""
-        self.log("[APP] Shutting down...")
+        log.debug("[APP] Shutting down...")
         self.running = False
+        if self.control is not None:
+            self.control.close()
+        if self.config_watcher is not None:
+            self.config_watcher.stop()
+        self.model_inventory.stop()
+        if self.keep_warm is not None:
+            self.keep_warm.stop()
+            if self.keep_warm.pings:
+                log.info("[WARM] %s", self.keep_warm.summary())
         if self.recording:
             self.stop_recording()
         if self.server_running:
             self.stop_server()
-        self.session.close()
-        self.tray_icon.stop()
-        self.log("[APP] Shutdown complete")
+        self.config_writer.flush()
+        if self.history is not None:
+            self.history.close()
+        for session in (self._session, self._warm_session):
+            if session is not None:
+                session.close()
+        if self.tray_icon is not None:
+            self.tray_icon.stop()
+        log.debug("[APP] Shutdown complete")
 
     def start_recording(self):
         """Start recording audio"""
         if not self.recording:
             self.recording = True
-            self.audio_data = []
+            self.capture.clear()
             self.recording_start_time = time.time()
-            self.log("\nRecording started... Hold Ctrl+Shift+Z to continue recording.")
-            threading.Thread(target=self.record_audio).start()
-            self.tray_icon.icon = self._recording_icon
+            self.last_activity = time.monotonic()
+            if self.keep_warm is not None:
+                self.keep_warm.note_request()
+            if self.idle_unloaded and not self._relaunching:
+                self._relaunching = True
+                threading.Thread(target=self._relaunch_after_idle, daemon=True).start()
+            log.debug("\nRecording started... Hold Ctrl+Shift+Z to continue recording.")
+            self.meter_rms = 0.0
+            self._meter_shown = 0
+            self._meter_on = self.tray_icon is not None and self.settings.show_audio_meter
+            self._record_stop.clear()
+            self._record_thread = threading.Thread(target=self.record_audio)
+            self._record_thread.start()
+            self._show_icon(self.sprites.recording[0] if self.sprites is not None else None)
+            self._emit("recording_started")
 
     def stop_recording(self):
         """Stop recording and process audio"""
         if self.recording:
+            trace = self.latency.trace(os.path.basename(self.model_path))
+            self._begin_dictation()  # before recording drops, so a swap cannot slip in
             self.recording = False
-            recording_duration = time.time() - self.recording_start_time
+            self._record_stop.set()
+            handed_off = False
+            try:
+                handed_off = self._finish_recording(trace)
+            finally:
+                if not handed_off:
+                    self._end_dictation()
 
-            self.tray_icon.icon = self._normal_icon
+    def _finish_recording(self, trace):
+        """Encode and transcribe the stopped recording; True if that continues on
+        another thread (which ends the in-flight dictation)."""
+        recording_duration = time.time() - self.recording_start_time
 
-            if recording_duration < self.config.getfloat('Recording', 'min_duration', 0.1):
-                self.log(f"Recording too short ({recording_duration:.1f}s), discarding...")
-                self.audio_data = []
-                return
+        if recording_duration < self.settings.min_duration:
+            self._show_icon(self._normal_icon)
+            log.debug("Recording too short (%.1fs), discarding...", recording_duration)
+            self.capture.clear()
+            self._emit("transcription_failed", error="recording too short")
+            return False
+        self._emit("recording_stopped", seconds=round(recording_duration, 3))
+        self._show_icon(self.sprites.busy if self.sprites is not None else None)
 
-            self.log("Recording stopped, processing...")
+        log.debug("Recording stopped, processing...")
+        if self._record_thread is not None:
+            self._record_thread.join(timeout=1.0)
+        trace.mark("stream_stop")
 
-            wav_buf = self._audio_to_wav_bytes()
-            if wav_buf:
-                self.log("Sending to whisper.cpp server...")
-                transcribed_text = self.transcribe_audio(wav_buf)
-                if transcribed_text:
-                    self.log(f"Transcribed: {transcribed_text}")
-                    self.handle_transcribed_text(transcribed_text)
-                else:
-                    self.log("No transcription received")
+        wav_buf = self._audio_to_wav_bytes()
+        trace.mark("encode")
+        if not wav_buf:
+            self._show_icon(self._normal_icon)
+        elif self._relaunching or (self.server_running and not self.server_ready):
+            # Model still loading (startup or idle relaunch): don't block the hook thread.
+            threading.Thread(target=self._process_when_ready, args=(wav_buf, trace), daemon=True).start()
+            return True
+        else:
+            self._process_recording(wav_buf, trace)
+        return False
+
+    def cancel_recording(self):
+        """Stop recording and discard the audio; returns False if nothing was recording."""
+        if not self.recording:
+            return False
+        self.recording = False
+        self.menu_recording = False
+        self._record_stop.set()
+        self._show_icon(self._normal_icon)
+        if self._record_thread is not None:
+            self._record_thread.join(timeout=1.0)
+        self.capture.clear()
+        log.debug("Recording cancelled")
+        self._emit("recording_cancelled")
+        return True
+
+    def _process_when_ready(self, wav_buf, trace=None):
+        """Wait for the (re)loading server, then transcribe; reports the hidden load time."""
+        try:
+            self._process_once_ready(wav_buf, trace)
+        finally:
+            self._end_dictation()
+
+    def _process_once_ready(self, wav_buf, trace):
+        stopped = time.perf_counter()
+        log.debug("Waiting for whisper-server to finish loading...")
+        deadline = stopped + SERVER_LOAD_TIMEOUT
+        # The watcher clears server_running if the server exits while loading.
+        while not self._server_ready_event.wait(0.1):
+            if (not self.server_running and not self._relaunching) or time.perf_counter() >= deadline:
+                break
+        if not self._server_ready_event.is_set():
+            log.warning("whisper-server did not become ready, dropping recording")
+            if isinstance(wav_buf, SpillFile):
+                wav_buf.close()
+            self._show_icon(self._normal_icon)
+            self._emit("transcription_failed", error="server not ready")
+            return
+        ready = time.perf_counter()
+        if trace is not None:
+            trace.mark("server_wait", at=ready)
+        if self._relaunch_started is not None:
+            load = ready - self._relaunch_started
+            waited = ready - stopped
+            rss = 0
+            if self.server_process is not None:
+                from model_bench import process_rss_bytes
+                rss = process_rss_bytes(self.server_process)
+            log.info(
+                "[IDLE] Model reloaded in %.2fs, %.2fs of it hidden behind the recording; "
+                "dictation waited %.2fs (server RSS %.0f MB)",
+                load, load - waited, waited, rss / 1024**2,
+            )
+            self._relaunch_started = None
+        self._process_recording(wav_buf, trace)
+
+    def _process_recording(self, wav_buf, trace=None):
+        """Transcribe an encoded recording and hand the text on."""
+        log.debug("Sending to whisper.cpp server...")
+        t0 = time.perf_counter()
+        try:
+            transcribed_text = self.transcribe_audio(wav_buf, trace)
+        finally:
+            if not self.recording:  # a new recording has its own icon
+                self._show_icon(self._normal_icon)
+        self.last_activity = time.monotonic()
+        if self.keep_warm is not None:
+            self.keep_warm.note_request()
+        log.debug("[LATENCY] Server request took %.2fs", time.perf_counter() - t0)
+        if transcribed_text:
+            log.debug("Transcribed: %s", transcribed_text)
+            self.handle_transcribed_text(transcribed_text, trace)
+            self._emit(
+                "transcription",
+                text=transcribed_text,
+                model=os.path.basename(self.model_path),
+                latency=round(time.perf_counter() - trace.start, 4) if trace is not None else None,
+            )
+            if trace is not None:
+                self.latency.finish(trace)
+            if self.history is not None:
+                self._save_history(transcribed_text, wav_buf, trace)
+            if self.tray_icon is not None and (trace is not None or self.history is not None):
+                self.tray_icon.update_menu()
+            if not self._first_dictation_reported:
+                self._first_dictation_reported = True
+                log.info("[PERF] Time to first dictation: %.2fs after launch", time.perf_counter() - STARTED_AT)
+        else:
+            log.debug("No transcription received")
+            self._emit("transcription_failed", error="no transcription received")
+
+    def _save_history(self, text, wav_buf, trace):
+        """Queue a finished dictation for the history database (written in the background)."""
+        history = self.history
+        keep = history.keep_audio and not isinstance(wav_buf, SpillFile)  # spilled recordings stay out
+        history.add(
+            text,
+            model=os.path.basename(self.model_path),
+            language=self.language,
+            audio_seconds=round(wav_seconds(wav_buf), 3),
+            stages=trace.to_dict()["stages"] if trace is not None else None,
+            wav=wav_buf.getvalue() if keep else None,
+        )
+
+    def _audio_callback(self, indata, frames, time_info, status):
+        """Input stream callback (PortAudio thread): collect blocks while recording."""
+        if status:
+            log.warning("Audio input status: %s", status)
+        if self.recording:
+            self.capture.append(indata)
+            if self._meter_on:
+                self.meter_rms = self.capture.tail_rms(frames)
+
+    def _show_icon(self, image, level=None):
+        """Swap the tray icon; ``level`` frames only while still recording."""
+        if self.tray_icon is None or image is None:
+            return
+        with self._icon_lock:
+            if level is not None:
+                if not self.recording:
+                    return
+                self._meter_shown = level
+            self.tray_icon.icon = image
+
+    def _update_meter(self):
+        """Show the recording frame for the latest RMS (recording thread, METER_FPS)."""
+        level = level_index(self.meter_rms)
+        if level < self._meter_shown:
+            level = self._meter_shown - 1  # fall back one step per frame, like a VU meter
+        if level != self._meter_shown:
+            self._show_icon(self.sprites.recording[level], level)
 
     def record_audio(self):
         """Record audio in a separate thread"""
-        def callback(indata, frames, time, status):
-            if status:
-                self.log(status)
-            if self.recording:
-                self.audio_data.extend(indata.copy())
-
         try:
-            with sd.InputStream(samplerate=self.sample_rate, channels=1, callback=callback):
+            input_stream = self.input_stream_factory or _sounddevice().InputStream
+            with input_stream(samplerate=self.sample_rate, channels=1, callback=self._audio_callback):
                 while self.recording:
-                    sd.sleep(100)
+                    if self._meter_on:
+                        self._record_stop.wait(1.0 / METER_FPS)
+                        self._update_meter()
+                    else:
+                        self._record_stop.wait(0.1)
+                    self.capture.spill_if_due()
+                    self.capture.release()
+                    if self.capture.full and self.recording:
+                        # A stuck hotkey (e.g. key-up lost to the lock screen) must not record forever.
+                        log.warning("[REC] Reached max_duration (%.0fs), stopping the recording", self.settings.max_duration)
+                        self.menu_recording = False
+                        threading.Thread(target=self.stop_recording, daemon=True).start()
+                        break
         except Exception as e:
-            self.log(f"Error recording audio: {e}")
+            log.error("Error recording audio: %s", e)
             self.recording = False
 
     def _audio_to_wav_bytes(self):
         """Encode recorded audio as WAV into an in-memory buffer"""
-        if not self.audio_data:
+        if not len(self.capture):
             return None
         try:
-            audio_data = np.concatenate(self.audio_data)
-            buf = io.BytesIO()
-            with wave.open(buf, 'wb') as wf:
-                wf.setnchannels(1)
-                wf.setsampwidth(2)
-                wf.setframerate(self.sample_rate)
-                wf.writeframes((audio_data * 32767).astype(np.int16).tobytes())
-            buf.seek(0)
-            return buf
+            return self.capture.to_wav()
         except Exception as e:
-            self.log(f"Error building audio buffer: {e}")
+            log.error("Error building audio buffer: %s", e)
             return None
 
-    def transcribe_audio(self, wav_buf):
-        """Send in-memory WAV buffer to whisper.cpp server for transcription"""
+    def _keep_warm_ping(self, wav_buf):
+        """Silent request that keeps the model's pages resident; True on success."""
         try:
-            timeout = self.config.getint('Server', 'request_timeout', fallback=10)
-            response = self.session.post(
+            if self._warm_session is None:
+                import requests
+                self._warm_session = requests.Session()
+            response = self._warm_session.post(
                 self.server_url,
-                files={'file': ('audio.wav', wav_buf, 'audio/wav')},
-                timeout=timeout,
+                files={'file': ('silence.wav', wav_buf, 'audio/wav')},
+                timeout=self.settings.request_timeout,
             )
+            return response.status_code == 200
+        except Exception as e:
+            log.warning("[WARM] Ping failed: %s", e)
+            return False
+
+    def transcribe_audio(self, wav_buf, trace=None):
+        """Send a WAV buffer (or a spilled recording, which is closed afterwards) to
+        whisper.cpp server for transcription"""
+        # Per request, so language/translation changes need no server restart
+        fields = {'language': self.language, 'translate': 'true' if self.translate else 'false'}
+        spill = wav_buf if isinstance(wav_buf, SpillFile) else None
+        try:
+            sent = time.perf_counter()
+            if spill is not None:
+                # Streamed from the memory-mapped file; never read into RAM as a whole
+                upload = MultipartUpload(spill, fields)
+                response = self.session.post(
+                    self.server_url,
+                    data=upload,
+                    headers={'Content-Type': upload.content_type},
+                    timeout=self.settings.request_timeout,
+                )
+            else:
+                response = self.session.post(
+                    self.server_url,
+                    files={'file': ('audio.wav', wav_buf, 'audio/wav')},
+                    data=fields,
+                    timeout=self.settings.request_timeout,
+                )
             if response.status_code == 200:
                 result = response.json()
+                if trace is not None:
+                    # elapsed = request sent -> response headers: upload + server decode
+                    trace.mark("server_decode", at=sent + response.elapsed.total_seconds())
+                    trace.mark("http")
                 text = result.get('text', '').strip()
                 return ' '.join(text.split())
             else:
-                self.log(f"Error: Server returned status code {response.status_code}")
+                log.error("Error: Server returned status code %s", response.status_code)
                 if response.text:
-                    self.log(f"Server response: {response.text[:200]}")
+                    log.debug("Server response: %s", response.text[:200])
                 return None
         except Exception as e:
-            self.log(f"Error transcribing audio: {e}")
+            log.error("Error transcribing audio: %s", e)
             return None
+        finally:
+            if spill is not None:
+                spill.close()
 
-    def handle_transcribed_text(self, text):
+    def handle_transcribed_text(self, text, trace=None):
         """Handle transcribed text (copy to clipboard and/or type)"""
-        self.log("[TEXT-HANDLER] Starting to handle transcribed text...")
+        log.debug("[TEXT-HANDLER] Starting to handle transcribed text...")
         if not text:
-            self.log("[TEXT-HANDLER] No text to handle")
+            log.debug("[TEXT-HANDLER] No text to handle")
             return
             
+        settings = self.settings  # one snapshot for the whole dictation
         try:
             # Copy to clipboard if enabled
-            if AUTO_COPY:
-                self.log("[TEXT-HANDLER] Auto-copy enabled, copying to clipboard...")
+            if settings.auto_copy:
+                log.debug("[TEXT-HANDLER] Auto-copy enabled, copying to clipboard...")
+                import pyperclip
                 pyperclip.copy(text)
-                self.log("[TEXT-HANDLER] Text copied to clipboard successfully")
+                log.debug("[TEXT-HANDLER] Text copied to clipboard successfully")
+                if trace is not None:
+                    trace.mark("clipboard")
             
             # Type text if enabled
-            if AUTO_TYPE:
-                self.log("[TEXT-HANDLER] Auto-Type enabled, preparing to type text...")
+            if settings.auto_type:
+                log.debug("[TEXT-HANDLER] Auto-Type enabled, preparing to type text...")
                 try:
-                    typing_delay = self.config.getfloat('UI', 'typing_delay', fallback=0.5)
-                    self.log(f"[TEXT-HANDLER] Adding delay of {typing_delay}s before typing...")
+                    typing_delay = settings.typing_delay
+                    log.debug("[TEXT-HANDLER] Adding delay of %ss before typing...", typing_delay)
                     time.sleep(typing_delay)
-                    self.log("[TEXT-HANDLER] Starting to type text...")
-                    pyautogui.write(text)
-                    self.log("[TEXT-HANDLER] Text typed successfully")
+                    log.debug("[TEXT-HANDLER] Starting to type text...")
+                    _pyautogui().write(text)
+                    log.debug("[TEXT-HANDLER] Text typed successfully")
+                    if trace is not None:
+                        trace.mark("typing")
                 except Exception as e:
-                    self.log(f"[TEXT-HANDLER] Error during typing: {e}")
+                    log.error("[TEXT-HANDLER] Error during typing: %s", e)
             else:
-                self.log("[TEXT-HANDLER] Auto-Type is disabled, skipping typing")
+                log.debug("[TEXT-HANDLER] Auto-Type is disabled, skipping typing")
         except Exception as e:
-            self.log(f"[TEXT-HANDLER] Error in handle_transcribed_text: {e}")
+            log.error("[TEXT-HANDLER] Error in handle_transcribed_text: %s", e)
 
     def toggle_recording(self):
         """Toggle recording state (for menu-triggered recording)"""
@@ -826,15 +1691,31 @@ class WhisperType:
         """Run setup in a subprocess (avoids mixing tray GUI with tkinter)."""
         installer = os.path.join(os.path.dirname(os.path.abspath(__file__)), "installer.py")
         cfg_path, _ = config_file_paths()
+        self.config_writer.flush()  # the wizard starts from what is on disk
+        self._wizard_running = True  # its saves are applied below, not by the watcher
         try:
             subprocess.run([sys.executable, installer, cfg_path], check=False)
         except Exception as e:
-            self.log(f"[INSTALLER] Failed to launch: {e}")
+            log.error("[INSTALLER] Failed to launch: %s", e)
+            self._wizard_running = False
             return
+        try:
+            with self._settings_lock:
+                self._apply_wizard_config()
+        finally:
+            self._wizard_running = False
+        if self.tray_icon is not None:
+            self.tray_icon.update_menu()
+            self.update_tray_status()
+
+    def _apply_wizard_config(self):
         reload_config_from_disk()
         self.config = WhisperTypeConfig()
+        self.settings = self.load_settings()
         raw_m = self.config.get("Models", "models_dir", raw=True)
         self.models_dir = os.path.expanduser(os.path.expandvars(raw_m or ""))
+        if not self.model_inventory.set_models_dir(self.models_dir):
+            self.model_inventory.refresh(force=True)  # the wizard may have downloaded or quantized models
         default_model = self.config.get(
             "Models", "default_model", fallback="ggml-tiny.en.bin"
         )
@@ -844,10 +1725,7 @@ class WhisperType:
         self.server_url = f"http://localhost:{self.port}/inference"
         self.translate = self.config.getboolean("Defaults", "translate", fallback=False)
         if self.server_running:
-            self.stop_server()
-            self.start_server()
-        self.tray_icon.update_menu()
-        self.update_tray_status()
+            self._restart_server()
 
 
 def main():
@@ -862,7 +1740,8 @@ def main():
     if cfg is None:
         sys.exit(1)
     CONFIG = cfg
-    sync_globals_from_config()
+    from applog import setup_logging_from_config
+    setup_logging_from_config(CONFIG)
     cfg_path, _ = config_file_paths()
     while not environment_ok(CONFIG):
         print("[MAIN] whisper-server or models missing — opening setup wizard.")
@@ -873,11 +1752,23 @@ def main():
             interpolation=configparser.ExtendedInterpolation()
         )
         CONFIG.read(cfg_path)
-        sync_globals_from_config()
+
+    # Model loading is the slowest startup step and needs nothing from the UI,
+    # so launch the server first and build the tray and hooks while it loads.
+    server_process = None
+    try:
+        server_process = launch_server_from_config(CONFIG)
+    except Exception as e:
+        print(f"[MAIN] Could not launch whisper-server early: {e}")
 
     try:
         print("[MAIN] Creating WhisperType instance...")
-        client = WhisperType()
+        try:
+            client = WhisperType(server_process=server_process)
+        except BaseException:
+            if server_process is not None and server_process.poll() is None:
+                server_process.terminate()
+            raise
         print("[MAIN] Starting main loop...")
         client.tray_icon.run()
         print("[MAIN] Main loop running...")
@@ -888,11 +1779,19 @@ def main():
             print("[MAIN] Try: sudo apt-get install python3-gi python3-gi-cairo gir1.2-gtk-3.0")
 
 if __name__ == "__main__":
-    print("[STARTUP] Initializing global settings...")
-    # Initialize global settings
-    SHOW_AUDIO_METER = False
-    AUTO_COPY = False
-    AUTO_TYPE = True  # Set default to True
-    print("[STARTUP] Global settings initialized")
-    
+    if sys.argv[1:2] == ["transcribe"]:
+        from batch_transcribe import transcribe_main
+        sys.exit(transcribe_main(sys.argv[2:]))
+    if sys.argv[1:2] == ["stream"]:
+        from stream_transcribe import stream_main
+        sys.exit(stream_main(sys.argv[2:]))
+    if sys.argv[1:2] == ["ctl"]:
+        from control import ctl_main
+        sys.exit(ctl_main(sys.argv[2:]))
+    if sys.argv[1:2] == ["history"]:
+        from history import history_main
+        sys.exit(history_main(sys.argv[2:]))
+    if sys.argv[1:2] == ["servers"]:
+        from server_share import servers_main
+        sys.exit(servers_main(sys.argv[2:]))
     main() 
\ No newline at end of file